@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark and exercise the asyncio scan engine against slow fake tools
+
+Compares the async engine with the thread-pool engine, then checks that a
+hung lookup hits its per-profile deadline, that the scan deadline and a
+cancellation from another thread both return partial results in bounded
+time. Exits non-zero if any check fails.
+
+Usage: python benchmarks/bench_async_engine.py [--profiles 200] [--latency MS]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+from wifipass_core import WiFiPasswordRetriever
+from wifipass_async import AsyncScanEngine, LOOKUP_TIMED_OUT
+from fakes import install_fake_tools
+
+
+def make_retriever(os_type, workers):
+    retriever = WiFiPasswordRetriever(max_workers=workers)
+    retriever.os_type = os_type
+    return retriever
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exercise the asyncio scan engine")
+    parser.add_argument("--profiles", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=20.0, help="per-call latency in ms")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    failures = []
+
+    def check(name, ok, detail):
+        print(f"{name:<34}{'ok' if ok else 'FAILED'}  {detail}")
+        if not ok:
+            failures.append(name)
+
+    with tempfile.TemporaryDirectory(prefix="wifipass-bench-") as workdir:
+        bindir = install_fake_tools(os.path.join(workdir, "bin"))
+        os.environ["PATH"] = bindir + os.pathsep + os.environ.get("PATH", "")
+        os.environ["WIFIPASS_FAKE_PROFILES"] = str(args.profiles)
+        os.environ["WIFIPASS_FAKE_LATENCY"] = str(args.latency / 1000.0)
+        os.environ.pop("WIFIPASS_FAKE_HANG", None)
+
+        for os_type in ("Windows", "Darwin"):
+            threaded, thread_wall = timed(make_retriever(os_type, args.workers).get_wifi_passwords)
+            engine = AsyncScanEngine(make_retriever(os_type, args.workers))
+            passwords, async_wall = timed(engine.scan)
+            check(f"{os_type} async vs thread", passwords == threaded,
+                  f"thread {thread_wall:.2f}s, async {async_wall:.2f}s, {len(passwords)} records")
+
+        # One lookup hangs; only it should miss its deadline
+        os.environ["WIFIPASS_FAKE_HANG"] = "3"
+        engine = AsyncScanEngine(make_retriever("Windows", args.workers), profile_timeout=1.0)
+        passwords, wall = timed(engine.scan)
+        check("per-profile deadline",
+              engine.status == "complete" and passwords.get("Net00003") == LOOKUP_TIMED_OUT
+              and len(passwords) == args.profiles and wall < 10,
+              f"{wall:.2f}s, Net00003={passwords.get('Net00003')!r}")
+
+        # Every worker gets stuck; the scan deadline returns what finished
+        os.environ["WIFIPASS_FAKE_HANG"] = ",".join(str(i) for i in range(10, 10 + args.workers))
+        engine = AsyncScanEngine(make_retriever("Windows", args.workers), scan_timeout=1.5)
+        passwords, wall = timed(engine.scan)
+        check("scan deadline", engine.status == "timeout" and 0 < len(passwords) < args.profiles
+              and wall < 5, f"{wall:.2f}s, {len(passwords)} partial records")
+
+        # Cancelled from another thread, as the GUI does
+        engine = AsyncScanEngine(make_retriever("Windows", args.workers))
+        threading.Timer(1.0, engine.cancel).start()
+        passwords, wall = timed(engine.scan)
+        check("cancellation", engine.status == "cancelled" and 0 < len(passwords) < args.profiles
+              and wall < 5, f"{wall:.2f}s, {len(passwords)} partial records")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark every scan backend against fake platform tools and synthetic keyfiles
+
+Reports wall time, subprocess count and peak Python memory per backend and
+profile count, and exits non-zero when a result regresses past the stored
+baselines (wall time beyond the tolerance, or more subprocesses).
+
+Usage: python benchmarks/bench_backends.py [--sizes 10,100,1000] [--latency MS]
+                                           [--backends ...] [--update-baselines]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+from wifipass_core import WiFiPasswordRetriever
+from fakes import (install_fake_tools, count_calls, write_keyfiles, write_wpa_supplicant,
+                   write_iwd_profiles)
+
+BASELINES = os.path.join(ROOT, "benchmarks", "baselines.json")
+
+# backend name -> retriever settings
+BACKENDS = {
+    "windows-show": {"os_type": "Windows"},
+    "windows-export": {"os_type": "Windows", "windows_engine": "export"},
+    "macos": {"os_type": "Darwin"},
+    "linux-nm": {"os_type": "Linux", "keyfiles": True},
+    "linux-nmcli": {"os_type": "Linux", "nmcli": True},
+    "linux-wpa": {"os_type": "Linux", "wpa_supplicant": True},
+    "linux-iwd": {"os_type": "Linux", "iwd": True},
+    "linux-all": {"os_type": "Linux", "keyfiles": True, "wpa_supplicant": True, "iwd": True},
+    "linux-iwlist": {"os_type": "Linux"},
+}
+
+
+def run_backend(name, size, latency, workdir):
+    """Run one backend scan and return its measurements"""
+    settings = BACKENDS[name]
+    log = os.path.join(workdir, f"{name}-{size}.log")
+    os.environ["WIFIPASS_FAKE_PROFILES"] = str(size)
+    os.environ["WIFIPASS_FAKE_LATENCY"] = str(latency)
+    os.environ["WIFIPASS_FAKE_LOG"] = log
+
+    retriever = WiFiPasswordRetriever(windows_engine=settings.get("windows_engine", "show"))
+    retriever.os_type = settings["os_type"]
+    if settings.get("keyfiles"):
+        retriever.nm_dir = os.path.join(workdir, f"keyfiles-{size}")
+        if not os.path.isdir(retriever.nm_dir):
+            write_keyfiles(retriever.nm_dir, size)
+    else:
+        retriever.nm_dir = os.path.join(workdir, "no-networkmanager")
+    retriever.use_nmcli = settings.get("nmcli", False)
+    retriever.wpa_supplicant_paths = []
+    if settings.get("wpa_supplicant"):
+        path = os.path.join(workdir, f"wpa_supplicant-{size}.conf")
+        if not os.path.exists(path):
+            write_wpa_supplicant(path, size)
+        retriever.wpa_supplicant_paths = [path]
+    retriever.iwd_dir = os.path.join(workdir, f"iwd-{size}" if settings.get("iwd") else "no-iwd")
+    if settings.get("iwd") and not os.path.isdir(retriever.iwd_dir):
+        write_iwd_profiles(retriever.iwd_dir, size)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    passwords = retriever.get_wifi_passwords()
+    wall = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    if "Error" in passwords:
+        raise RuntimeError(f"{name}: {passwords['Error']}")
+    return {"wall": wall, "subprocesses": count_calls(log), "peak_kb": peak / 1024.0,
+            "records": len(passwords)}
+
+
+def check(key, result, baselines, tolerance, slack):
+    """Return a list of regressions of result against its baseline"""
+    baseline = baselines.get(key)
+    if baseline is None:
+        return []
+    problems = []
+    if result["subprocesses"] > baseline["subprocesses"]:
+        problems.append(f"subprocesses {result['subprocesses']} > {baseline['subprocesses']}")
+    if result["wall"] > baseline["wall"] * (1 + tolerance) + slack:
+        problems.append(f"wall {result['wall']:.3f}s > {baseline['wall']:.3f}s +{tolerance:.0%}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scan backends with fake tools")
+    parser.add_argument("--sizes", default="10,100,1000",
+                        help="comma separated profile counts (up to 10000)")
+    parser.add_argument("--latency", type=float, default=0.0, help="per-call latency in ms")
+    parser.add_argument("--backends", default=",".join(BACKENDS),
+                        help="comma separated backends to run")
+    parser.add_argument("--baselines", default=BASELINES)
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="allowed wall time growth over the baseline (default: 0.5)")
+    parser.add_argument("--slack", type=float, default=0.05,
+                        help="absolute wall time slack in seconds for tiny runs (default: 0.05)")
+    parser.add_argument("--update-baselines", action="store_true")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    backends = args.backends.split(",")
+    baselines = {}
+    if os.path.exists(args.baselines):
+        with open(args.baselines) as f:
+            baselines = json.load(f)
+
+    failures = []
+    with tempfile.TemporaryDirectory(prefix="wifipass-bench-") as workdir:
+        bindir = install_fake_tools(os.path.join(workdir, "bin"))
+        os.environ["PATH"] = bindir + os.pathsep + os.environ.get("PATH", "")
+
+        print(f"{'backend':<15}{'profiles':>9}{'wall s':>10}{'procs':>7}{'peak KB':>10}  result")
+        for name in backends:
+            for size in sizes:
+                key = f"{name}/{size}/{args.latency:g}ms"
+                result = run_backend(name, size, args.latency / 1000.0, workdir)
+                problems = check(key, result, baselines, args.tolerance, args.slack)
+                if args.update_baselines:
+                    baselines[key] = {"wall": round(result["wall"], 4),
+                                      "subprocesses": result["subprocesses"]}
+                status = "REGRESSED: " + "; ".join(problems) if problems else "ok"
+                print(f"{name:<15}{size:>9}{result['wall']:>10.3f}{result['subprocesses']:>7}"
+                      f"{result['peak_kb']:>10.0f}  {status}")
+                failures.extend(f"{key}: {problem}" for problem in problems)
+
+    if args.update_baselines:
+        with open(args.baselines, 'w') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baselines written to {args.baselines}")
+        return 0
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark export and reload throughput and peak RSS for every export format
+
+Each format runs in its own child process so peak RSS is measured separately.
+Columnar reloads read through mmap, so the mapped file pages show up in RSS.
+Usage: python benchmarks/bench_export.py [rows]
+"""
+
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wifipass_export import WRITERS, ColumnarReader, read_ndjson_gz
+
+EXTENSIONS = {"csv": ".csv", "txt": ".txt", "ndjson_gz": ".ndjson.gz", "columnar": ".wpcol"}
+
+READERS = {
+    "ndjson_gz": read_ndjson_gz,
+    "columnar": lambda path: iter(ColumnarReader(path)),
+}
+
+
+def generate(rows):
+    """Lazily generate synthetic records"""
+    for i in range(rows):
+        yield f"Network-{i:08d}", f"pass-{i * 7919:012d}"
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def run_one(fmt, rows):
+    """Export and reload in this process and print one result line"""
+    baseline = peak_rss_mb()
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "export" + EXTENSIONS[fmt])
+        start = time.perf_counter()
+        WRITERS[fmt](generate(rows), path)
+        write_time = time.perf_counter() - start
+        size = os.path.getsize(path)
+        
+        read_time = None
+        if fmt in READERS:
+            start = time.perf_counter()
+            count = sum(1 for _ in READERS[fmt](path))
+            read_time = time.perf_counter() - start
+            assert count == rows
+    
+    reload = f"{rows / read_time:>10,.0f} rows/s" if read_time else f"{'-':>15}"
+    print(f"{fmt:>10}: write {rows / write_time:>10,.0f} rows/s  reload {reload}  "
+          f"{size / 1e6:7.1f} MB  peak RSS +{peak_rss_mb() - baseline:.1f} MB")
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == "--one":
+        run_one(sys.argv[2], int(sys.argv[3]))
+        return
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    print(f"rows: {rows:,}")
+    for fmt in WRITERS:
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--one", fmt, str(rows)], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Time the GUI side of a streamed scan without a toolkit
+
+Feeds shuffled scan batches to handle_scan_event through a stand-in window
+that records widget updates, as the event loop does, and checks that the
+table rows end up sorted and complete and that each batch renders a single
+page. The stream is repeated with a search query active, whose matches must
+stay current. Exits non-zero if any check fails.
+
+Usage: python benchmarks/bench_gui_stream.py [--rows 20000] [--batch 50] [--query 12]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wifipass_core import WiFiPasswordRetriever, SCAN_BATCH_EVENT, SCAN_DONE_EVENT
+
+
+class FakeElement:
+    def __init__(self):
+        self.updates = []
+
+    def update(self, *args, **kwargs):
+        self.updates.append((args, kwargs))
+
+
+class FakeWindow:
+    """Just enough of a PySimpleGUI window for the retriever's handlers"""
+
+    def __init__(self):
+        self.elements = {}
+
+    def __getitem__(self, key):
+        return self.elements.setdefault(key, FakeElement())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time streamed scan batches in the GUI")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=50)
+    parser.add_argument("--query", default="12")
+    args = parser.parse_args(argv)
+    failures = []
+
+    def check(name, ok, detail):
+        print(f"{name:<28}{'ok' if ok else 'FAILED'}  {detail}")
+        if not ok:
+            failures.append(name)
+
+    rng = random.Random(1)
+    passwords = {f"Net{i:06d}": f"pw{i}" for i in range(args.rows)}
+    stream = list(passwords.items())
+    rng.shuffle(stream)
+    batches = [stream[i:i + args.batch] for i in range(0, len(stream), args.batch)]
+
+    def stream_batches(query=""):
+        """Return a retriever and window fed every batch, and the time of each batch"""
+        retriever = WiFiPasswordRetriever()
+        retriever.os_type = "Windows"
+        retriever.view.filter(query)
+        window = FakeWindow()
+        times = []
+        completed = 0
+        for batch in batches:
+            completed += len(batch)
+            start = time.perf_counter()
+            retriever.handle_scan_event(window, SCAN_BATCH_EVENT, (batch, completed, args.rows))
+            times.append(time.perf_counter() - start)
+        return retriever, window, times
+
+    retriever, window, times = stream_batches()
+    check("rows sorted while streaming",
+          retriever.records.ssids == sorted(passwords)
+          and retriever.records.to_dict() == passwords,
+          f"{len(batches)} batches in {sum(times) * 1000:.0f}ms, "
+          f"first {times[0] * 1000:.2f}ms, last {times[-1] * 1000:.2f}ms")
+    pages = [kwargs["values"] for _, kwargs in window["table"].updates]
+    check("one page per batch", len(pages) == len(batches)
+          and all(0 < len(page) <= retriever.view.page_size for page in pages),
+          f"{len(pages)} renders of at most {max(map(len, pages))} rows")
+
+    start = time.perf_counter()
+    retriever.handle_scan_event(window, SCAN_DONE_EVENT, {"passwords": passwords})
+    check("scan done", retriever.records.to_dict() == passwords,
+          f"{(time.perf_counter() - start) * 1000:.0f}ms")
+
+    retriever, window, times = stream_batches(args.query)
+    expected = [i for i, ssid in enumerate(sorted(passwords)) if args.query in ssid.lower()]
+    check("filtered while streaming", retriever.view.matches == expected,
+          f"{len(expected)} matches, {len(batches)} batches in {sum(times) * 1000:.0f}ms, "
+          f"last {times[-1] * 1000:.2f}ms")
+    retriever.handle_scan_event(window, SCAN_DONE_EVENT, {"passwords": passwords})
+    check("filtered when done", retriever.view.matches == expected,
+          f"{len(retriever.view)} rows shown")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
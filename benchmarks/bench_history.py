@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark the delta scan history against storing full snapshots
+
+Simulates daily scans of many machines over months, with a few networks
+added, removed or re-keyed each day. Records them in a ScanHistory and in a
+table of full snapshots, compares the file sizes, checks as_of() against the
+simulated inventory at random times and times those lookups, replays
+changes() over a span, then checks that compaction keeps every answer
+after its horizon.
+
+Usage: python benchmarks/bench_history.py [--machines 100] [--days 180] [--networks 300]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from wifipass_history import OP_REMOVED, ScanHistory
+
+DAY = 24 * 60 * 60
+START = 1700000000.0
+
+
+def simulate(rng, days, networks):
+    """Yield (taken_at, inventory) for one machine's daily scans"""
+    inventory = {f"Net{i:05d}": f"secret-{i}" for i in range(networks)}
+    next_id = networks
+    for day in range(days):
+        for _ in range(rng.randint(0, 3)):
+            change = rng.random()
+            if change < 0.4:
+                inventory[f"Net{next_id:05d}"] = f"secret-{next_id}"
+                next_id += 1
+            elif change < 0.6 and inventory:
+                del inventory[rng.choice(sorted(inventory))]
+            elif inventory:
+                ssid = rng.choice(sorted(inventory))
+                inventory[ssid] = f"rotated-{day}-{ssid}"
+        yield START + day * DAY, dict(inventory)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the delta scan history")
+    parser.add_argument("--machines", type=int, default=100)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--networks", type=int, default=300)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args(argv)
+    rng = random.Random(42)
+    failures = []
+
+    def check(name, ok, detail):
+        print(f"{name:<26}{'ok' if ok else 'FAILED'}  {detail}")
+        if not ok:
+            failures.append(name)
+
+    with tempfile.TemporaryDirectory(prefix="wifipass-bench-") as workdir:
+        history = ScanHistory(os.path.join(workdir, "history.db"))
+        snapshots_path = os.path.join(workdir, "snapshots.db")
+        snapshots = sqlite3.connect(snapshots_path)
+        snapshots.execute("CREATE TABLE rows (machine TEXT, taken_at REAL, ssid TEXT, password TEXT)")
+
+        truth = {}
+        start = time.perf_counter()
+        for m in range(args.machines):
+            machine = f"host{m:04d}"
+            truth[machine] = []
+            for taken_at, inventory in simulate(rng, args.days, args.networks):
+                history.record(inventory, machine, taken_at)
+                snapshots.executemany("INSERT INTO rows VALUES (?, ?, ?, ?)",
+                                      ((machine, taken_at, s, p) for s, p in inventory.items()))
+                truth[machine].append((taken_at, inventory))
+        record_time = time.perf_counter() - start
+        snapshots.commit()
+        snapshots.close()
+
+        scans = args.machines * args.days
+        history_size = os.path.getsize(history.path)
+        snapshots_size = os.path.getsize(snapshots_path)
+        print(f"recorded {scans} scans in {record_time:.1f}s "
+              f"({record_time / scans * 1000:.2f}ms each)")
+        check("size vs full snapshots", history_size * 5 < snapshots_size,
+              f"history {history_size / 1e6:.1f}MB, snapshots {snapshots_size / 1e6:.1f}MB "
+              f"({snapshots_size / history_size:.0f}x)")
+
+        queries = [(rng.choice(list(truth)), rng.randrange(args.days)) for _ in range(args.queries)]
+        mismatches = 0
+        start = time.perf_counter()
+        for machine, day in queries:
+            taken_at, expected = truth[machine][day]
+            # Half a day later still answers with that day's scan
+            if history.as_of(taken_at + DAY / 2, machine) != expected:
+                mismatches += 1
+        elapsed = time.perf_counter() - start
+        check("as_of", mismatches == 0,
+              f"{len(queries)} lookups, {elapsed / len(queries) * 1000:.2f}ms each, "
+              f"{mismatches} wrong")
+
+        # Replaying the changes of a span over the scan before it gives the scan at its end
+        machine = next(iter(truth))
+        first, last = args.days // 3, args.days // 3 + 10
+        replayed = dict(truth[machine][first - 1][1])
+        rows = list(history.changes(machine, since=truth[machine][first][0],
+                                    until=truth[machine][last][0]))
+        for _, ssid, op, password in rows:
+            if op == OP_REMOVED:
+                del replayed[ssid]
+            else:
+                replayed[ssid] = password
+        check("changes", replayed == truth[machine][last][1],
+              f"{len(rows)} changes over {last - first + 1} scans")
+
+        horizon_day = args.days // 2
+        horizon = START + horizon_day * DAY
+        removed = sum(history.compact(horizon, machine) for machine in truth)
+        history.vacuum()
+        mismatches = 0
+        for machine, day in queries:
+            taken_at, expected = truth[machine][max(day, horizon_day - 1)]
+            if history.as_of(max(taken_at, horizon - DAY) + DAY / 2, machine) != expected:
+                mismatches += 1
+        check("compaction", mismatches == 0,
+              f"{removed} scans folded, {os.path.getsize(history.path) / 1e6:.1f}MB after, "
+              f"{mismatches} wrong")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Check multi-adapter scanning against fake tools simulating several adapters
+
+With WIFIPASS_FAKE_INTERFACES adapters, runs the Windows (per-profile and
+export) and macOS backends on both scan engines and checks that every
+profile is found once, tagged with exactly the interfaces holding it, that
+the interfaces are enumerated by a single call and that no profile is looked
+up twice. The Windows records must carry the authentication and cipher. Also checks the listing parsers against the captured fixtures,
+that the macOS device listings run concurrently, and that the CLI writes the
+tags. Exits non-zero if any check fails.
+
+Usage: python benchmarks/bench_interfaces.py [--profiles 60] [--interfaces 3]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+from wifipass_core import WiFiPasswordRetriever, parse_wifi_devices
+from wifipass_async import AsyncScanEngine
+from wifipass_netsh import parse_show_profiles_by_interface
+from fakes import install_fake_tools
+
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures")
+
+BACKENDS = {
+    "windows-show": ("Windows", "show"),
+    "windows-export": ("Windows", "export"),
+    "macos": ("Darwin", "show"),
+}
+
+
+def on_adapter(i, k, adapters):
+    """Mirror of the fake tools' rule for which adapters hold profile i"""
+    return adapters == 1 or i % 3 == 1 or (i % 3 == 0) == (k == 0)
+
+
+def expected_tags(os_type, profiles, adapters):
+    """SSID to the interface names the fake tools list it on"""
+    def name(k):
+        if os_type == "Darwin":
+            return f"en{k}"
+        return "Wi-Fi" if k == 0 else f"Wi-Fi {k + 1}"
+    return {f"Net{i:05d}": tuple(name(k) for k in range(adapters) if on_adapter(i, k, adapters))
+            for i in range(profiles)}
+
+
+def expected_password(i, os_type):
+    if i % 10 == 0:
+        if os_type == "Darwin":
+            return "No Password or Not Available"
+        return "Enterprise Authentication - Not Available"
+    return f"secret-{i}"
+
+
+def read_log(log):
+    if not os.path.exists(log):
+        return []
+    with open(log) as f:
+        return f.read().splitlines()
+
+
+def lookups(calls):
+    """Number of lookups per profile in the fake tool log"""
+    counts = Counter()
+    for call in calls:
+        if call.startswith("netsh wlan show profile name="):
+            counts[call.split("name=", 1)[1].split(" ", 1)[0].strip('"')] += 1
+        elif call.startswith("security find-generic-password"):
+            counts[call.split(" -a ", 1)[1].split(" ", 1)[0]] += 1
+    return counts
+
+
+def listing_calls(calls):
+    """Calls enumerating the interfaces; the bulk export covers all of them at once"""
+    return sum(1 for call in calls if call.startswith(("netsh wlan show profiles",
+                                                       "netsh wlan export profile",
+                                                       "networksetup -listallhardwareports")))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check multi-adapter scanning")
+    parser.add_argument("--profiles", type=int, default=60)
+    parser.add_argument("--interfaces", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=200.0,
+                        help="per-call latency of the concurrency check in ms")
+    args = parser.parse_args(argv)
+    failures = []
+
+    def check(name, ok, detail):
+        print(f"{name:<34}{'ok' if ok else 'FAILED'}  {detail}")
+        if not ok:
+            failures.append(name)
+
+    with open(os.path.join(FIXTURES, "netsh", "en_two_adapters_profiles.txt"),
+              encoding="utf-8") as f:
+        listings = parse_show_profiles_by_interface(f.read())
+    check("netsh listing fixture", listings == [
+        ("Wi-Fi", ["HomeNet", "CorpNet", "Cafe Guest"]), ("Wi-Fi 2", ["HomeNet", "Lab 5GHz"])],
+          f"{listings}")
+    with open(os.path.join(FIXTURES, "keychain", "hardware_ports.txt"), encoding="utf-8") as f:
+        devices = parse_wifi_devices(f.read())
+    check("hardware ports fixture", devices == ["en1", "en7"], f"{devices}")
+
+    with tempfile.TemporaryDirectory(prefix="wifipass-bench-") as workdir:
+        bindir = install_fake_tools(os.path.join(workdir, "bin"))
+        os.environ["PATH"] = bindir + os.pathsep + os.environ.get("PATH", "")
+        os.environ["WIFIPASS_FAKE_PROFILES"] = str(args.profiles)
+        os.environ["WIFIPASS_FAKE_INTERFACES"] = str(args.interfaces)
+        os.environ["WIFIPASS_FAKE_LATENCY"] = "0"
+        os.environ.pop("WIFIPASS_FAKE_HANG", None)
+
+        for name, (os_type, windows_engine) in BACKENDS.items():
+            tags = expected_tags(os_type, args.profiles, args.interfaces)
+            passwords = {f"Net{i:05d}": expected_password(i, os_type)
+                         for i in range(args.profiles)}
+            for engine in ("thread", "async"):
+                log = os.path.join(workdir, f"{name}-{engine}.log")
+                os.environ["WIFIPASS_FAKE_LOG"] = log
+                retriever = WiFiPasswordRetriever(windows_engine=windows_engine)
+                retriever.os_type = os_type
+                if engine == "thread":
+                    found = retriever.get_wifi_passwords()
+                else:
+                    found = AsyncScanEngine(retriever).scan()
+                retriever.set_passwords(found)
+                records = {record.ssid: record.interfaces for record in retriever.records}
+                calls = read_log(log)
+                repeated = {ssid: n for ssid, n in lookups(calls).items() if n > 1}
+                check(f"{name} {engine}",
+                      found == passwords and records == tags and not repeated
+                      and listing_calls(calls) == 1,
+                      f"{len(found)} records on {len(retriever.wifi_interfaces)} interfaces, "
+                      f"{len(calls)} calls, {len(repeated)} profiles looked up twice")
+                if os_type == "Windows":
+                    security = Counter((record.auth, record.cipher)
+                                       for record in retriever.records)
+                    check(f"{name} {engine} security",
+                          sum(security.values()) == args.profiles and None not in
+                          {value for pair in security for value in pair}, f"{dict(security)}")
+
+        # A single adapter keeps the previous netsh commands
+        os.environ["WIFIPASS_FAKE_INTERFACES"] = "1"
+        log = os.path.join(workdir, "single.log")
+        os.environ["WIFIPASS_FAKE_LOG"] = log
+        retriever = WiFiPasswordRetriever()
+        retriever.os_type = "Windows"
+        found = retriever.get_wifi_passwords()
+        calls = read_log(log)
+        check("single adapter", len(found) == args.profiles
+              and not any("interface=" in call for call in calls),
+              f"{len(found)} records, {len(calls)} calls")
+        os.environ["WIFIPASS_FAKE_INTERFACES"] = str(args.interfaces)
+
+        # Listings of the macOS devices overlap instead of adding up
+        os.environ["WIFIPASS_FAKE_LATENCY"] = str(args.latency / 1000.0)
+        os.environ["WIFIPASS_FAKE_LOG"] = os.path.join(workdir, "latency.log")
+        retriever = WiFiPasswordRetriever()
+        retriever.os_type = "Darwin"
+        start = time.perf_counter()
+        retriever._list_macos_profiles()
+        wall = time.perf_counter() - start
+        serial = (1 + args.interfaces) * args.latency / 1000.0
+        check("concurrent device listings", wall < serial * 0.8,
+              f"{wall:.2f}s for {args.interfaces} devices, {serial:.2f}s if serial")
+        os.environ["WIFIPASS_FAKE_LATENCY"] = "0"
+
+        # The CLI tags NDJSON records; it runs on this OS, so force the Windows backend
+        probe = ("import platform, runpy, sys; platform.system = lambda: 'Windows'; "
+                 "sys.argv = ['wifipass-cli.py']; "
+                 "runpy.run_path('wifipass-cli.py', run_name='__main__')")
+        output = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL, universal_newlines=True).stdout
+        lines = [json.loads(line) for line in output.splitlines()]
+        tags = expected_tags("Windows", args.profiles, args.interfaces)
+        check("cli interfaces", len(lines) == args.profiles
+              and all(tuple(line.get("interfaces", ())) == tags[line["ssid"]] for line in lines),
+              f"{len(lines)} NDJSON records")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
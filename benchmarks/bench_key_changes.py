@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Check that rotated keys are never served from the scan store as fresh
+
+Drives the Windows backend through an injected netsh runner backed by an
+in-memory inventory that also writes the per-interface profile XML files,
+as the WLAN service does. Rotates a key between scans and checks that a new
+process's store-backed scan() returns the new key, and that without a
+readable profile folder stored results are not treated as fresh. Also checks
+that rescans on both engines look up rotated keys, save their result to the
+store, and look up every profile when asked to or once the full rescan
+interval has passed. Exits non-zero if any check fails.
+
+Usage: python benchmarks/bench_key_changes.py
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from wifipass_core import WiFiPasswordRetriever
+from wifipass_async import AsyncScanEngine
+from wifipass_store import ScanStore
+
+INTERFACE_GUID = "{6F3A1C2B-0000-4000-8000-000000000001}"
+
+PROFILE_XML = ('<?xml version="1.0"?>\n<WLANProfile xmlns="http://www.microsoft.com/networking/'
+               'WLAN/profile/v1"><name>{name}</name><SSIDConfig><SSID><name>{name}</name></SSID>'
+               '</SSIDConfig><MSM><security><authEncryption><authentication>WPA2PSK'
+               '</authentication><encryption>AES</encryption><useOneX>false</useOneX>'
+               '</authEncryption><sharedKey><keyType>passPhrase</keyType><protected>false'
+               '</protected><keyMaterial>{key}</keyMaterial></sharedKey></security></MSM>'
+               '</WLANProfile>')
+
+
+class FakeWlan:
+    """Saved profiles answered through netsh and mirrored into profile XML files"""
+
+    def __init__(self, folder, profiles):
+        self.folder = os.path.join(folder, "Interfaces")
+        self.profiles = {}
+        self.calls = []
+        for name, key in profiles.items():
+            self.save(name, key)
+
+    def path(self, name):
+        return os.path.join(self.folder, INTERFACE_GUID, f"{{{name}}}.xml")
+
+    def save(self, name, key):
+        """Save or re-key a profile; the file's mtime moves like the service's does"""
+        self.profiles[name] = key
+        os.makedirs(os.path.dirname(self.path(name)), exist_ok=True)
+        with open(self.path(name), 'w') as f:
+            f.write(PROFILE_XML.format(name=name, key=key))
+        # Coarse file system clocks could keep the old mtime
+        stamp = time.time_ns() + len(self.calls) + 1
+        os.utime(self.path(name), ns=(stamp, stamp))
+
+    def run(self, cmd):
+        self.calls.append(cmd)
+        if cmd[:4] == ['netsh', 'wlan', 'show', 'profiles']:
+            return "Profiles on interface Wi-Fi:\n\nUser profiles\n-------------\n" + "".join(
+                f"    All User Profile     : {name}\n" for name in self.profiles)
+        if cmd[:4] == ['netsh', 'wlan', 'show', 'profile']:
+            name = cmd[4].split("=", 1)[1].strip('"')
+            if name not in self.profiles:
+                raise subprocess.CalledProcessError(1, cmd)
+            return (f"Profile {name} on interface Wi-Fi:\n\nSecurity settings\n"
+                    f"-----------------\n    Authentication         : WPA2-Personal\n"
+                    f"    Security key           : Present\n"
+                    f"    Key Content            : {self.profiles[name]}\n")
+        raise subprocess.CalledProcessError(1, cmd)
+
+    async def run_async(self, cmd):
+        return self.run(cmd)
+
+    def lookups(self):
+        return sum(1 for cmd in self.calls if cmd[:4] == ['netsh', 'wlan', 'show', 'profile'])
+
+
+def make_retriever(wlan, store=None):
+    retriever = WiFiPasswordRetriever(runner=wlan.run, store=store)
+    retriever.os_type = "Windows"
+    retriever.wlan_profiles_dir = wlan.folder
+    return retriever
+
+
+def main():
+    failures = []
+
+    def check(name, ok, detail):
+        print(f"{name:<36}{'ok' if ok else 'FAILED'}  {detail}")
+        if not ok:
+            failures.append(name)
+
+    profiles = {f"Net{i:03d}": f"secret-{i}" for i in range(20)}
+    with tempfile.TemporaryDirectory(prefix="wifipass-bench-") as workdir:
+        wlan = FakeWlan(workdir, profiles)
+        store = ScanStore(os.path.join(workdir, "scans.db"))
+
+        first = make_retriever(wlan, store).scan()
+        before = wlan.lookups()
+        cached = make_retriever(wlan, store).scan()
+        check("unchanged keys come from the store", cached == first and wlan.lookups() == before,
+              f"{wlan.lookups() - before} lookups")
+
+        # A key rotated between two processes must not come back stale
+        wlan.save("Net007", "rotated")
+        passwords = make_retriever(wlan, store).scan()
+        check("rotated key is not served stale", passwords.get("Net007") == "rotated",
+              f"Net007={passwords.get('Net007')!r}")
+
+        # Without the profile folder no key change would be seen, so nothing is fresh
+        retriever = make_retriever(wlan, store)
+        retriever.wlan_profiles_dir = os.path.join(workdir, "missing")
+        before = wlan.lookups()
+        retriever.scan()
+        check("no key marker, no fresh results",
+              retriever.backend_fingerprint() is None and wlan.lookups() - before == len(profiles),
+              f"{wlan.lookups() - before} lookups")
+
+        # Rescans look up new profiles and the ones whose key file changed
+        for engine in ("thread", "async"):
+            store = ScanStore(os.path.join(workdir, f"rescan-{engine}.db"))
+            retriever = make_retriever(wlan, store)
+
+            def rescan(full=None):
+                if engine == "thread":
+                    return retriever.rescan(full)
+                return AsyncScanEngine(retriever, runner=wlan.run_async).rescan(
+                    dict(retriever.passwords), full)
+
+            retriever.set_passwords(retriever.get_wifi_passwords())
+            wlan.save("Net003", f"rotated-{engine}")
+            wlan.save(f"New-{engine}", "added")
+            before = wlan.lookups()
+            delta = rescan()
+            check(f"{engine} rescan finds rotated key",
+                  delta["changed"] == {"Net003": f"rotated-{engine}"}
+                  and list(delta["added"]) == [f"New-{engine}"] and wlan.lookups() - before == 2,
+                  f"{wlan.lookups() - before} lookups, ~{list(delta['changed'])}")
+            retriever.apply_delta(delta)
+
+            before = wlan.lookups()
+            stored = make_retriever(wlan, store).scan()
+            check(f"{engine} rescan result is stored",
+                  stored == dict(retriever.passwords) and wlan.lookups() == before,
+                  f"{wlan.lookups() - before} lookups")
+
+            before = wlan.lookups()
+            delta = rescan(full=True)
+            check(f"{engine} full rescan", wlan.lookups() - before == len(wlan.profiles)
+                  and not any(delta.values()), f"{wlan.lookups() - before} lookups")
+
+            before = wlan.lookups()
+            rescan()
+            unchanged = wlan.lookups() - before
+            retriever.full_rescan_interval = 0
+            rescan()
+            check(f"{engine} full rescan interval",
+                  unchanged == 0 and wlan.lookups() - before == len(wlan.profiles),
+                  f"{unchanged} lookups unchanged, {wlan.lookups() - before} once due")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Check the batched macOS backend against captured command output and time the dump parser
+
+Replays the fixtures in benchmarks/fixtures/keychain through an injected
+runner, so the macOS code paths run on any platform: the keychain dump path,
+and the per-network fallback used when the dump fails, and streamed inside a
+caller's scan stage without opening another. The captured ports
+have two Wi-Fi devices listing the same networks, each looked up once. Exits non-zero if a
+result differs from the expected inventory.
+
+Usage: python benchmarks/bench_keychain.py [--items 10000]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from wifipass_core import WiFiPasswordRetriever
+from wifipass_keychain import parse_keychain_dump, airport_passwords, ITEM_NOT_FOUND
+from wifipass_trace import ScanTrace
+
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures", "keychain")
+
+EXPECTED = {
+    "HomeNet": "hunter22",
+    "Café Wi-Fi": "crème brûlée",
+    "CorpNet": "Password access requires admin privileges",
+    "Lab 5GHz": "tab\there",
+    "Open Cafe": "No Password or Not Available",
+}
+
+# Without the dump, a denied item surfaces as the lookup's error instead
+EXPECTED_FALLBACK = dict(EXPECTED, CorpNet="Not Available (Admin privileges required)")
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def fixture_runner(calls, dump_fails=False):
+    """Runner answering from the captured outputs"""
+    dump = read_fixture("system_dump.txt")
+    ports = read_fixture("hardware_ports.txt")
+    preferred = read_fixture("preferred_networks.txt")
+    secrets = airport_passwords(parse_keychain_dump(dump))
+
+    def run(cmd):
+        calls.append(cmd)
+        if cmd[:2] == ["networksetup", "-listallhardwareports"]:
+            return ports
+        if cmd[0] == "networksetup":
+            # Both Wi-Fi devices of the fixture list the same networks
+            return preferred
+        if cmd[:2] == ["security", "dump-keychain"]:
+            if dump_fails:
+                raise subprocess.CalledProcessError(51, cmd)
+            return dump
+        if cmd[:2] == ["security", "find-generic-password"]:
+            ssid = cmd[cmd.index("-a") + 1]
+            if ssid not in secrets:
+                raise subprocess.CalledProcessError(ITEM_NOT_FOUND, cmd)
+            if secrets[ssid] is None:
+                raise subprocess.CalledProcessError(128, cmd)
+            return secrets[ssid] + "\n"
+        raise subprocess.CalledProcessError(1, cmd)
+    return run
+
+
+def synthetic_dump(count):
+    """A dump of count Wi-Fi items shaped like the captured one"""
+    template = read_fixture("system_dump.txt").split("keychain:", 2)[1]
+    return "".join("keychain:" + template.replace("HomeNet", f"Net{i:05d}") for i in range(count))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check and time the batched keychain backend")
+    parser.add_argument("--items", type=int, default=10000, help="items in the synthetic dump")
+    args = parser.parse_args(argv)
+    failures = 0
+
+    for name, dump_fails, expected, expected_calls in (
+            ("keychain dump", False, EXPECTED, 4),
+            ("per-network fallback", True, EXPECTED_FALLBACK, 4 + len(EXPECTED))):
+        calls = []
+        retriever = WiFiPasswordRetriever(runner=fixture_runner(calls, dump_fails))
+        retriever.os_type = "Darwin"
+        passwords = retriever.get_wifi_passwords()
+        ok = passwords == expected and len(calls) == expected_calls
+        failures += not ok
+        print(f"{name:<22}{'ok' if ok else 'FAILED'}  {len(calls)} commands")
+        for ssid in sorted(set(passwords) | set(expected)):
+            if passwords.get(ssid) != expected.get(ssid):
+                print(f"    {ssid!r}: got {passwords.get(ssid)!r}, expected {expected.get(ssid)!r}")
+
+    # Streamed as the GUI and CLI do, inside their own scan stage
+    trace = ScanTrace()
+    retriever = WiFiPasswordRetriever(runner=fixture_runner([], False), trace=trace)
+    retriever.os_type = "Darwin"
+    with trace.stage("scan", backend=retriever.backend_name()):
+        passwords = dict(retriever.iter_wifi_passwords())
+    scans = trace.stage_totals()["scan"][0]
+    ok = passwords == EXPECTED and scans == 1 and retriever.full_lookup_at is not None
+    failures += not ok
+    print(f"{'streamed':<22}{'ok' if ok else 'FAILED'}  {scans} scan stage(s)")
+
+    dump = synthetic_dump(args.items)
+    start = time.perf_counter()
+    passwords = airport_passwords(parse_keychain_dump(dump))
+    elapsed = time.perf_counter() - start
+    print(f"dump parse            {len(passwords)} items in {elapsed:.3f}s "
+          f"({len(passwords) / elapsed:,.0f} items/s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
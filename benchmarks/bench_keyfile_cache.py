@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark cold vs. cached NetworkManager keyfile scans on synthetic keyfiles
+
+Also times the first scan of a new process whose cache starts from the
+entries saved in the scan store, and exits non-zero if it re-reads any.
+
+Usage: python benchmarks/bench_keyfile_cache.py [keyfiles]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wifipass_core import WiFiPasswordRetriever
+from wifipass_store import ScanStore
+from fakes import write_keyfiles
+
+
+def timed_scan(retriever):
+    start = time.perf_counter()
+    result = retriever._get_linux_wifi_passwords()
+    return time.perf_counter() - start, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    with tempfile.TemporaryDirectory() as folder, tempfile.TemporaryDirectory() as workdir:
+        write_keyfiles(folder, count)
+        store = ScanStore(os.path.join(workdir, "scans.db"))
+        retriever = WiFiPasswordRetriever(store=store)
+        retriever.nm_dir = folder
+        
+        cold, first = timed_scan(retriever)
+        warm, second = timed_scan(retriever)
+        assert first == second
+        
+        # Touch a single keyfile and rescan
+        with open(os.path.join(folder, "conn00001.nmconnection"), 'a') as f:
+            f.write("\n")
+        touched, third = timed_scan(retriever)
+        
+        # A new process starts from the entries saved in the store
+        restarted = WiFiPasswordRetriever(store=store)
+        restarted.nm_dir = folder
+        persisted, fourth = timed_scan(restarted)
+        
+        print(f"keyfiles : {count}")
+        print(f"cold     : {cold * 1000:.1f} ms")
+        print(f"cached   : {warm * 1000:.1f} ms")
+        print(f"1 touched: {touched * 1000:.1f} ms")
+        print(f"persisted: {persisted * 1000:.1f} ms")
+        print(f"cache    : {retriever.keyfile_cache.stats()}")
+        ok = fourth == third and restarted.keyfile_cache.misses == 0
+        print(f"restart  : {'ok' if ok else 'FAILED'}  {restarted.keyfile_cache.stats()}")
+        return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
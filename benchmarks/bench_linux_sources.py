@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Check which Linux source is chosen for NetworkManager's keyfiles, and its cost
+
+NetworkManager's keyfile folder is usually listable by anyone while the
+keyfiles are root-only; nmcli must then be preferred over the folder. Root
+reads everything, so when run as root a regular user is simulated, reading
+keyfiles by their mode bits. Also times source detection over a large
+keyfile folder. Exits non-zero if any check fails.
+
+Usage: python benchmarks/bench_linux_sources.py [--profiles 5000]
+"""
+
+import argparse
+import os
+import stat
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+import wifipass_linux
+from wifipass_linux import detect_linux_sources
+from fakes import install_fake_tools, write_keyfiles
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the Linux source detection")
+    parser.add_argument("--profiles", type=int, default=5000)
+    args = parser.parse_args(argv)
+    failures = []
+
+    def check(name, ok, detail):
+        print(f"{name:<32}{'ok' if ok else 'FAILED'}  {detail}")
+        if not ok:
+            failures.append(name)
+
+    if os.geteuid() == 0:
+        access = os.access
+
+        def mode_access(path, mode):
+            if mode & os.R_OK and os.path.isfile(path) and not os.stat(path).st_mode & stat.S_IRUSR:
+                return False
+            return access(path, mode)
+
+        wifipass_linux.os.access = mode_access
+        wifipass_linux.os.geteuid = lambda: 1000
+
+    with tempfile.TemporaryDirectory(prefix="wifipass-bench-") as workdir:
+        bindir = install_fake_tools(os.path.join(workdir, "bin"))
+        nm_dir = os.path.join(workdir, "nm")
+        write_keyfiles(nm_dir, args.profiles)
+        missing = os.path.join(workdir, "missing")
+
+        def detect(use_nmcli):
+            return detect_linux_sources(nm_dir, [], missing, use_nmcli)
+
+        path = os.environ.get("PATH", "")
+        os.environ["PATH"] = bindir + os.pathsep + path
+        try:
+            start = time.perf_counter()
+            sources = detect(True)
+            elapsed = time.perf_counter() - start
+            check("readable keyfiles", sources == (["networkmanager"], []),
+                  f"{sources}, detected in {elapsed * 1000:.1f}ms over {args.profiles} keyfiles")
+
+            last = sorted(os.listdir(nm_dir))[-1]
+            os.chmod(os.path.join(nm_dir, last), 0)
+            sources = detect(True)
+            check("root-only keyfile, nmcli", sources == (["nmcli"], []), f"{sources}")
+            sources = detect(False)
+            check("root-only keyfile, no nmcli", sources == (["networkmanager"], []),
+                  f"{sources}")
+        finally:
+            os.environ["PATH"] = path
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark the fleet merge over a synthetic corpus of exports
+
+Usage: python benchmarks/bench_merge.py [hosts] [networks_per_host]
+"""
+
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wifipass_merge import merge_exports
+
+XML_TEMPLATE = """<?xml version="1.0"?>
+<WLANProfile xmlns="http://www.microsoft.com/networking/WLAN/profile/v1">
+	<name>{ssid}</name>
+	<SSIDConfig><SSID><name>{ssid}</name></SSID></SSIDConfig>
+	<MSM><security>
+		<authEncryption><authentication>WPA2PSK</authentication><encryption>AES</encryption><useOneX>false</useOneX></authEncryption>
+		<sharedKey><keyType>passPhrase</keyType><protected>false</protected><keyMaterial>{password}</keyMaterial></sharedKey>
+	</security></MSM>
+</WLANProfile>
+"""
+
+
+def write_corpus(root, hosts, per_host, seed=1):
+    """Write a CSV, a TXT and a few profile XMLs per host drawn from a shared pool of networks"""
+    rng = random.Random(seed)
+    pool = [(f"Net{i:05d}", f"secret{i}") for i in range(per_host * 20)]
+    files = 0
+    for h in range(hosts):
+        folder = os.path.join(root, f"host{h:04d}")
+        os.makedirs(folder)
+        networks = sorted(rng.sample(pool, per_host))
+        with open(os.path.join(folder, "WiFi_Passwords.csv"), 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['S.No.', 'SSID', 'Password'])
+            writer.writerows([str(i), s, p] for i, (s, p) in enumerate(networks, 1))
+        with open(os.path.join(folder, "WiFi_Passwords.txt"), 'w', encoding='utf-8') as f:
+            f.write("Wi-Fi Password Report\n\n" + "=" * 60 + "\n")
+            f.writelines(f"{i}. {s}: {p}\n" for i, (s, p) in enumerate(networks, 1))
+        for ssid, password in networks[:3]:
+            with open(os.path.join(folder, f"Wi-Fi-{ssid}.xml"), 'w', encoding='utf-8') as f:
+                f.write(XML_TEMPLATE.format(ssid=ssid, password=password))
+        files += 5
+    return files
+
+
+def main():
+    hosts = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    per_host = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    with tempfile.TemporaryDirectory() as root:
+        files = write_corpus(root, hosts, per_host)
+        print(f"corpus   : {files} files from {hosts} hosts")
+        results = {}
+        for label, workers in (("serial", 1), (f"pool x{os.cpu_count()}", os.cpu_count())):
+            start = time.perf_counter()
+            merged = merge_exports(root, workers)
+            results[label] = merged
+            print(f"{label:>9}: {time.perf_counter() - start:.2f}s, {len(merged)} unique networks")
+        assert len(set(map(len, results.values()))) == 1
+
+
+if __name__ == "__main__":
+    main()
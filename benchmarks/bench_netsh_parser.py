@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Throughput of the single-pass netsh profile parser over the fixture corpus
+
+Also checks that output captured in the OEM code page (cp850, as netsh
+writes on a French console) parses once decoded in it, and exits non-zero
+if it doesn't.
+
+Usage: python benchmarks/bench_netsh_parser.py [seconds]
+"""
+
+import glob
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from wifipass_netsh import parse_show_profile, netsh_profile_password
+
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures", "netsh")
+
+# Fixtures captured in an OEM code page rather than UTF-8
+OEM_FIXTURE = os.path.join(FIXTURES, "fr_personal_cp850.txt")
+
+
+def legacy_password(output):
+    """The previous multi-scan extraction, kept for comparison"""
+    if 'Authentication' in output and 'WPA2-Enterprise' in output:
+        return 'Enterprise Authentication - Not Available'
+    for line in output.split('\n'):
+        if 'Key Content' in line:
+            return line.split(': ')[1].strip()
+    return 'No Password or Not Available'
+
+
+def rate(func, outputs, seconds):
+    """Return calls per second of func over outputs for roughly the given time"""
+    count = 0
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        for output in outputs:
+            func(output)
+        count += len(outputs)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    outputs = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "*.txt"))):
+        if not os.path.basename(path).endswith("_profiles.txt"):
+            with open(path, encoding="cp850" if path == OEM_FIXTURE else "utf-8") as f:
+                outputs.append(f.read())
+    
+    # Decoded in the ANSI code page instead, the accented labels no longer match
+    with open(OEM_FIXTURE, 'rb') as f:
+        raw = f.read()
+    profile = parse_show_profile(raw.decode("cp850").replace('\r\n', '\n'))
+    ansi = parse_show_profile(raw.decode("cp1252", errors="replace").replace('\r\n', '\n'))
+    ok = (profile["ssid"] == "Café Été" and netsh_profile_password(profile) == "clé-àçèñ£"
+          and netsh_profile_password(ansi) != "clé-àçèñ£")
+    print(f"oem fixture     : {'ok' if ok else 'FAILED'}  "
+          f"{profile['ssid']!r} -> {netsh_profile_password(profile)!r}, "
+          f"as cp1252 {netsh_profile_password(ansi)!r}")
+    
+    print(f"fixtures        : {len(outputs)} profile outputs")
+    print(f"structured parse: {rate(parse_show_profile, outputs, seconds):>10,.0f} parses/s")
+    print(f"parse + classify: {rate(lambda o: netsh_profile_password(parse_show_profile(o)), outputs, seconds):>10,.0f} parses/s")
+    print(f"legacy scans    : {rate(legacy_password, outputs, seconds):>10,.0f} parses/s (English only)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
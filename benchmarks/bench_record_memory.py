@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Measure per-row memory of table rows: numbered list-of-lists vs. RecordSet columns
+
+Usage: python benchmarks/bench_record_memory.py [rows]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wifipass_records import NetworkRecord, RecordSet
+
+
+def build_lists(passwords):
+    """The previous row layout: [row number, ssid, password] lists"""
+    pwds = [list(x) for x in passwords.items()]
+    for i, p in enumerate(pwds, 1):
+        p.insert(0, str(i))
+    return pwds
+
+
+def build_slotted(passwords):
+    return [NetworkRecord(ssid, password, source="netsh") for ssid, password in passwords.items()]
+
+
+def build_recordset(passwords):
+    return RecordSet.from_mapping(passwords, source="netsh")
+
+
+def measure(build, passwords):
+    """Return (bytes per row, allocated blocks, seconds) for one build"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    start = time.perf_counter()
+    rows = build(passwords)
+    elapsed = time.perf_counter() - start
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, 'filename')
+    size = sum(stat.size_diff for stat in stats)
+    blocks = sum(stat.count_diff for stat in stats)
+    del rows
+    return size / len(passwords), blocks, elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    # Strings are shared with the mapping in every layout, so only row overhead is measured
+    passwords = OrderedDict((f"Network-{i:08d}", f"pass-{i:010d}") for i in range(count))
+    print(f"rows: {count:,}")
+    for label, build in (("list-of-lists", build_lists), ("slotted records", build_slotted),
+                         ("RecordSet", build_recordset)):
+        per_row, blocks, elapsed = measure(build, passwords)
+        print(f"{label:>16}: {per_row:6.1f} bytes/row  {blocks:>9,} blocks  {elapsed * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark per-keystroke SSID filtering with the n-gram index vs. a linear scan
+
+Exits non-zero if the index and the scan disagree on the matches of the query.
+
+Usage: python benchmarks/bench_search_index.py [rows] [query]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wifipass_records import RecordSet
+from wifipass_view import TableView
+
+WORDS = ["home", "office", "cafe", "guest", "net", "wifi", "lab", "corp", "floor", "airport",
+         "hotel", "library", "mesh", "iot", "printer", "5g", "lobby", "west", "east", "hq"]
+
+
+def make_records(count, seed=1):
+    """Generate a record set with plausible SSIDs"""
+    rng = random.Random(seed)
+    return RecordSet.from_mapping({f"{rng.choice(WORDS).title()}{rng.choice(WORDS)}-{i:06d}": f"pw{i}"
+                                   for i in range(count)})
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    query = sys.argv[2] if len(sys.argv) > 2 else "guest-0012"
+    records = make_records(count)
+    view = TableView(records)
+    
+    start = time.perf_counter()
+    view.index
+    print(f"rows          : {len(records)}")
+    print(f"index build   : {(time.perf_counter() - start) * 1000:.1f} ms")
+    
+    indexed = []
+    for n in range(1, len(query) + 1):
+        start = time.perf_counter()
+        view.filter(query[:n])
+        view.page()
+        indexed.append(time.perf_counter() - start)
+    
+    linear = []
+    for n in range(1, len(query) + 1):
+        start = time.perf_counter()
+        needle = query[:n].lower()
+        matches = [ssid for ssid in records.ssids if needle in ssid.lower()]
+        linear.append(time.perf_counter() - start)
+    
+    indexed_ssids = [records.ssids[i] for i in view.matches]
+    ok = indexed_ssids == matches
+    print(f"keystrokes    : {len(query)} ('{query}' -> {len(view)} matches)")
+    print(f"same matches  : {'ok' if ok else 'FAILED'}  "
+          f"index {len(indexed_ssids)}, linear scan {len(matches)}")
+    print(f"indexed/key   : mean {sum(indexed) / len(indexed) * 1000:.3f} ms, "
+          f"max {max(indexed) * 1000:.3f} ms")
+    print(f"linear/key    : mean {sum(linear) / len(linear) * 1000:.3f} ms, "
+          f"max {max(linear) * 1000:.3f} ms")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Exercise the HTTP inventory service on 127.0.0.1 against fake netsh
+
+Serves a fake Windows inventory, pages through it with each record's
+authentication and cipher, then checks that
+conditional polls are answered with 304 without running a single tool, that
+a triggered rescan is accepted once and rate limited after, and that a
+rescan finding no change keeps the ETag, and that every Nth background
+refresh looks up every profile. Also checks that no other address than
+loopback is served without a token and that stopping the service waits for
+its scan. Prints request latencies and exits
+non-zero if a check fails.
+
+Usage: python benchmarks/bench_server.py [--profiles 2000] [--polls 500]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+from wifipass_core import WiFiPasswordRetriever
+from wifipass_server import InventoryService, InventoryServer, is_loopback
+from fakes import install_fake_tools, count_calls
+
+
+def request(base, path, method="GET", headers=None):
+    """Return (status, headers, decoded JSON body or None)"""
+    req = urllib.request.Request(base + path, method=method, headers=headers or {})
+    try:
+        with urllib.request.urlopen(req) as response:
+            return response.status, response.headers, json.loads(response.read() or "null")
+    except urllib.error.HTTPError as e:
+        body = e.read()
+        return e.code, e.headers, json.loads(body) if body else None
+
+
+def wait_for(predicate, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exercise the HTTP inventory service")
+    parser.add_argument("--profiles", type=int, default=2000)
+    parser.add_argument("--polls", type=int, default=500)
+    parser.add_argument("--page-size", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    failures = []
+
+    def check(name, ok, detail):
+        print(f"{name:<30}{'ok' if ok else 'FAILED'}  {detail}")
+        if not ok:
+            failures.append(name)
+
+    with tempfile.TemporaryDirectory(prefix="wifipass-bench-") as workdir:
+        bindir = install_fake_tools(os.path.join(workdir, "bin"))
+        log = os.path.join(workdir, "calls.log")
+        os.environ["PATH"] = bindir + os.pathsep + os.environ.get("PATH", "")
+        os.environ["WIFIPASS_FAKE_PROFILES"] = str(args.profiles)
+        os.environ["WIFIPASS_FAKE_LOG"] = log
+        os.environ["WIFIPASS_FAKE_LATENCY"] = "0"
+        os.environ.pop("WIFIPASS_FAKE_HANG", None)
+
+        retriever = WiFiPasswordRetriever(windows_engine="export")
+        retriever.os_type = "Windows"
+        expected = retriever.get_wifi_passwords()
+
+        service = InventoryService(retriever, refresh_interval=3600, rescan_interval=60)
+        server = InventoryServer(service, "127.0.0.1", 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = "http://127.0.0.1:%d" % server.server_address[1]
+        try:
+            status, _, _ = request(base, "/inventory")
+            check("before the first scan", status == 503, f"HTTP {status}")
+
+            service.start()
+            wait_for(lambda: service.snapshot is not None)
+
+            # Page through the whole inventory
+            records = []
+            offset = 0
+            start = time.perf_counter()
+            while offset is not None:
+                status, headers, body = request(
+                    base, f"/inventory?offset={offset}&limit={args.page_size}")
+                records.extend(body["records"])
+                offset = body["next_offset"]
+            elapsed = time.perf_counter() - start
+            etag = headers["ETag"]
+            check("paged inventory",
+                  {r["ssid"]: r["password"] for r in records} == expected
+                  and len(records) == body["total"],
+                  f"{len(records)} records in {elapsed * 1000:.0f}ms, ETag {etag}")
+            security = {(r["auth"], r["cipher"]) for r in records}
+            check("record security", None not in (pair[0] for pair in security),
+                  f"{sorted(security)}")
+
+            status, _, _ = request(base, "/inventory?limit=0")
+            check("bad page size", status == 400, f"HTTP {status}")
+
+            # Repeated polls with the ETag: no body, no scan
+            calls = count_calls(log)
+            start = time.perf_counter()
+            statuses = set()
+            for _ in range(args.polls):
+                status, _, _ = request(base, f"/inventory?limit={args.page_size}",
+                                       headers={"If-None-Match": etag})
+                statuses.add(status)
+            elapsed = time.perf_counter() - start
+            check("conditional polls", statuses == {304} and count_calls(log) == calls,
+                  f"{args.polls} polls, {elapsed / args.polls * 1000:.2f}ms each, "
+                  f"{count_calls(log) - calls} tool calls")
+
+            status, _, body = request(base, "/rescan", method="POST")
+            first = (status, body)
+            status, headers, _ = request(base, "/rescan", method="POST")
+            check("rescan rate limit", first[0] == 202 and status in (202, 429),
+                  f"first {first[0]} {first[1]}, second {status} "
+                  f"Retry-After {headers.get('Retry-After')}")
+            wait_for(lambda: service.scan_count >= 2 and not service.scanning)
+            status, _, _ = request(base, "/rescan", method="POST")
+            check("rescan after a rescan", status == 429, f"HTTP {status}")
+
+            status, _, _ = request(base, "/inventory", headers={"If-None-Match": etag})
+            _, _, body = request(base, "/status")
+            check("unchanged rescan keeps ETag", status == 304 and body["scan_count"] == 2,
+                  f"HTTP {status}, status {body}")
+        finally:
+            service.stop()
+            server.shutdown()
+            server.server_close()
+
+        # Background refreshes are incremental except every full_refresh_every-th one
+        fulls = []
+
+        class RecordingRetriever(WiFiPasswordRetriever):
+            def rescan(self, full=None):
+                fulls.append(full)
+                return super().rescan(full)
+
+        retriever = RecordingRetriever(windows_engine="export")
+        retriever.os_type = "Windows"
+        service = InventoryService(retriever, refresh_interval=0.01, full_refresh_every=3)
+        service.start()
+        wait_for(lambda: len(fulls) >= 6)
+        service.stop()
+        check("periodic full refresh", fulls[:6] == [None, None, True] * 2, f"{fulls[:6]}")
+        check("stop waits for the scan", not service._thread.is_alive() and not service.scanning,
+              f"{len(fulls)} refreshes")
+
+        try:
+            InventoryServer(service, "0.0.0.0", 0).server_close()
+            refused = False
+        except ValueError:
+            refused = True
+        served = InventoryServer(service, "0.0.0.0", 0, token="secret")
+        served.server_close()
+        check("token off loopback", refused and is_loopback("::1") and is_loopback("localhost")
+              and not is_loopback(""), "0.0.0.0 refused without a token")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
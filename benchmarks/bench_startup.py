@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Track startup time: imports, time to first window and time to first record
+
+Runs each measurement in a fresh interpreter, several times, and reports the
+fastest run:
+
+  import      importing wifipass_core, and which heavy modules it pulls in
+              (none of the platform, export or thread pool modules should
+              load before a scan needs them)
+  cli         wifipass-cli.py from spawn to its first record on stdout,
+              against the fake tools
+  gui         wifipass-new.py --profile-startup milestones (imports, first
+              paint, first record); skipped without PySimpleGUI or a display
+
+Exits non-zero if an import guard fails.
+
+Usage: python benchmarks/bench_startup.py [--runs 5]
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+from fakes import install_fake_tools
+
+# Modules that must stay unloaded until a scan or export needs them
+LAZY_MODULES = ("wifipass_netsh", "wifipass_keychain", "wifipass_linux", "wifipass_export",
+                "wifipass_async", "concurrent.futures", "xml.etree.ElementTree", "tempfile",
+                "http.server", "sqlite3", "ctypes")
+
+# A line of StartupProfile.summary(): "first paint          123.4ms  (+5.6ms)"
+MARK_RE = re.compile(r'^(\S.*?)\s+([\d.]+)ms\s+\(\+')
+
+IMPORT_PROBE = """
+import sys, time
+start = time.perf_counter()
+import wifipass_core
+elapsed = time.perf_counter() - start
+print(elapsed)
+print(",".join(name for name in sys.argv[1:] if name in sys.modules))
+"""
+
+
+def fastest(runs, measure):
+    return min(measure() for _ in range(runs))
+
+
+def measure_import(env):
+    output = subprocess.check_output([sys.executable, "-c", IMPORT_PROBE] + list(LAZY_MODULES),
+                                     cwd=ROOT, env=env, universal_newlines=True)
+    elapsed, loaded = output.split("\n")[:2]
+    return float(elapsed), [name for name in loaded.split(",") if name]
+
+
+def measure_cli(env):
+    """Seconds from spawning the CLI to its first record"""
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, os.path.join(ROOT, "wifipass-cli.py")], cwd=ROOT,
+                            env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                            universal_newlines=True)
+    first = proc.stdout.readline()
+    elapsed = time.perf_counter() - start
+    proc.stdout.read()
+    proc.wait()
+    return elapsed if first else float("inf")
+
+
+def measure_gui(env):
+    """Milestones reported by wifipass-new.py --profile-startup, in ms"""
+    proc = subprocess.run([sys.executable, os.path.join(ROOT, "wifipass-new.py"),
+                           "--profile-startup", "--no-watch"], cwd=ROOT, env=env,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                          universal_newlines=True, timeout=120)
+    return {match.group(1): float(match.group(2))
+            for match in map(MARK_RE.match, proc.stderr.splitlines()) if match}
+
+
+def gui_available(env):
+    probe = "import PySimpleGUI as sg; sg.Window('probe', [[]], finalize=True).close()"
+    return subprocess.run([sys.executable, "-c", probe], env=env, stdout=subprocess.DEVNULL,
+                          stderr=subprocess.DEVNULL).returncode == 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure application startup")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--profiles", type=int, default=50)
+    args = parser.parse_args(argv)
+    failures = []
+
+    with tempfile.TemporaryDirectory(prefix="wifipass-bench-") as workdir:
+        env = dict(os.environ)
+        env["PATH"] = install_fake_tools(os.path.join(workdir, "bin")) + os.pathsep + env["PATH"]
+        env["PYTHONPATH"] = ROOT
+        env["WIFIPASS_FAKE_PROFILES"] = str(args.profiles)
+        env.pop("WIFIPASS_FAKE_LATENCY", None)
+        env.pop("WIFIPASS_FAKE_HANG", None)
+        # Keep the user's scan store out of the measurement
+        env["HOME"] = workdir
+
+        results = [measure_import(env) for _ in range(args.runs)]
+        elapsed = min(result[0] for result in results)
+        loaded = sorted(set().union(*(result[1] for result in results)))
+        print(f"import wifipass_core  {elapsed * 1000:7.1f}ms")
+        if loaded:
+            failures.append("import")
+            print(f"  loaded eagerly: {', '.join(loaded)}")
+
+        elapsed = fastest(args.runs, lambda: measure_cli(env))
+        print(f"cli first record      {elapsed * 1000:7.1f}ms")
+
+        if gui_available(env):
+            runs = [measure_gui(env) for _ in range(args.runs)]
+            for name in runs[0]:
+                best = min(run.get(name, float("inf")) for run in runs)
+                print(f"gui {name:<18}{best:7.1f}ms")
+        else:
+            print("gui                   skipped (PySimpleGUI or a display is not available)")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
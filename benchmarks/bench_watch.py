@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Exercise the profile watch against Linux profile stores in a temp directory
+
+Writes NetworkManager keyfiles, iwd profiles and a wpa_supplicant.conf,
+loads them, then touches files while the watch runs: a burst of keyfile
+writes must arrive as one delta that re-read only the touched keyfiles, iwd
+and polled wpa_supplicant changes must each produce their own delta, and a
+delta not yet taken from the queue must not be repeated in the next. The
+polling fallback is checked the same way, as are its waiting for a running
+scan, its error reporting and that overlapping deltas add a network once.
+Exits non-zero if a check fails.
+
+Usage: python benchmarks/bench_watch.py [--profiles 2000] [--burst 20]
+"""
+
+import argparse
+import os
+import queue
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+from wifipass_core import WiFiPasswordRetriever
+from wifipass_watch import ProfileWatch
+from fakes import write_keyfiles, write_wpa_supplicant, write_iwd_profiles
+
+
+def make_retriever(workdir):
+    retriever = WiFiPasswordRetriever()
+    retriever.os_type = "Linux"
+    retriever.use_nmcli = False
+    retriever.nm_dir = os.path.join(workdir, "nm")
+    retriever.iwd_dir = os.path.join(workdir, "iwd")
+    retriever.wpa_supplicant_paths = [os.path.join(workdir, "wpa", "wpa_supplicant.conf")]
+    retriever.set_passwords(retriever.get_wifi_passwords())
+    return retriever
+
+
+def write_keyfile(folder, name, psk):
+    with open(os.path.join(folder, f"{name}.nmconnection"), 'w') as f:
+        f.write(f"[connection]\nid={name}\ntype=wifi\n\n[wifi]\nssid={name}\n\n"
+                f"[wifi-security]\nkey-mgmt=wpa-psk\npsk={psk}\n")
+
+
+def next_delta(deltas, timeout=5.0):
+    """Wait for the next delta, already applied by the watch, and return it with its latency"""
+    start = time.perf_counter()
+    try:
+        delta = deltas.get(timeout=timeout)
+    except queue.Empty:
+        return None, timeout
+    return delta, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exercise the profile watch")
+    parser.add_argument("--profiles", type=int, default=2000, help="profiles per store")
+    parser.add_argument("--burst", type=int, default=20, help="keyfile writes in the burst")
+    parser.add_argument("--debounce", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    failures = []
+
+    def check(name, ok, detail):
+        print(f"{name:<30}{'ok' if ok else 'FAILED'}  {detail}")
+        if not ok:
+            failures.append(name)
+
+    with tempfile.TemporaryDirectory(prefix="wifipass-bench-") as workdir:
+        nm_dir = os.path.join(workdir, "nm")
+        write_keyfiles(nm_dir, args.profiles)
+        write_iwd_profiles(os.path.join(workdir, "iwd"), args.profiles)
+        os.makedirs(os.path.join(workdir, "wpa"))
+        wpa_path = os.path.join(workdir, "wpa", "wpa_supplicant.conf")
+        write_wpa_supplicant(wpa_path, args.profiles)
+
+        retriever = make_retriever(workdir)
+        deltas = queue.Queue()
+        watch = ProfileWatch(retriever, deltas.put, debounce=args.debounce)
+        mode = watch.start()
+        try:
+            check("inotify available", mode == "inotify", mode)
+
+            # A burst of writes to a few keyfiles, as NetworkManager does on save
+            misses = retriever.keyfile_cache.misses
+            for i in range(args.burst):
+                write_keyfile(nm_dir, f"Burst{i % 3}", f"burst-{i}")
+            delta, latency = next_delta(deltas)
+            reread = retriever.keyfile_cache.misses - misses
+            check("keyfile burst", delta is not None and len(delta["added"]) == 3
+                  and reread == 3 and deltas.empty(),
+                  f"{latency * 1000:.0f}ms, {reread} keyfiles re-read")
+
+            os.remove(os.path.join(workdir, "iwd", "Net00001.psk"))
+            delta, latency = next_delta(deltas, timeout=1.0)
+            # Net00001 is still saved in the other stores
+            check("iwd profile removed", delta is None or not delta["removed"],
+                  f"{latency * 1000:.0f}ms")
+
+            # Editors write a new file and rename it over the old one
+            with open(wpa_path + ".new", 'w') as f:
+                f.write('network={\n\tssid="WpaOnly"\n\tpsk="wpa-only"\n}\n')
+            os.replace(wpa_path + ".new", wpa_path)
+            delta, latency = next_delta(deltas)
+            check("wpa_supplicant replaced", delta is not None
+                  and delta["added"] == {"WpaOnly": "wpa-only"}
+                  and os.path.dirname(wpa_path) not in retriever.watch_paths(),
+                  f"{latency * 1000:.0f}ms, file polled")
+
+            # A second change while the first delta still waits in the queue
+            write_keyfile(nm_dir, "Seq1", "seq-1")
+            wait_until = time.monotonic() + 5.0
+            while deltas.empty() and time.monotonic() < wait_until:
+                time.sleep(0.01)
+            write_keyfile(nm_dir, "Seq2", "seq-2")
+            first, _ = next_delta(deltas)
+            second, latency = next_delta(deltas)
+            check("unconsumed delta", first is not None and second is not None
+                  and first["added"] == {"Seq1": "seq-1"}
+                  and second["added"] == {"Seq2": "seq-2"}, f"{latency * 1000:.0f}ms")
+            check("inventory matches a full scan",
+                  dict(retriever.passwords) == make_retriever(workdir).passwords,
+                  f"{len(retriever.passwords)} records")
+        finally:
+            watch.stop()
+
+        # The fallback used where inotify is missing
+        retriever = make_retriever(workdir)
+        retriever.watch_paths = lambda: []
+        retriever.watch_files = lambda: []
+        watch = ProfileWatch(retriever, deltas.put, interval=0.2)
+        mode = watch.start()
+        try:
+            write_keyfile(nm_dir, "Polled", "polled")
+            delta, latency = next_delta(deltas)
+            check("polling fallback", mode == "poll" and delta is not None
+                  and delta["added"] == {"Polled": "polled"}, f"{latency * 1000:.0f}ms")
+
+            # Nothing is computed while a scan holds the lock, and the change is seen after
+            with retriever.scan_lock:
+                write_keyfile(nm_dir, "DuringScan", "during")
+                delta, _ = next_delta(deltas, timeout=1.0)
+            held = delta
+            delta, latency = next_delta(deltas)
+            check("waits for a running scan", held is None and delta is not None
+                  and delta["added"] == {"DuringScan": "during"}, f"{latency * 1000:.0f}ms after")
+        finally:
+            watch.stop()
+
+        errors = queue.Queue()
+        # Without a fingerprint every interval rescans, and each rescan fails
+        retriever.backend_fingerprint = lambda: None
+        retriever.rescan = lambda full=None: 1 / 0
+        watch = ProfileWatch(retriever, deltas.put, interval=0.1, on_error=errors.put)
+        watch.start()
+        try:
+            error = errors.get(timeout=5.0)
+        except queue.Empty:
+            error = None
+        finally:
+            watch.stop()
+        check("errors reported", error is not None and "ZeroDivisionError" in error
+              and watch.last_error is not None, f"{error}")
+
+        # Two deltas computed against the same inventory both add a network
+        rows = len(retriever.records)
+        overlap = {"added": {"Twice": "twice"}, "removed": [], "changed": {}}
+        retriever.apply_delta(overlap)
+        retriever.apply_delta(overlap)
+        check("overlapping deltas", len(retriever.records) == rows + 1
+              and retriever.records.ssids.count("Twice") == 1, f"{len(retriever.records)} rows")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark sequential vs. pooled Windows profile lookups against a fake netsh
+
+Usage: python benchmarks/bench_windows_pool.py [profiles] [latency_ms] [workers]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wifipass_core import WiFiPasswordRetriever
+
+
+def make_fake_netsh(profiles, latency):
+    """Build a runner that answers netsh queries after a fixed delay"""
+    listing = "User profiles\n-------------\n" + "".join(
+        f"    All User Profile     : Net{i:05d}\n" for i in range(profiles))
+    
+    def runner(cmd):
+        time.sleep(latency)
+        if cmd[3] == 'profiles':
+            return listing
+        ssid = cmd[4].split('=', 1)[1].strip('"')
+        return ("    Authentication         : WPA2-Personal\n"
+                f"    Key Content            : secret-{ssid}\n")
+    return runner
+
+
+def main():
+    profiles = int(sys.argv[1]) if len(sys.argv) > 1 else 150
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 20) / 1000.0
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    
+    timings = {}
+    for label, max_workers in (("sequential", 1), (f"pool x{workers}", workers)):
+        retriever = WiFiPasswordRetriever(runner=make_fake_netsh(profiles, latency),
+                                          max_workers=max_workers)
+        start = time.perf_counter()
+        result = retriever._get_windows_wifi_passwords()
+        timings[label] = time.perf_counter() - start
+        assert list(result) == sorted(result), "output order not stable"
+        print(f"{label:>14}: {timings[label]:.3f}s for {len(result)} profiles")
+    
+    base, pooled = timings.values()
+    print(f"{'speed-up':>14}: {base / pooled:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
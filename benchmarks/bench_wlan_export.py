@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Check and time the export engine's parsing of exported WLAN profile XML files
+
+Parses the captured export folder and checks the SSID to password mapping,
+including a protected key, an enterprise profile and an open network, the
+authentication and cipher of the records, and the interface tags taken
+from the file names. Then times the parse over a folder of generated
+profiles. Exits non-zero if any check fails.
+
+Usage: python benchmarks/bench_wlan_export.py [--profiles 2000]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from wifipass_core import WiFiPasswordRetriever
+
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures", "wlan_export")
+
+EXPECTED = {
+    "Cafe Guest": "No Password or Not Available",
+    "CorpNet": "Enterprise Authentication - Not Available",
+    "HomeNet": "correct horse battery",
+    "Office": "No Password or Not Available",
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the WLAN profile export parser")
+    parser.add_argument("--profiles", type=int, default=2000)
+    args = parser.parse_args(argv)
+    failures = []
+
+    def check(name, ok, detail):
+        print(f"{name:<26}{'ok' if ok else 'FAILED'}  {detail}")
+        if not ok:
+            failures.append(name)
+
+    retriever = WiFiPasswordRetriever(windows_engine="export")
+    passwords = retriever._parse_windows_export(FIXTURES)
+    check("fixture mapping", passwords == EXPECTED, f"{passwords}")
+    retriever.set_passwords(passwords)
+    security = {record.ssid: (record.auth, record.cipher) for record in retriever.records}
+    check("fixture security", security == {
+        "Cafe Guest": ("open", "none"), "CorpNet": ("WPA2", "AES"),
+        "HomeNet": ("WPA2PSK", "AES"), "Office": ("WPA2PSK", "AES")}, f"{security}")
+    check("fixture interfaces",
+          retriever.wifi_interfaces == ["Wi-Fi"]
+          and all(retriever.interfaces.get(ssid) == ("Wi-Fi",) for ssid in EXPECTED),
+          f"{retriever.wifi_interfaces}")
+
+    # The HomeNet fixture copied under many names
+    with open(os.path.join(FIXTURES, "Wi-Fi-HomeNet.xml"), encoding="utf-8") as f:
+        template = f.read()
+    with tempfile.TemporaryDirectory(prefix="wifipass-bench-") as folder:
+        for i in range(args.profiles):
+            name = f"Net{i:05d}"
+            with open(os.path.join(folder, f"Wi-Fi-{name}.xml"), "w", encoding="utf-8") as f:
+                f.write(template.replace("HomeNet", name))
+        shutil.copy(os.path.join(FIXTURES, "Wi-Fi-Office.xml"), folder)
+        start = time.perf_counter()
+        passwords = retriever._parse_windows_export(folder)
+        elapsed = time.perf_counter() - start
+        check("generated folder",
+              len(passwords) == args.profiles + 1
+              and passwords["Office"] == EXPECTED["Office"],
+              f"{len(passwords)} profiles in {elapsed * 1000:.0f}ms "
+              f"({len(passwords) / elapsed:,.0f} profiles/s)")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fake platform tools and synthetic profile trees for the benchmarks
+
+install_fake_tools writes executable stand-ins for netsh, security,
+networksetup, iwlist and nmcli into a folder. They answer from a synthetic
+inventory sized by WIFIPASS_FAKE_PROFILES, sleep WIFIPASS_FAKE_LATENCY
+seconds per call, and append one line per call to WIFIPASS_FAKE_LOG so
+subprocess counts can be measured. Lookups of the profile numbers listed in
+WIFIPASS_FAKE_HANG (comma separated) hang for an hour, like a stuck tool.
+WIFIPASS_FAKE_INTERFACES simulates that many wireless adapters ("Wi-Fi",
+"Wi-Fi 2", ... on Windows, en0, en1, ... on macOS): with more than one,
+every third profile is on the first adapter only, every third on all of them
+and the rest on all but the first.
+"""
+
+import os
+import stat
+import sys
+
+FAKE_TOOL = r'''
+import os, sys, time
+
+profiles = int(os.environ.get("WIFIPASS_FAKE_PROFILES", "10"))
+latency = float(os.environ.get("WIFIPASS_FAKE_LATENCY", "0"))
+log = os.environ.get("WIFIPASS_FAKE_LOG")
+hang = {int(i) for i in os.environ.get("WIFIPASS_FAKE_HANG", "").split(",") if i}
+adapters = int(os.environ.get("WIFIPASS_FAKE_INTERFACES", "1"))
+tool = os.path.basename(sys.argv[0])
+args = sys.argv[1:]
+
+if log:
+    with open(log, "a") as f:
+        f.write(tool + " " + " ".join(args) + "\n")
+if latency:
+    time.sleep(latency)
+
+def ssid(i):
+    return "Net%05d" % i
+
+def secret(i):
+    return "secret-%d" % i
+
+def enterprise(i):
+    return i % 10 == 0
+
+def interface(k):
+    return "Wi-Fi" if k == 0 else "Wi-Fi %d" % (k + 1)
+
+def on_adapter(i, k):
+    if adapters == 1 or i % 3 == 1:
+        return True
+    return (i % 3 == 0) == (k == 0)
+
+def listed(k):
+    return [i for i in range(profiles) if on_adapter(i, k)]
+
+out = sys.stdout.write
+if tool == "netsh" and args[:3] == ["wlan", "show", "profiles"]:
+    for k in range(adapters):
+        out("\nProfiles on interface %s:\n\nUser profiles\n-------------\n" % interface(k))
+        for i in listed(k):
+            out("    All User Profile     : %s\n" % ssid(i))
+elif tool == "netsh" and args[:3] == ["wlan", "show", "profile"]:
+    name = args[3].split("=", 1)[1].strip('"')
+    i = int(name[3:])
+    if i in hang:
+        time.sleep(3600)
+    asked = [a.split("=", 1)[1] for a in args if a.startswith("interface=")]
+    holding = [interface(k) for k in range(adapters) if on_adapter(i, k)]
+    if not holding or (asked and asked[0] not in holding):
+        sys.stderr.write('Profile "%s" is not found on the system.\n' % name)
+        sys.exit(1)
+    for on in (asked or holding):
+        out("\nProfile %s on interface %s:\n%s\n\n" % (name, on, "=" * 71))
+        out("Security settings\n-----------------\n")
+        if enterprise(i):
+            out("    Authentication         : WPA2-Enterprise\n    Cipher                 : CCMP\n"
+                "    Security key           : Absent\n")
+        else:
+            out("    Authentication         : WPA2-Personal\n    Cipher                 : CCMP\n"
+                "    Security key           : Present\n    Key Content            : %s\n"
+                % secret(i))
+elif tool == "netsh" and args[:3] == ["wlan", "export", "profile"]:
+    folder = [a for a in args if a.startswith("folder=")][0].split("=", 1)[1]
+    for k, i in [(k, i) for k in range(adapters) for i in listed(k)]:
+        if enterprise(i):
+            security = ("<authEncryption><authentication>WPA2</authentication>"
+                        "<encryption>AES</encryption><useOneX>true</useOneX></authEncryption>")
+        else:
+            security = ("<authEncryption><authentication>WPA2PSK</authentication>"
+                        "<encryption>AES</encryption><useOneX>false</useOneX></authEncryption>"
+                        "<sharedKey><keyType>passPhrase</keyType><protected>false</protected>"
+                        "<keyMaterial>%s</keyMaterial></sharedKey>" % secret(i))
+        with open(os.path.join(folder, "%s-%s.xml" % (interface(k), ssid(i))), "w") as f:
+            f.write('<?xml version="1.0"?>\n<WLANProfile xmlns="http://www.microsoft.com/'
+                    'networking/WLAN/profile/v1"><name>%s</name><SSIDConfig><SSID><name>%s'
+                    '</name></SSID></SSIDConfig><MSM><security>%s</security></MSM></WLANProfile>'
+                    % (ssid(i), ssid(i), security))
+    out("Interface profile(s) saved.\n")
+elif tool == "networksetup" and args[:1] == ["-listallhardwareports"]:
+    out("\nHardware Port: Ethernet\nDevice: en%d\nEthernet Address: 00:11:22:33:44:00\n"
+        % adapters)
+    for k in range(adapters):
+        out("\nHardware Port: %s\nDevice: en%d\nEthernet Address: 00:11:22:33:44:%02x\n"
+            % ("Wi-Fi" if k == 0 else "USB 802.11ac Adapter %d" % k, k, k + 1))
+    out("\nHardware Port: Thunderbolt Bridge\nDevice: bridge0\nEthernet Address: N/A\n")
+elif tool == "networksetup" and args[:1] == ["-listpreferredwirelessnetworks"]:
+    k = int(args[1][2:])
+    if k >= adapters:
+        out("%s is not a Wi-Fi interface.\n" % args[1])
+        sys.exit(10)
+    out("Preferred networks on %s:\n" % args[1])
+    for i in listed(k):
+        out("\t%s\n" % ssid(i))
+elif tool == "security" and args[:1] == ["dump-keychain"]:
+    for i in range(profiles):
+        if enterprise(i):
+            continue
+        out('keychain: "/Library/Keychains/System.keychain"\nversion: 512\nclass: "genp"\n'
+            'attributes:\n    "acct"<blob>="%s"\n    "desc"<blob>="AirPort network password"\n'
+            '    "labl"<blob>="%s"\n    "svce"<blob>="AirPort"\n' % (ssid(i), ssid(i)))
+        if "-d" in args:
+            out('data:\n"%s"\n' % secret(i))
+elif tool == "security" and args[:1] == ["find-generic-password"]:
+    name = args[args.index("-a") + 1]
+    i = int(name[3:])
+    if i in hang:
+        time.sleep(3600)
+    if enterprise(i):
+        sys.stderr.write("security: SecKeychainSearchCopyNext: The specified item could not be "
+                         "found in the keychain.\n")
+        sys.exit(44)
+    out("%s\n" % secret(i))
+elif tool == "nmcli" and args[-2:] == ["connection", "show"]:
+    for i in range(profiles):
+        out("00000000-0000-0000-0000-%012d:802-11-wireless\n" % i)
+    out("11111111-0000-0000-0000-000000000000:vpn\n")
+elif tool == "nmcli" and "-s" in args and "show" in args:
+    uuids = args[args.index("show") + 1:]
+    for n, uuid in enumerate(uuids):
+        i = int(uuid.rsplit("-", 1)[1])
+        if n:
+            out("\n")
+        out("802-11-wireless.ssid:%s\n" % ssid(i))
+        if enterprise(i):
+            out("802-11-wireless-security.key-mgmt:wpa-eap\n802-11-wireless-security.psk:\n")
+        else:
+            out("802-11-wireless-security.key-mgmt:wpa-psk\n"
+                "802-11-wireless-security.psk:%s\n" % secret(i))
+elif tool == "iwlist" and args[:1] == ["scanning"]:
+    out("wlan0     Scan completed :\n")
+    for i in range(profiles):
+        out('          Cell %02d - Address: 00:11:22:33:44:%02X\n' % (i + 1, i % 256))
+        out('                    ESSID:"%s"\n' % ssid(i))
+else:
+    sys.stderr.write("%s: unsupported arguments %r\n" % (tool, args))
+    sys.exit(1)
+'''
+
+FAKE_TOOLS = ("netsh", "security", "networksetup", "iwlist", "nmcli")
+
+
+def install_fake_tools(folder):
+    """Write the fake tools into folder and return it, ready to prepend to PATH"""
+    os.makedirs(folder, exist_ok=True)
+    for tool in FAKE_TOOLS:
+        path = os.path.join(folder, tool)
+        with open(path, 'w') as f:
+            # -S skips site initialisation to keep the per-call overhead low
+            f.write(f"#!{sys.executable} -S\n" + FAKE_TOOL)
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return folder
+
+
+def count_calls(log):
+    """Return the number of fake tool invocations recorded in log"""
+    if not os.path.exists(log):
+        return 0
+    with open(log) as f:
+        return sum(1 for _ in f)
+
+
+def write_keyfiles(folder, count):
+    """Write a tree of synthetic NetworkManager Wi-Fi and VPN keyfiles"""
+    os.makedirs(folder, exist_ok=True)
+    for i in range(count):
+        with open(os.path.join(folder, f"conn{i:05d}.nmconnection"), 'w') as f:
+            if i % 5 == 0:
+                f.write(f"[connection]\nid=vpn{i}\ntype=vpn\n\n[vpn]\nservice-type=openvpn\n")
+            else:
+                f.write(f"[connection]\nid=net{i}\ntype=wifi\n\n[wifi]\nssid=Net{i:05d}\n\n"
+                        f"[wifi-security]\nkey-mgmt=wpa-psk\npsk=secret-{i}\n")
+
+
+def write_wpa_supplicant(path, count):
+    """Write a wpa_supplicant.conf with count network blocks"""
+    with open(path, 'w') as f:
+        f.write("ctrl_interface=DIR=/run/wpa_supplicant GROUP=netdev\nupdate_config=1\n\n")
+        for i in range(count):
+            if i % 10 == 0:
+                f.write(f'network={{\n\tssid="Net{i:05d}"\n\tkey_mgmt=WPA-EAP\n\teap=PEAP\n'
+                        f'\tidentity="user{i}"\n\tpassword="pw{i}"\n}}\n\n')
+            else:
+                f.write(f'network={{\n\tssid="Net{i:05d}"\n\tpsk="secret-{i}"\n'
+                        f'\tkey_mgmt=WPA-PSK\n}}\n\n')
+
+
+def write_iwd_profiles(folder, count):
+    """Write count iwd profiles into folder"""
+    os.makedirs(folder, exist_ok=True)
+    for i in range(count):
+        suffix = ".8021x" if i % 10 == 0 else ".psk"
+        with open(os.path.join(folder, f"Net{i:05d}{suffix}"), 'w') as f:
+            if suffix == ".psk":
+                f.write(f"[Security]\nPassphrase=secret-{i}\n")
+            else:
+                f.write("[Security]\nEAP-Method=PEAP\n")
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Headless Wi-Fi Password Retriever
+
+Streams saved Wi-Fi passwords to stdout as NDJSON or CSV, one record per
+line as soon as each lookup finishes. Never imports a GUI toolkit.
+"""
+
+import argparse
+import csv
+import json
+import os
+import queue
+import sys
+import time
+from datetime import datetime
+
+from wifipass_core import WiFiPasswordRetriever, WINDOWS_ENGINES, DEFAULT_MAX_WORKERS
+from wifipass_trace import ScanTrace
+
+# The service, history and watch modules are imported only by the modes using
+# them; http.server alone costs more than a scan of a few profiles
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Print saved Wi-Fi passwords without a GUI")
+    parser.add_argument("-f", "--format", choices=("ndjson", "csv"), default="ndjson",
+                        help="output format (default: ndjson)")
+    parser.add_argument("-e", "--engine", choices=WINDOWS_ENGINES, default="show",
+                        help="Windows engine: per-profile lookups or one bulk export")
+    parser.add_argument("-w", "--workers", type=int, default=DEFAULT_MAX_WORKERS,
+                        help="concurrent profile lookups (default: %(default)s)")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="write per-stage timings and subprocess counts to FILE")
+    parser.add_argument("--trace-format", choices=("chrome", "json"), default="chrome",
+                        help="trace file format (default: chrome trace events)")
+    parser.add_argument("--watch", action="store_true",
+                        help="after the scan, keep printing saved-network changes as NDJSON events")
+    parser.add_argument("--serve", action="store_true",
+                        help="serve the inventory as JSON over HTTP instead of printing it")
+    parser.add_argument("--host",
+                        help="address to serve on (default: 127.0.0.1); "
+                             "other than loopback requires --token")
+    parser.add_argument("--port", type=int,
+                        help="port to serve on (default: 8765)")
+    parser.add_argument("--token",
+                        help="require this bearer token in the Authorization header")
+    parser.add_argument("--refresh-interval", type=float, metavar="SECONDS",
+                        help="rescan in the background this often (default: 300)")
+    parser.add_argument("--rescan-interval", type=float, metavar="SECONDS",
+                        help="least time between rescans clients can trigger (default: 30)")
+    parser.add_argument("--full-refresh-every", type=int, metavar="N",
+                        help="look up every profile on each Nth background refresh, "
+                             "instead of only new and changed ones (default: 12)")
+    parser.add_argument("--history", action="store_true",
+                        help="append the changes found by this scan to the scan history")
+    parser.add_argument("--history-db", metavar="PATH",
+                        help="scan history database (default: ~/.wifipass/history.db)")
+    parser.add_argument("--machine",
+                        help="machine name in the scan history (default: this host name)")
+    parser.add_argument("--as-of", type=parse_time, metavar="WHEN",
+                        help="print the inventory recorded in the history as of WHEN "
+                             "(ISO date and time) instead of scanning")
+    parser.add_argument("--history-changes", type=parse_time, nargs="?", const=float("-inf"),
+                        metavar="SINCE",
+                        help="print the networks added, removed or re-keyed in the scan history "
+                             "since SINCE (ISO date and time; default: ever) instead of scanning")
+    parser.add_argument("--compact-history", type=float, metavar="DAYS",
+                        help="fold scan history older than DAYS into one checkpoint and exit")
+    args = parser.parse_args(argv)
+    if args.watch and args.format != "ndjson":
+        parser.error("--watch requires --format ndjson")
+    if args.watch and args.serve:
+        parser.error("--watch and --serve can't be combined")
+    if args.host is not None and args.token is None:
+        from wifipass_server import is_loopback
+        if not is_loopback(args.host):
+            parser.error("--host other than loopback requires --token, "
+                         "as the passwords are served in plain text")
+    return args
+
+
+def parse_time(value):
+    """Parse an ISO date and time into a timestamp for argparse"""
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not an ISO date and time: {value!r}")
+
+
+def write_records(records, fmt, out, interfaces=None):
+    """Write records incrementally, flushing after each one; returns the error count
+
+    interfaces, if given, returns the interface names of an SSID; NDJSON
+    records carry them when known.
+    """
+    errors = 0
+    if fmt == "csv":
+        writer = csv.writer(out)
+        writer.writerow(['SSID', 'Password'])
+        out.flush()
+
+    for ssid, password in records:
+        if ssid == "Error":
+            print(f"Error: {password}", file=sys.stderr)
+            errors += 1
+            continue
+        if fmt == "csv":
+            writer.writerow([ssid, password])
+        else:
+            line = {"ssid": ssid, "password": password}
+            tags = interfaces(ssid) if interfaces is not None else None
+            if tags:
+                line["interfaces"] = list(tags)
+            out.write(json.dumps(line, ensure_ascii=False) + "\n")
+        out.flush()
+    return errors
+
+
+def write_events(delta, out):
+    """Write one NDJSON event per added, changed or removed network"""
+    for event in ("added", "changed"):
+        for ssid, password in delta[event].items():
+            out.write(json.dumps({"event": event, "ssid": ssid, "password": password},
+                                 ensure_ascii=False) + "\n")
+    for ssid in delta["removed"]:
+        out.write(json.dumps({"event": "removed", "ssid": ssid, "password": None},
+                             ensure_ascii=False) + "\n")
+    out.flush()
+
+
+def watch_changes(retriever, out, history=None, machine=None):
+    """Stream saved-network changes until interrupted, recording them in history"""
+    from wifipass_watch import ProfileWatch
+    deltas = queue.Queue()
+    watch = ProfileWatch(retriever, deltas.put,
+                         on_error=lambda error: print(f"Watch error: {error}", file=sys.stderr))
+    print(f"Watching saved networks ({watch.start()}), Ctrl+C to stop", file=sys.stderr)
+    try:
+        while True:
+            try:
+                delta = deltas.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            # The watch applied the delta before handing it over
+            write_events(delta, out)
+            if history is not None:
+                with retriever.scan_lock:
+                    passwords = dict(retriever.passwords)
+                history.record(passwords, machine)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watch.stop()
+
+
+def write_history_changes(changes, fmt, out):
+    """Write (taken_at, ssid, op, password) history rows as NDJSON events or CSV"""
+    if fmt == "csv":
+        writer = csv.writer(out)
+        writer.writerow(['Taken At', 'Event', 'SSID', 'Password'])
+    for taken_at, ssid, op, password in changes:
+        when = datetime.fromtimestamp(taken_at).isoformat(timespec="seconds")
+        if fmt == "csv":
+            writer.writerow([when, op, ssid, password])
+        else:
+            out.write(json.dumps({"taken_at": when, "event": op, "ssid": ssid,
+                                  "password": password}, ensure_ascii=False) + "\n")
+
+
+def serve(retriever, args):
+    """Serve the inventory over HTTP until interrupted"""
+    import wifipass_server
+    from wifipass_store import ScanStore
+    try:
+        retriever.store = ScanStore()
+    except Exception:
+        retriever.store = None
+    
+    def option(value, default):
+        return default if value is None else value
+    
+    service = wifipass_server.InventoryService(
+        retriever,
+        refresh_interval=option(args.refresh_interval, wifipass_server.DEFAULT_REFRESH_INTERVAL),
+        rescan_interval=option(args.rescan_interval, wifipass_server.DEFAULT_RESCAN_INTERVAL),
+        full_refresh_every=option(args.full_refresh_every,
+                                  wifipass_server.DEFAULT_FULL_REFRESH_EVERY))
+    server = wifipass_server.InventoryServer(
+        service, option(args.host, wifipass_server.DEFAULT_HOST),
+        option(args.port, wifipass_server.DEFAULT_PORT), token=args.token)
+    service.start()
+    host, port = server.server_address[:2]
+    print(f"Serving the Wi-Fi inventory on http://{host}:{port}/inventory, Ctrl+C to stop",
+          file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        server.server_close()
+    return 0
+
+
+def main(argv=None):
+    """Main function to run the headless retriever"""
+    args = parse_args(argv)
+    history = None
+    if (args.history or args.as_of is not None or args.history_changes is not None
+            or args.compact_history is not None):
+        from wifipass_history import ScanHistory
+        history = ScanHistory(args.history_db) if args.history_db else ScanHistory()
+    if args.compact_history is not None:
+        removed = history.compact(time.time() - args.compact_history * 86400, args.machine)
+        history.vacuum()
+        print(f"Folded {removed} scans into a checkpoint", file=sys.stderr)
+        return 0
+    if args.as_of is not None:
+        passwords = history.as_of(args.as_of, args.machine)
+        return write_records(sorted(passwords.items()), args.format, sys.stdout)
+    if args.history_changes is not None:
+        write_history_changes(history.changes(args.machine, since=args.history_changes),
+                              args.format, sys.stdout)
+        return 0
+    
+    trace = ScanTrace() if args.trace else None
+    retriever = WiFiPasswordRetriever(max_workers=args.workers, windows_engine=args.engine,
+                                      trace=trace)
+    if args.serve:
+        return serve(retriever, args)
+    collected = {}
+    
+    def collect(records):
+        for ssid, password in records:
+            collected[ssid] = password
+            yield ssid, password
+    
+    try:
+        records = retriever.iter_wifi_passwords()
+        # Plain runs stream records without keeping them
+        if args.watch or args.history:
+            records = collect(records)
+        with retriever.trace.stage("scan", backend=retriever.backend_name()):
+            # The tags are read per record, as the listing only fills them in once it ran
+            errors = write_records(records, args.format,
+                                   sys.stdout, lambda ssid: retriever.interfaces.get(ssid))
+        if args.history and not errors:
+            history.record(collected, args.machine)
+        if args.watch and not errors:
+            # The streamed inventory is the baseline the watch reports changes against
+            retriever.set_passwords(collected)
+            watch_changes(retriever, sys.stdout, history if args.history else None, args.machine)
+    except BrokenPipeError:
+        # Output closed early, e.g. piped into head; send the unflushed rest nowhere
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    finally:
+        if trace is not None:
+            trace.write(args.trace, args.trace_format)
+            print(trace.summary(), file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,299 +2,57 @@
 # -*- coding: utf-8 -*-
 """
 Enhanced Wi-Fi Password Retriever
+
+Startup is kept short: PySimpleGUI (and with it Tk) is imported once the
+arguments are parsed, and the scan store and profile watch are opened after
+the window is first painted. --profile-startup reports the timings.
 """
 
+import time
+STARTED = time.perf_counter()
+
+import argparse
 import os
-import sys
-import subprocess
-import re
-import csv
 import platform
-from collections import OrderedDict
+import sys
 from datetime import datetime
-import PySimpleGUI as sg
-import threading
-
-# Theme and styling
-sg.theme('LightBlue2')  # Setting a modern theme
+from wifipass_core import (WiFiPasswordRetriever, SCAN_BATCH_EVENT, SCAN_DONE_EVENT, SCAN_ENGINES,
+                           WATCH_EVENT)
+from wifipass_trace import ScanTrace, StartupProfile
 
-class WiFiPasswordRetriever:
-    def __init__(self):
-        self.passwords = {}
-        self.pwds = []
-        self.os_type = platform.system()
-        self.retrieving = False
-        self.scan_count = 0
-        
-    def get_wifi_passwords(self):
-        """Retrieve Wi-Fi passwords based on the operating system"""
-        if self.os_type == "Windows":
-            return self._get_windows_wifi_passwords()
-        elif self.os_type == "Darwin":  # macOS
-            return self._get_macos_wifi_passwords()
-        elif self.os_type == "Linux":
-            return self._get_linux_wifi_passwords()
-        else:
-            return {"Error": f"Unsupported OS: {self.os_type}"}
-    
-    def _get_windows_wifi_passwords(self):
-        """Retrieve Wi-Fi passwords on Windows"""
-        passwords = {}
-        
-        # Get all Wi-Fi profiles
-        try:
-            output = subprocess.check_output(['netsh', 'wlan', 'show', 'profiles'], 
-                                            universal_newlines=True, 
-                                            stderr=subprocess.DEVNULL)
-        except subprocess.SubprocessError:
-            return {"Error": "Unable to retrieve Wi-Fi profiles"}
-        
-        # Extract SSIDs
-        ssids = []
-        for line in output.split('\n'):
-            if ': ' in line and "All User Profile" in line:
-                ssid = line.split(': ')[1].strip()
-                ssids.append(ssid)
-        
-        # Get password for each SSID
-        for ssid in ssids:
-            if not ssid:
-                continue
-                
-            try:
-                # Try with and without quotes for SSIDs with special characters
-                try:
-                    cmd = ['netsh', 'wlan', 'show', 'profile', f'name={ssid}', 'key=clear']
-                    output = subprocess.check_output(cmd, universal_newlines=True, stderr=subprocess.DEVNULL)
-                except subprocess.SubprocessError:
-                    cmd = ['netsh', 'wlan', 'show', 'profile', f'name="{ssid}"', 'key=clear']
-                    output = subprocess.check_output(cmd, universal_newlines=True, stderr=subprocess.DEVNULL)
-                
-                # Check if it's enterprise authentication
-                if 'Authentication' in output and 'WPA2-Enterprise' in output:
-                    passwords[ssid] = 'Enterprise Authentication - Not Available'
-                    continue
-                
-                # Extract password
-                for line in output.split('\n'):
-                    if 'Key Content' in line:
-                        password = line.split(': ')[1].strip()
-                        passwords[ssid] = password
-                        break
-                else:  # No password found
-                    passwords[ssid] = 'No Password or Not Available'
-                    
-            except (subprocess.SubprocessError, IndexError):
-                passwords[ssid] = 'Error Retrieving Password'
-        
-        return passwords
-    
-    def _get_macos_wifi_passwords(self):
-        """Retrieve Wi-Fi passwords on macOS using security command"""
-        passwords = {}
-        
-        try:
-            # Get list of preferred networks
-            airport_cmd = "/System/Library/PrivateFrameworks/Apple80211.framework/Resources/airport"
-            if not os.path.exists(airport_cmd):
-                airport_cmd = "/usr/sbin/airport"  # Fallback location
-                
-            # If airport command exists, use it to get SSIDs
-            ssids = []
-            try:
-                output = subprocess.check_output([airport_cmd, "-s"], 
-                                               universal_newlines=True, 
-                                               stderr=subprocess.DEVNULL)
-                                               
-                # Extract SSIDs from scan
-                for line in output.split('\n')[1:]:  # Skip header
-                    if line.strip():
-                        ssid = line.strip().split()[0]
-                        ssids.append(ssid)
-            except (subprocess.SubprocessError, FileNotFoundError):
-                # Fallback to listing preferred networks
-                output = subprocess.check_output(["networksetup", "-listpreferredwirelessnetworks", "en0"], 
-                                               universal_newlines=True,
-                                               stderr=subprocess.DEVNULL)
-                for line in output.split('\n')[1:]:  # Skip header
-                    if line.strip():
-                        ssids.append(line.strip())
-            
-            # Get password for each SSID using security command
-            for ssid in ssids:
-                if not ssid:
-                    continue
-                
-                try:
-                    cmd = ["security", "find-generic-password", "-l", f"{ssid}", "-g"]
-                    output = subprocess.check_output(cmd, universal_newlines=True, stderr=subprocess.PIPE)
-                    
-                    # Extract password from output
-                    password_match = re.search(r'password: "(.*)"', output)
-                    if password_match:
-                        passwords[ssid] = password_match.group(1)
-                    else:
-                        # Note: This requires user prompt on macOS for security reasons
-                        passwords[ssid] = "Password access requires admin privileges" 
-                        
-                except subprocess.SubprocessError:
-                    passwords[ssid] = "Not Available (Admin privileges required)"
-        
-        except Exception as e:
-            passwords["Error"] = f"MacOS password retrieval error: {str(e)}"
-            
-        return passwords
-    
-    def _get_linux_wifi_passwords(self):
-        """Retrieve Wi-Fi passwords on Linux systems"""
-        passwords = {}
-        
-        # Check if NetworkManager is available
-        if not os.path.exists("/etc/NetworkManager/system-connections/"):
-            try:
-                # Try using the wireless-tools package (iwlist)
-                output = subprocess.check_output(["iwlist", "scanning"], 
-                                              universal_newlines=True,
-                                              stderr=subprocess.DEVNULL)
-                                              
-                # Extract SSIDs
-                ssids = []
-                for line in output.split('\n'):
-                    if "ESSID:" in line:
-                        ssid = line.split('ESSID:"')[1].split('"')[0]
-                        if ssid:
-                            ssids.append(ssid)
-                
-                for ssid in ssids:
-                    passwords[ssid] = "Password stored in system keyring"
-                
-                return passwords
-            except subprocess.SubprocessError:
-                return {"Error": "Network information unavailable. Try running with sudo."}
-        
-        # Use NetworkManager - requires root
-        try:
-            # Get list of connections
-            nm_files = os.listdir("/etc/NetworkManager/system-connections/")
-            
-            for file in nm_files:
-                full_path = os.path.join("/etc/NetworkManager/system-connections/", file)
-                try:
-                    with open(full_path, 'r') as f:
-                        content = f.read()
-                        
-                        # Extract SSID
-                        ssid_match = re.search(r'ssid=(.*)', content)
-                        if ssid_match:
-                            ssid = ssid_match.group(1).strip()
-                        else:
-                            ssid = file.replace('.nmconnection', '')
-                        
-                        # Extract password
-                        psk_match = re.search(r'psk=(.*)', content)
-                        if psk_match:
-                            password = psk_match.group(1).strip()
-                            passwords[ssid] = password
-                        else:
-                            passwords[ssid] = "No Password or Enterprise Auth"
-                            
-                except (PermissionError, IOError):
-                    # This will happen if not running as root
-                    passwords[file.replace('.nmconnection', '')] = "Permission Denied (Run as root)"
-                    
-        except Exception as e:
-            passwords["Error"] = f"Linux password retrieval error: {str(e)}"
-            
-        return passwords
+def main(argv=None):
+    """Main function to run the application"""
+    parser = argparse.ArgumentParser(description="Wi-Fi Password Retriever")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="write per-stage timings of each scan to FILE (Chrome trace format)")
+    parser.add_argument("--engine", choices=SCAN_ENGINES, default="async",
+                        help="scan engine (default: async, cancellable with deadlines)")
+    parser.add_argument("--profile-timeout", type=float, metavar="SECONDS",
+                        help="deadline of one profile lookup with the async engine")
+    parser.add_argument("--scan-timeout", type=float, metavar="SECONDS",
+                        help="deadline of a whole scan with the async engine")
+    parser.add_argument("--no-watch", action="store_true",
+                        help="don't update the table when saved networks change")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print import, first-paint and first-record timings to stderr "
+                             "and exit once the first records are shown")
+    args = parser.parse_args(argv)
+    trace = ScanTrace() if args.trace else None
+    startup = StartupProfile(STARTED) if args.profile_startup else None
     
-    def start_retrieval(self, window):
-        """Start password retrieval in a separate thread and update progress bar"""
-        if self.retrieving:
-            return
-            
-        self.retrieving = True
-        
-        def retrieve_thread():
-            window["progress_bar"].update(visible=True)
-            window["status"].update("Scanning Wi-Fi networks...")
-            
-            # Get passwords
-            self.passwords = self.get_wifi_passwords()
-            
-            # Sort passwords
-            self.passwords = OrderedDict(sorted(self.passwords.items()))
-            self.pwds = [list(x) for x in self.passwords.items()]
-            
-            # Add row numbers
-            for i, p in enumerate(self.pwds, 1):
-                p.insert(0, str(i))
-            
-            # Update table
-            window["table"].update(values=self.pwds)
-            window["status"].update(f"Found {len(self.pwds)} Wi-Fi networks")
-            window["progress_bar"].update(visible=False)
-            window["refresh"].update(disabled=False)
-            window["export_btn"].update(disabled=False)
-            window["copy_btn"].update(disabled=False)
-            self.retrieving = False
-        
-        # Start thread
-        threading.Thread(target=retrieve_thread, daemon=True).start()
+    def mark(name):
+        if startup is not None:
+            startup.mark(name)
     
-    def export_to_csv(self, filepath):
-        """Export passwords to CSV file"""
-        try:
-            header = ['S.No.', 'SSID', 'Password']
-            with open(filepath, 'w', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow(header)
-                writer.writerows(self.pwds)
-            return True
-        except Exception as e:
-            return str(e)
+    mark("imports")
+    import PySimpleGUI as sg
+    # Theme and styling
+    sg.theme('LightBlue2')  # Setting a modern theme
+    mark("gui imported")
     
-    def export_to_txt(self, filepath):
-        """Export passwords to text file"""
-        try:
-            with open(filepath, 'w', encoding='utf-8') as file:
-                file.write("Wi-Fi Password Report\n")
-                file.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                file.write(f"System: {platform.system()} {platform.release()}\n\n")
-                file.write("=" * 60 + "\n")
-                
-                for pwd in self.pwds:
-                    file.write(f"{pwd[0]}. {pwd[1]}: {pwd[2]}\n")
-            return True
-        except Exception as e:
-            return str(e)
-    
-    def copy_to_clipboard(self, window, selected_rows):
-        """Copy selected password entries to clipboard"""
-        if not selected_rows:
-            window["status"].update("No rows selected for copying")
-            return
-            
-        try:
-            import pyperclip
-            
-            # Prepare text
-            text = ""
-            for row in selected_rows:
-                data = self.pwds[row]
-                text += f"SSID: {data[1]}, Password: {data[2]}\n"
-                
-            # Copy to clipboard
-            pyperclip.copy(text)
-            window["status"].update(f"Copied {len(selected_rows)} entries to clipboard")
-            
-        except ImportError:
-            window["status"].update("Error: pyperclip module not installed")
-        except Exception as e:
-            window["status"].update(f"Error copying to clipboard: {str(e)}")
-
-def main():
-    """Main function to run the application"""
-    retriever = WiFiPasswordRetriever()
+    retriever = WiFiPasswordRetriever(trace=trace, scan_engine=args.engine,
+                                      profile_timeout=args.profile_timeout,
+                                      scan_timeout=args.scan_timeout)
     
     # Define layout with additional features
     layout = [
@@ -302,9 +60,16 @@ def main():
                 expand_x=True, pad=(10, 10))],
         
         [sg.Button("Scan Networks", key="refresh", size=(15, 1)),
-         sg.Button("Export CSV", key="export_btn", size=(15, 1), disabled=True),
+         sg.Button("Full Rescan", key="full_rescan", size=(15, 1)),
+         sg.Button("Export Data", key="export_btn", size=(15, 1), disabled=True),
          sg.Button("Export TXT", key="export_txt_btn", size=(15, 1), disabled=True),
-         sg.Button("Copy Selected", key="copy_btn", size=(15, 1), disabled=True)],
+         sg.Button("Copy Selected", key="copy_btn", size=(15, 1), disabled=True),
+         sg.Button("Cancel Scan", key="cancel_btn", size=(15, 1), disabled=True)],
+        
+        [sg.Text("Search:"), sg.Input(key="search", size=(30, 1), enable_events=True),
+         sg.Button("<", key="page_prev", size=(3, 1)),
+         sg.Text("No rows", key="page_info", size=(30, 1)),
+         sg.Button(">", key="page_next", size=(3, 1))],
         
         [sg.Table(values=[], key='table', headings=['S.No.', 'SSID', 'Password'],
                   display_row_numbers=False, justification='left',
@@ -334,27 +99,94 @@ def main():
         window = sg.Window("Wi-Fi Password Retriever", layout, 
                         resizable=True, finalize=True,
                         size=(800, 600))
+    window.refresh()
+    mark("first paint")
+    
+    try:
+        from wifipass_store import ScanStore
+        retriever.store = ScanStore()
+    except Exception:
+        # Run without the on-disk cache if the store can't be opened
+        retriever.store = None
     
-    # Event loop
+    # Show the last known inventory immediately, then refresh it in the background
+    stored_at = retriever.load_cached()
+    if stored_at is not None:
+        retriever.refresh_table(window)
+        window["export_btn"].update(disabled=False)
+        window["export_txt_btn"].update(disabled=False)
+        window["refresh"].update(disabled=True)
+        window["full_rescan"].update(disabled=True)
+        retriever.start_retrieval(window)
+        window["status"].update(f"Showing {len(retriever.records)} cached networks from "
+                                f"{datetime.fromtimestamp(stored_at).strftime('%Y-%m-%d %H:%M')}, refreshing...")
+        window.refresh()
+        mark("cached rows")
+    elif startup is not None:
+        # Nothing cached; scan so the time to the first record can be measured
+        window["refresh"].update(disabled=True)
+        window["full_rescan"].update(disabled=True)
+        retriever.start_retrieval(window)
+    
+    # Push saved-network changes into the open window
+    watch = None
+    if not args.no_watch:
+        from wifipass_watch import ProfileWatch
+        watch = ProfileWatch(retriever, lambda delta: window.write_event_value(WATCH_EVENT, delta),
+                             on_error=lambda error: window.write_event_value(WATCH_EVENT,
+                                                                             {"error": error}))
+        watch.start()
+    
+    # Event loop; blocks until a user or scan event arrives
     while True:
-        event, values = window.read(timeout=100)
+        event, values = window.read()
         
         if event == sg.WIN_CLOSED or event == "-done-":
+            # Kill any lookup still running instead of leaving it orphaned
+            retriever.cancel_retrieval()
+            if watch is not None:
+                watch.stop()
             break
+        
+        elif event == "cancel_btn":
+            if retriever.cancel_retrieval():
+                window["cancel_btn"].update(disabled=True)
+                window["status"].update("Cancelling scan...")
+        
+        elif event in (SCAN_BATCH_EVENT, SCAN_DONE_EVENT):
+            retriever.handle_scan_event(window, event, values[event])
+            if trace is not None and event == SCAN_DONE_EVENT:
+                trace.write(args.trace)
+            if startup is not None:
+                window.refresh()
+                mark("first record")
+                print(startup.summary(), file=sys.stderr)
+                retriever.cancel_retrieval()
+                if watch is not None:
+                    watch.stop()
+                break
+        
+        elif event == WATCH_EVENT:
+            retriever.handle_watch_event(window, values[event])
             
-        elif event == "refresh":
+        elif event in ("refresh", "full_rescan"):
+            # Scan Networks trusts unchanged keys; Full Rescan looks every profile up again
             window["refresh"].update(disabled=True)
-            retriever.start_retrieval(window)
+            window["full_rescan"].update(disabled=True)
+            retriever.start_retrieval(window, full=event == "full_rescan" or None)
             
         elif event == "export_btn":
             # Get filename for saving
-            filename = sg.popup_get_file("Save Wi-Fi passwords as CSV", 
+            filename = sg.popup_get_file("Save Wi-Fi passwords as CSV, compressed NDJSON or columnar file", 
                                         save_as=True, 
-                                        file_types=(("CSV Files", "*.csv"),),
+                                        file_types=(("CSV Files", "*.csv"),
+                                                    ("Compressed NDJSON", "*.ndjson.gz"),
+                                                    ("Columnar Files", "*.wpcol")),
                                         default_extension=".csv",
                                         default_path=f"WiFi_Passwords_{datetime.now().strftime('%Y%m%d')}.csv")
             if filename:
-                result = retriever.export_to_csv(filename)
+                # Format follows the chosen extension
+                result = retriever.export_to_file(filename)
                 if result is True:
                     window["status"].update(f"Saved to {filename}")
                 else:
@@ -375,8 +207,17 @@ def main():
                     window["status"].update(f"Error: {result}")
         
         elif event == "copy_btn":
-            selected_rows = values["table"]
+            # Table selections are positions within the visible page
+            selected_rows = [retriever.view.absolute(i) for i in values["table"]]
             retriever.copy_to_clipboard(window, selected_rows)
+        
+        elif event == "search":
+            retriever.view.filter(values["search"])
+            retriever.render_table(window)
+        
+        elif event in ("page_prev", "page_next"):
+            retriever.view.scroll(-1 if event == "page_prev" else 1)
+            retriever.render_table(window)
             
         elif event == "table" and values["table"]:
             # Enable copy button when rows are selected
@@ -2,83 +2,125 @@
 """
 Created on Sun Apr 18 22:40:19 2021
 
-@author:Naveen Kumar Vasudevan, 
-        Doctoral Candidate, 
-        The Xi Research Group, 
+@author:Naveen Kumar Vasudevan,
+        Doctoral Candidate,
+        The Xi Research Group,
         Department of Chemical Engineering,
-        McMaster University, 
-        Hamilton, 
+        McMaster University,
+        Hamilton,
         Canada.
-        
+
         naveenovan@gmail.com
         https://naveenovan.wixsite.com/kuroonai
 """
 
-import os
-from collections import OrderedDict
+import queue
+import threading
 from tkinter import ttk
 import tkinter as tk
+from wifipass_core import WiFiPasswordRetriever
+
+# Rows inserted into the Treeview per after() tick, and the delay between ticks
+CHUNK_SIZE = 200
+TICK_MS = 10
+
+
+class TreeviewLoader:
+    """Stream scan records into a Treeview in chunks scheduled with after()
+
+    The scan runs in a thread and only fills a queue; every tick the Tk loop
+    inserts at most CHUNK_SIZE rows, so the window stays responsive. Once the
+    scan is done the rows are put in SSID order and renumbered, again in chunks.
+    """
 
-wifis = os.popen('netsh wlan show profile').read().split('\n')
-ssids = [x.split(':')[1] for x in wifis if ':' in x]
-
-pwd={}
-for ssid in ssids:
-    if ssid != '':
-        ssid = ssid.lstrip(' ')
-        encrypted = False
-        ssidinfo =  os.popen(f'netsh wlan show profile name={ssid} key=clear').read().split('\n')
-        #print(f'netsh wlan show profile name={ssid} key=clear')
-        
-        if len(ssidinfo) <3 : 
-            ssidinfo=os.popen(f'netsh wlan show profile name=\"{ssid}\" key=clear').read().split('\n')
-            
-        for attributestart, attribute in enumerate(ssidinfo):
-            if 'Authentication' in attribute and 'WPA2-Enterprise' in attribute:
-                pwd.update({ssid : 'Encrypted - not available'})
-                encrypted = True
+    def __init__(self, win, tview, status, retriever):
+        self.win = win
+        self.tview = tview
+        self.status = status
+        self.retriever = retriever
+        self.records = queue.Queue()
+        self.done = threading.Event()
+        self.error = None
+        self.items = {}
+
+    def start(self):
+        threading.Thread(target=self._scan, daemon=True).start()
+        self.win.after(TICK_MS, self._pump)
+
+    def _scan(self):
+        try:
+            for record in self.retriever.iter_wifi_passwords():
+                self.records.put(record)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.done.set()
+
+    def _pump(self):
+        """Insert the next chunk of streamed rows"""
+        # Read done first so no record put before it is left behind
+        done = self.done.is_set()
+        for _ in range(CHUNK_SIZE):
+            try:
+                ssid, password = self.records.get_nowait()
+            except queue.Empty:
                 break
+            if ssid in self.items:
+                self.tview.set(self.items[ssid], "3", password)
+                continue
+            n = len(self.items) + 1
+            self.items[ssid] = self.tview.insert("", 'end', text=f"L{n}",
+                                                 values=(f"{n}", ssid, password))
+
+        if done and self.records.empty():
+            if self.error is not None:
+                self.status.configure(text=f"Scan failed: {self.error}")
+            else:
+                self.status.configure(text=f"Found {len(self.items)} Wi-Fi networks")
+            self._order(sorted(self.items), 0)
+            return
+        self.status.configure(text=f"Scanning Wi-Fi networks... {len(self.items)}")
+        self.win.after(TICK_MS, self._pump)
+
+    def _order(self, ssids, start):
+        """Move rows into SSID order and renumber them, a chunk per tick"""
+        for index in range(start, min(start + CHUNK_SIZE, len(ssids))):
+            item = self.items[ssids[index]]
+            self.tview.move(item, "", index)
+            self.tview.set(item, "1", f"{index + 1}")
+        if start + CHUNK_SIZE < len(ssids):
+            self.win.after(TICK_MS, self._order, ssids, start + CHUNK_SIZE)
+
+
+def main():
+    # Creating tkinter win
+    win = tk.Tk()
+    win.title("Kuroonai's Wi-Fi password revealer")
+    win.resizable(width = 1, height = 1)
+
+    status = ttk.Label(win, text="Scanning Wi-Fi networks...")
+    status.pack(side ='bottom', fill ='x')
+
+    tview = ttk.Treeview(win, selectmode ='browse')
+    tview.pack(side ='left', fill ='both', expand = True)
+    verscrlbar = ttk.Scrollbar(win, orient ="vertical", command = tview.yview)
+    verscrlbar.pack(side ='left', fill ='y')
+
+    tview.configure(yscrollcommand = verscrlbar.set)
+    tview["columns"] = ("1", "2", "3")
+    tview['show'] = 'headings'
+
+    tview.column("1", width = 50, anchor ='c')
+    tview.column("2", width = 200, anchor ='sw')
+    tview.column("3", width = 200, anchor ='sw')
+
+    tview.heading("1", text ="S.No.")
+    tview.heading("2", text ="SSID")
+    tview.heading("3", text ="Password")
+
+    TreeviewLoader(win, tview, status, WiFiPasswordRetriever()).start()
+    win.mainloop()
+
 
-        if encrypted != True:
-            for attributestop, attribute in enumerate(ssidinfo):
-                if 'Key Content' in attribute:
-                    pwd.update({ssid : ssidinfo[attributestop].split(': ')[1]})
-                    break
-                
-passwords = OrderedDict(sorted(pwd.items()))
-pwds = [list(x) for x in passwords.items()]
-ssidslist, pwdslist = list(zip(*pwds))[0], list(zip(*pwds))[1]
-
-col1max = len(max(ssidslist, key = len))
-col2max = len(max(pwdslist, key = len))
-
-rows = len(pwds)
-   
-# Creating tkinter win
-win = tk.Tk()
-win.title("Kuroonai's Wi-Fi password revealer")
-win.resizable(width = 1, height = 1)
-
-tview = ttk.Treeview(win, selectmode ='browse')
-tview.pack(side ='left')
-verscrlbar = ttk.Scrollbar(win, orient ="vertical", command = tview.yview)
-verscrlbar.pack(side ='left', fill ='x')
-
-tview.configure(xscrollcommand = verscrlbar.set)
-tview["columns"] = ("1", "2", "3")
-tview['show'] = 'headings'
-  
-tview.column("1", width = 50, anchor ='c')
-tview.column("2", width = 200, anchor ='sw')
-tview.column("3", width = 200, anchor ='sw')
-
-tview.heading("1", text ="S.No.")
-tview.heading("2", text ="SSID")
-tview.heading("3", text ="Password")
-  
-
-for i in range(rows):
-    tview.insert("", 'end', text =f"L{i+1}", 
-                 values =(f"{i+1}", f"{pwds[i][0]}", f"{pwds[i][1]}"))
-
-win.mainloop()
+if __name__ == "__main__":
+    main()
@@ -2,109 +2,82 @@
 """
 Created on Sun Apr 18 22:40:19 2021
 
-@author:Naveen Kumar Vasudevan, 
-        Doctoral Candidate, 
-        The Xi Research Group, 
+@author:Naveen Kumar Vasudevan,
+        Doctoral Candidate,
+        The Xi Research Group,
         Department of Chemical Engineering,
-        McMaster University, 
-        Hamilton, 
+        McMaster University,
+        Hamilton,
         Canada.
-        
+
         naveenovan@gmail.com
         https://naveenovan.wixsite.com/kuroonai
 """
 
 import os
-from collections import OrderedDict
-import PySimpleGUI as sg
-import csv
+import threading
 from datetime import datetime
-# data to be written row-wise in csv fil
+import PySimpleGUI as sg
+from wifipass_core import WiFiPasswordRetriever, SCAN_DONE_EVENT
 
 
+def table_rows(retriever):
+    """Numbered table rows of the retriever's records"""
+    return [retriever.records.row(i) for i in range(len(retriever.records))]
 
 
-# from tkinter import ttk
-# import tkinter as tk
+def main():
+    retriever = WiFiPasswordRetriever()
 
-wifis = os.popen('netsh wlan show profile').read().split('\n')
-ssids = [x.split(':')[1] for x in wifis if ':' in x]
+    layout = [
+        [sg.Table(values=[], key='table',font=('',14),
+                  headings=['S.No.', 'SSID','passwords'],
+                  display_row_numbers=False,justification='left',
+                  auto_size_columns=False, col_widths=[6, 30, 30],
+                  num_rows=20)],
+        [sg.In(size=(40, 1), enable_events=True, key="Folder"),
+                 sg.FolderBrowse('Save table'), sg.Button('Done', key='-done-')],
 
-pwd={}
-for ssid in ssids:
-    if ssid != '':
-        ssid = ssid.lstrip(' ')
-        encrypted = False
-        ssidinfo =  os.popen(f'netsh wlan show profile name={ssid} key=clear').read().split('\n')
-        #print(f'netsh wlan show profile name={ssid} key=clear')
-        
-        if len(ssidinfo) <3 : 
-            ssidinfo=os.popen(f'netsh wlan show profile name=\"{ssid}\" key=clear').read().split('\n')
-            
-        for attributestart, attribute in enumerate(ssidinfo):
-            if 'Authentication' in attribute and 'WPA2-Enterprise' in attribute:
-                pwd.update({ssid : 'Encrypted - not available'})
-                encrypted = True
-                break
+        [sg.Text("Scanning Wi-Fi networks...", size=(60, 2), key="savedloc", text_color='black')],
+    ]
 
-        if encrypted != True:
-            for attributestop, attribute in enumerate(ssidinfo):
-                if 'Key Content' in attribute:
-                    pwd.update({ssid : ssidinfo[attributestop].split(': ')[1]})
-                    break
-                
-passwords = OrderedDict(sorted(pwd.items()))
-pwds = [list(x) for x in passwords.items()]
-ssidslist, pwdslist = list(zip(*pwds))[0], list(zip(*pwds))[1]
+    window = sg.Window("Kuroonai's Wi-Fi password revealer", layout, icon='logo.ico',
+                       grab_anywhere=False, finalize=True)
 
-col1max = len(max(ssidslist, key = len))
-col2max = len(max(pwdslist, key = len))
+    # Scan with the shared engine while the window is already open
+    def scan():
+        try:
+            window.write_event_value(SCAN_DONE_EVENT,
+                                     {"passwords": retriever.get_wifi_passwords()})
+        except Exception as e:
+            window.write_event_value(SCAN_DONE_EVENT, {"error": str(e)})
+    threading.Thread(target=scan, daemon=True).start()
+
+    while True:
+        event, values = window.read()
 
-rows = range(1,len(pwds)+1)
-for p,r in zip(pwds,rows):
-    p.insert(0,str(r))
+        if event == "Exit" or event == sg.WIN_CLOSED or event == '-done-':
+            break
 
-layout = [
-    [sg.Table(values=pwds, key='table',font=('',14),
-              headings=['S.No.', 'SSID','passwords'],
-              display_row_numbers=False,justification='left',
-              auto_size_columns=True,
-              num_rows=min(100, len(pwds)))],
-    [sg.In(size=(40, 1), enable_events=True, key="Folder"),
-             sg.FolderBrowse('Save table'), sg.Button('Done', key='-done-')],
+        elif event == SCAN_DONE_EVENT and "error" in values[event]:
+            window['savedloc'].update(f"Scan failed: {values[event]['error']}")
 
-    [sg.Text(size=(60, 2), key="savedloc", text_color='black')], 
-]
+        elif event == SCAN_DONE_EVENT:
+            retriever.set_passwords(values[event]["passwords"])
+            rows = table_rows(retriever)
+            window['table'].update(values=rows, num_rows=min(100, max(len(rows), 1)))
+            window['savedloc'].update(f"Found {len(rows)} Wi-Fi networks")
 
-window = sg.Window("Kuroonai's Wi-Fi password revealer", layout, icon='logo.ico', grab_anywhere=False)
+        elif event == 'Folder' and values['Folder']:
+            filename = f"WiFi pass-{datetime.now().strftime('%Y_%m_%d-%I_%M_%S_%p')}.csv"
+            result = retriever.export_to_csv(os.path.join(values['Folder'], filename))
+            if result is True:
+                window['savedloc'].update(f"File saved at {values['Folder']} as {filename}")
+            else:
+                window['savedloc'].update(f"Export failed: {result}")
 
+    window.close()
 
 
-while True:
-        event, values = window.read()
-        
-        if event == "Exit" or event == sg.WIN_CLOSED or event == '-done-':
-            break
-        
-        elif event == "table":
-            pass
-        
-        elif event == 'Folder':
-            
-            try:
-                os.chdir(values['Folder'])
-                header = ['S.No.', 'SSID', 'Passwords']
-                with open(f'WiFi pass-{datetime.now().strftime("%Y_%m_%d-%I_%M_%S_%p")}.csv',\
-                            'a+', newline ='') as file:
-     
-                    write = csv.writer(file)
-                    write.writerow(header)
-                    write.writerows(pwds)
-    
-                window['savedloc'].update(f"File saved at {values['Folder']} as WiFi pass-{datetime.now().strftime('%Y_%m_%d-%I_%M_%S_%p')}.csv'")
-            except:
-                pass
-              
-            
-            
-window.close()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+asyncio scan engine with deadlines and cancellation
+
+AsyncScanEngine runs the platform tools with asyncio.create_subprocess_exec
+on a private event loop. Concurrency is bounded by a semaphore; every profile
+lookup has its own deadline and the whole scan has another. A scan that is
+cancelled (from any thread) or runs out of time kills its child processes and
+returns the results collected so far; engine.status tells how it ended.
+"""
+
+import asyncio
+import subprocess
+import tempfile
+import threading
+
+from wifipass_core import (diff_passwords, parse_iwlist_ssids, parse_wifi_devices,
+                           command_encoding, DEFAULT_MACOS_DEVICE)
+from wifipass_linux import nmcli_steps
+from wifipass_keychain import airport_password
+from wifipass_netsh import parse_show_profiles_by_interface
+
+# Deadline of one profile lookup, including the quoted-name retry
+DEFAULT_PROFILE_TIMEOUT = 30.0
+
+# Deadline of a whole scan
+DEFAULT_SCAN_TIMEOUT = 300.0
+
+# Value recorded for a profile whose lookup missed its deadline
+LOOKUP_TIMED_OUT = 'Lookup Timed Out'
+
+# How a scan ended
+STATUS_COMPLETE = "complete"
+STATUS_TIMEOUT = "timeout"
+STATUS_CANCELLED = "cancelled"
+
+
+async def run_command_async(cmd):
+    """Run a command on the event loop and return its output as text
+
+    The child is killed if the awaiting task is cancelled or times out.
+    """
+    spawn = asyncio.ensure_future(asyncio.create_subprocess_exec(
+        *cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL))
+    process = None
+    try:
+        # Shielded so a caller cancelled mid-spawn can still reap the child
+        process = await asyncio.shield(spawn)
+        output, _ = await process.communicate()
+    except BaseException:
+        if process is None:
+            try:
+                process = await spawn
+            except Exception:
+                pass
+        if process is not None and process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+            await process.wait()
+        raise
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, cmd, output)
+    # Same decoding as run_command
+    return output.decode(command_encoding(cmd), errors="replace").replace('\r\n', '\n')
+
+
+async def run_steps_async(steps, call):
+    """Drive a lookup generator like wifipass_core.run_steps, awaiting each command"""
+    try:
+        cmd = next(steps)
+        while True:
+            try:
+                output = await call(cmd)
+            except Exception as e:
+                cmd = steps.throw(e)
+            else:
+                cmd = steps.send(output)
+    except StopIteration as stop:
+        return stop.value
+
+
+class AsyncScanEngine:
+    """Scan engine driving the retriever's backends through asyncio subprocesses
+
+    Once cancelled, an engine stays cancelled; create one per scan.
+    """
+
+    def __init__(self, retriever, runner=None, max_concurrency=None,
+                 profile_timeout=None, scan_timeout=None):
+        self.retriever = retriever
+        # Async command runner, injectable like the retriever's runner
+        self.runner = runner or run_command_async
+        self.max_concurrency = max_concurrency or retriever.max_workers or 1
+        self.profile_timeout = profile_timeout or DEFAULT_PROFILE_TIMEOUT
+        self.scan_timeout = scan_timeout or DEFAULT_SCAN_TIMEOUT
+        self.status = None
+        self._lock = threading.Lock()
+        self._loop = None
+        self._task = None
+        self._cancelled = False
+
+    def scan(self, on_record=None, on_total=None):
+        """Scan all profiles; returns the SSID to password mapping, partial if interrupted
+
+        on_record is called with (ssid, password) as each lookup finishes and
+        on_total with the number of expected records once known.
+        """
+        passwords = {}
+
+        def record(ssid, password):
+            passwords[ssid] = password
+            if on_record is not None:
+                on_record(ssid, password)
+
+        marker = self.retriever.key_marker()
+        self._run(self._collect(record, on_total))
+        if self.status == STATUS_COMPLETE and "Error" not in passwords:
+            self.retriever._note_full_lookup(marker)
+        return passwords
+
+    def rescan(self, old, full=None):
+        """Look up profiles missing from old or whose keys changed and return the delta
+
+        full is the retriever's rescan flag. A complete rescan is saved to
+        the store; an interrupted one only reports the profiles it added.
+        """
+        retriever = self.retriever
+        marker, stale, refresh = retriever._rescan_plan(full)
+        if retriever.os_type not in ("Windows", "Darwin") or stale is None:
+            passwords = None
+            if refresh:
+                fingerprint = (retriever.backend_fingerprint()
+                               if retriever.store is not None else None)
+            else:
+                passwords, fingerprint = retriever._load_fresh()
+            if passwords is None:
+                passwords = self.scan()
+                if self.status != STATUS_COMPLETE:
+                    return diff_passwords({}, {ssid: password
+                                               for ssid, password in passwords.items()
+                                               if ssid not in old})
+                retriever._store_result(fingerprint, passwords)
+            return diff_passwords(old, passwords)
+
+        listing = []
+        looked_up = {}
+        skip = {ssid for ssid in old if ssid not in stale}
+        self._run(self._collect(looked_up.__setitem__, skip=skip, listing=listing))
+        if self.status != STATUS_COMPLETE or "Error" in looked_up:
+            return diff_passwords({}, {ssid: password for ssid, password in looked_up.items()
+                                       if ssid != "Error" and ssid not in old})
+        new = {ssid: looked_up[ssid] if ssid in looked_up else old[ssid] for ssid in listing}
+        retriever._note_rescan(marker, listing, new)
+        return diff_passwords(old, new)
+
+    def cancel(self):
+        """Cancel the running scan; safe to call from any thread"""
+        with self._lock:
+            self._cancelled = True
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._task.cancel)
+
+    def _run(self, coro):
+        """Run a scan coroutine to completion on a private event loop"""
+        self.status = None
+        asyncio.run(self._guard(coro))
+
+    async def _guard(self, coro):
+        """Apply the scan deadline and turn cancellation into a status"""
+        with self._lock:
+            if self._cancelled:
+                coro.close()
+                self.status = STATUS_CANCELLED
+                return
+            self._loop = asyncio.get_running_loop()
+            self._task = asyncio.current_task()
+        try:
+            await asyncio.wait_for(coro, self.scan_timeout)
+            self.status = STATUS_COMPLETE
+        except asyncio.TimeoutError:
+            self.retriever.trace.failure("scan", f"deadline of {self.scan_timeout:g}s exceeded")
+            self.status = STATUS_TIMEOUT
+        except asyncio.CancelledError:
+            self.status = STATUS_CANCELLED
+        finally:
+            with self._lock:
+                self._loop = None
+                self._task = None
+
+    async def _call(self, cmd):
+        """Run one platform command, counting it for the trace"""
+        self.retriever.trace.count("subprocess")
+        return await self.runner(cmd)
+
+    async def _call_within(self, cmd):
+        """Run one platform command within the per-profile deadline"""
+        try:
+            return await asyncio.wait_for(self._call(cmd), self.profile_timeout)
+        except asyncio.TimeoutError:
+            raise subprocess.TimeoutExpired(cmd, self.profile_timeout) from None
+
+    async def _collect(self, record, on_total=None, skip=None, listing=None):
+        """Pass every (ssid, password) of the current backend to record"""
+        retriever = self.retriever
+        if retriever.os_type == "Windows" and retriever.windows_engine == "export" and skip is None:
+            if await self._collect_export(record, on_total):
+                return
+
+        if retriever.os_type in ("Windows", "Darwin"):
+            try:
+                ssids = await asyncio.wait_for(self._list_profiles(), self.profile_timeout)
+            except (subprocess.SubprocessError, OSError, asyncio.TimeoutError):
+                record("Error", "Unable to retrieve Wi-Fi profiles")
+                return
+            if listing is not None:
+                listing.extend(ssids)
+            if skip is not None:
+                ssids = [ssid for ssid in ssids if ssid not in skip]
+            if on_total is not None:
+                on_total(len(ssids))
+
+            if retriever.os_type == "Darwin" and skip is None:
+                dumped = await run_steps_async(retriever._airport_dump_steps(),
+                                               self._call_within)
+                if dumped is not None:
+                    for ssid in ssids:
+                        record(ssid, airport_password(dumped, ssid))
+                    return
+
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+
+            async def lookup(ssid):
+                async with semaphore:
+                    password = await self._lookup(ssid)
+                record(ssid, password)
+
+            # return_exceptions keeps a cancelled gather waiting until every
+            # lookup has reaped its child, instead of finishing at the first one
+            for result in await asyncio.gather(*map(lookup, ssids), return_exceptions=True):
+                if isinstance(result, BaseException):
+                    raise result
+
+        elif retriever.os_type == "Linux":
+            sources, unreadable = retriever.linux_sources()
+            if sources == ["networkmanager"] and not unreadable:
+                # Local file reads; the keyfile cache skips unchanged files
+                try:
+                    for ssid, password in retriever.keyfile_cache.iter_scan(
+                            retriever.nm_dir, on_total, retriever.store):
+                        record(ssid, password)
+                except OSError as e:
+                    record("Error", f"Linux password retrieval error: {str(e)}")
+            elif sources or unreadable:
+                passwords = await self._read_linux_sources(sources, unreadable)
+                if on_total is not None:
+                    on_total(len(passwords))
+                for ssid, password in passwords.items():
+                    record(ssid, password)
+            else:
+                await self._collect_iwlist(record, on_total)
+
+        else:
+            record("Error", f"Unsupported OS: {retriever.os_type}")
+
+    async def _read_linux_sources(self, sources, unreadable):
+        """Read the Linux sources, nmcli on the event loop and files directly, and merge them"""
+        retriever = self.retriever
+        if not sources:
+            return retriever._get_linux_wifi_passwords()
+        nmcli = asyncio.ensure_future(self._read_nmcli()) if "nmcli" in sources else None
+        # Let nmcli spawn before the file sources are read
+        await asyncio.sleep(0)
+        results = [None if name == "nmcli" else retriever._try_linux_source(name)
+                   for name in sources]
+        if nmcli is not None:
+            results[sources.index("nmcli")] = await nmcli
+        return retriever._merge_linux_results(sources, unreadable, results)
+
+    async def _read_nmcli(self):
+        """Return nmcli's (ssid, password) pairs, or the exception that stopped it"""
+        try:
+            with self.retriever.trace.stage("nmcli"):
+                return await run_steps_async(nmcli_steps(), self._call_within)
+        except (subprocess.SubprocessError, OSError) as e:
+            return e
+
+    async def _collect_iwlist(self, record, on_total):
+        """List visible networks with iwlist when no saved-network source exists"""
+        try:
+            output = await asyncio.wait_for(self._call(["iwlist", "scanning"]),
+                                            self.profile_timeout)
+        except (subprocess.SubprocessError, OSError, asyncio.TimeoutError):
+            record("Error", "Network information unavailable. Try running with sudo.")
+            return
+        ssids = parse_iwlist_ssids(output)
+        if on_total is not None:
+            on_total(len(ssids))
+        for ssid in ssids:
+            record(ssid, "Password stored in system keyring")
+
+    async def _collect_export(self, record, on_total):
+        """Bulk-export Windows profiles; returns False if the export failed"""
+        retriever = self.retriever
+        with tempfile.TemporaryDirectory(prefix="wifipass-") as folder:
+            if not await run_steps_async(retriever._windows_export_steps(folder), self._call):
+                return False
+            for ssid, password in retriever._iter_windows_export_folder(folder, on_total):
+                record(ssid, password)
+        return True
+
+    async def _list_profiles(self):
+        """Return the saved profile names of the Windows or macOS backend, over every interface"""
+        retriever = self.retriever
+        with retriever.trace.stage("list_profiles"):
+            if retriever.os_type == "Windows":
+                output = await self._call(['netsh', 'wlan', 'show', 'profiles'])
+                return retriever._note_interfaces(parse_show_profiles_by_interface(output))
+            try:
+                devices = parse_wifi_devices(
+                    await self._call(["networksetup", "-listallhardwareports"]))
+            except (subprocess.SubprocessError, OSError) as e:
+                retriever.trace.failure("hardware_ports", str(e))
+                devices = []
+            devices = devices or [DEFAULT_MACOS_DEVICE]
+            # The per-device listings run concurrently
+            outputs = await asyncio.gather(
+                *(self._call(["networksetup", "-listpreferredwirelessnetworks", device])
+                  for device in devices), return_exceptions=True)
+            for output in outputs:
+                if isinstance(output, BaseException) and not isinstance(output, Exception):
+                    raise output
+            return retriever._note_macos_listings(devices, outputs)
+
+    async def _lookup(self, ssid):
+        """Look up one profile within the per-profile deadline"""
+        retriever = self.retriever
+        steps = (retriever._windows_profile_steps(ssid) if retriever.os_type == "Windows"
+                 else retriever._macos_profile_steps(ssid))
+        with retriever.trace.stage("profile", profile=ssid):
+            try:
+                return await asyncio.wait_for(run_steps_async(steps, self._call),
+                                              self.profile_timeout)
+            except asyncio.TimeoutError:
+                retriever.trace.count("timeout")
+                retriever.trace.failure(ssid, f"lookup exceeded {self.profile_timeout:g}s")
+                return LOOKUP_TIMED_OUT
@@ -0,0 +1,1317 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Wi-Fi password retrieval engine shared by the frontends
+"""
+
+import os
+import sys
+import locale
+import subprocess
+import re
+import platform
+import time
+import bisect
+from collections import OrderedDict
+import threading
+from wifipass_view import TableView
+from wifipass_records import NetworkRecord, RecordSet
+from wifipass_trace import NULL_TRACE
+
+# Only the backend of the running OS is used, so the platform modules
+# (wifipass_netsh, wifipass_keychain, wifipass_linux), the exporters and the
+# thread pool are imported where they are first needed to keep startup short.
+
+# Number of concurrent per-profile lookups on Windows
+DEFAULT_MAX_WORKERS = 8
+
+# Windows engines: one netsh call per profile, or a single bulk export
+WINDOWS_ENGINES = ("show", "export")
+
+# NetworkManager keyfile directory
+NM_CONNECTIONS_DIR = "/etc/NetworkManager/system-connections/"
+
+# Windows keeps every profile, key included, in one XML file per interface
+# and profile under this directory
+WLAN_PROFILES_DIR = os.path.join(os.environ.get("ProgramData", r"C:\ProgramData"), "Microsoft",
+                                 "Wlansvc", "Profiles", "Interfaces")
+
+# Events posted from the scan thread to the GUI event loop
+SCAN_BATCH_EVENT = "-scan-batch-"
+SCAN_DONE_EVENT = "-scan-done-"
+# Posted by the profile watch with a delta of changed saved networks
+WATCH_EVENT = "-watch-delta-"
+
+# Streamed results are posted to the GUI in batches of this size or age
+SCAN_BATCH_SIZE = 50
+SCAN_BATCH_INTERVAL = 0.1
+
+# Seconds after which a rescan looks up every profile again, even with no key change seen
+DEFAULT_FULL_RESCAN_INTERVAL = 60 * 60
+
+# Scan engines behind start_retrieval: a worker thread with a thread pool, or asyncio
+SCAN_ENGINES = ("thread", "async")
+
+# macOS device listed when the Wi-Fi hardware ports cannot be enumerated
+DEFAULT_MACOS_DEVICE = "en0"
+
+# A port of `networksetup -listallhardwareports` and the ones that are Wi-Fi
+HARDWARE_PORT_RE = re.compile(r'^Hardware Port: (.+)\nDevice: (\S+)', re.M)
+WIFI_PORT_RE = re.compile(r'wi-?fi|airport|wlan|802\.11', re.I)
+
+SSID_RE = re.compile(r'ssid=(.*)')
+PSK_RE = re.compile(r'psk=(.*)')
+
+
+def command_encoding(cmd):
+    """Encoding of a platform command's output
+    
+    netsh writes in the console's OEM code page (cp850, cp437, ...), not in
+    the ANSI code page text mode would assume.
+    """
+    if sys.platform == "win32" and os.path.basename(cmd[0]).lower() in ("netsh", "netsh.exe"):
+        return "oem"
+    return locale.getpreferredencoding(False)
+
+
+def run_command(cmd):
+    """Run a command and return its standard output as text"""
+    output = subprocess.check_output(cmd, stderr=subprocess.DEVNULL)
+    return output.decode(command_encoding(cmd), errors="replace").replace('\r\n', '\n')
+
+
+def run_steps(steps, runner):
+    """Drive a lookup generator with a blocking runner and return its result
+    
+    The generator yields the commands to run and is sent each output, or
+    thrown the exception the command failed with, so the same lookup serves
+    the thread and the async engine.
+    """
+    try:
+        cmd = next(steps)
+        while True:
+            try:
+                output = runner(cmd)
+            except Exception as e:
+                cmd = steps.throw(e)
+            else:
+                cmd = steps.send(output)
+    except StopIteration as stop:
+        return stop.value
+
+
+def parse_preferred_networks(output):
+    """Return the SSIDs of `networksetup -listpreferredwirelessnetworks` output"""
+    return [line.strip() for line in output.split('\n')[1:] if line.strip()]
+
+
+def parse_wifi_devices(output):
+    """Return the Wi-Fi devices of `networksetup -listallhardwareports` output"""
+    return [device for port, device in HARDWARE_PORT_RE.findall(output)
+            if WIFI_PORT_RE.search(port)]
+
+
+def parse_iwlist_ssids(output):
+    """Return the non-empty ESSIDs of `iwlist scanning` output"""
+    ssids = []
+    for line in output.split('\n'):
+        if "ESSID:" in line:
+            ssid = line.split('ESSID:"')[1].split('"')[0]
+            if ssid:
+                ssids.append(ssid)
+    return ssids
+
+
+def _local_tag(tag):
+    """Strip the XML namespace from an element tag"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_wlan_profile(path):
+    """Stream-parse one exported WLAN profile XML file into a dict"""
+    profile = {"name": None, "ssid": None, "authentication": None, "cipher": None,
+               "key_material": None, "protected": False, "one_x": False}
+    import xml.etree.ElementTree as ET
+    name = None
+    path_stack = []
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        tag = _local_tag(elem.tag)
+        if event == "start":
+            path_stack.append(tag)
+            continue
+        
+        text = (elem.text or "").strip()
+        parent = path_stack[-2] if len(path_stack) > 1 else None
+        if tag == "name" and parent == "SSID" and profile["ssid"] is None:
+            profile["ssid"] = text
+        elif tag == "name" and parent == "WLANProfile":
+            name = text
+            profile["name"] = text
+        elif tag == "authentication":
+            profile["authentication"] = text
+        elif tag == "encryption":
+            profile["cipher"] = text
+        elif tag == "useOneX":
+            profile["one_x"] = text.lower() == "true"
+        elif tag == "protected":
+            profile["protected"] = text.lower() == "true"
+        elif tag == "keyMaterial":
+            profile["key_material"] = text
+        
+        path_stack.pop()
+        elem.clear()
+    
+    if not profile["ssid"]:
+        profile["ssid"] = name
+    return profile
+
+
+def wlan_profile_password(profile):
+    """Map a parsed WLAN profile to the value shown for its password"""
+    # 802.1X profiles carry credentials per user, not a shared key
+    if profile["one_x"]:
+        return 'Enterprise Authentication - Not Available'
+    # A protected key is the encrypted blob, exported without key=clear or by a non-admin
+    if profile["key_material"] and not profile["protected"]:
+        return profile["key_material"]
+    return 'No Password or Not Available'
+
+
+def parse_nm_keyfile(content, file):
+    """Extract the SSID and password from a NetworkManager keyfile"""
+    ssid_match = SSID_RE.search(content)
+    if ssid_match:
+        ssid = ssid_match.group(1).strip()
+    else:
+        ssid = file.replace('.nmconnection', '')
+    
+    psk_match = PSK_RE.search(content)
+    if psk_match:
+        return ssid, psk_match.group(1).strip()
+    return ssid, "No Password or Enterprise Auth"
+
+
+def keyfile_name_ssid(name):
+    """SSID shown for a NetworkManager keyfile that can't be read"""
+    return name.replace('.nmconnection', '')
+
+
+class KeyfileCache:
+    """Parse cache for profile files keyed by path, inode, size and mtime
+    
+    Defaults to NetworkManager keyfiles; parse(content, name) and
+    name_to_ssid(name) adapt it to other one-file-per-network stores. Scans
+    given a ScanStore start from the entries saved there under name and save
+    them back when a file changed, so a new process doesn't re-read them all.
+    """
+    
+    def __init__(self, parse=None, name_to_ssid=None, suffixes=None, name="networkmanager"):
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.parse = parse or parse_nm_keyfile
+        self.name_to_ssid = name_to_ssid or keyfile_name_ssid
+        # Only files with these suffixes are read; None reads every file
+        self.suffixes = suffixes
+        self.name = name
+        # Store the entries were loaded from, read once per process
+        self.loaded_from = None
+    
+    def scan(self, folder, store=None):
+        """Return (ssid, password) pairs for a folder, re-reading only changed files"""
+        return list(self.iter_scan(folder, store=store))
+    
+    def iter_scan(self, folder, on_total=None, store=None):
+        """Yield (ssid, password) pairs for a folder, re-reading only changed files"""
+        if store is not None and store is not self.loaded_from:
+            stored = store.load_keyfiles(self.name)
+            stored.update(self.entries)
+            self.entries = stored
+            self.loaded_from = store
+        changed = False
+        seen = set()
+        with os.scandir(folder) as it:
+            entries = sorted((entry for entry in it
+                              if self.suffixes is None or entry.name.endswith(self.suffixes)),
+                             key=lambda entry: entry.name)
+        if on_total is not None:
+            on_total(len(entries))
+        
+        for entry in entries:
+            path = entry.path
+            seen.add(path)
+            try:
+                st = entry.stat()
+                key = (st.st_ino, st.st_size, st.st_mtime_ns)
+                cached = self.entries.get(path)
+                if cached is not None and cached[0] == key:
+                    self.hits += 1
+                    yield cached[1]
+                    continue
+                
+                self.misses += 1
+                changed = True
+                with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                    parsed = self.parse(f.read(), entry.name)
+                self.entries[path] = (key, parsed)
+            except (PermissionError, IOError):
+                # This will happen if not running as root; not cached so it is retried
+                self.entries.pop(path, None)
+                parsed = (self.name_to_ssid(entry.name), "Permission Denied (Run as root)")
+            yield parsed
+        
+        # Drop entries for deleted keyfiles
+        for path in set(self.entries) - seen:
+            del self.entries[path]
+            changed = True
+        if changed and store is not None:
+            store.save_keyfiles(self.name, self.entries)
+    
+    def stats(self):
+        """Return cache hit and miss counts"""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries)}
+
+
+def iter_pooled(func, items, max_workers):
+    """Yield (item, func(item)) as each call completes, keeping at most 2 * max_workers in flight"""
+    if not max_workers or max_workers <= 1:
+        for item in items:
+            yield item, func(item)
+        return
+    
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = {}
+        for item in items:
+            pending[pool.submit(func, item)] = item
+            if len(pending) >= 2 * max_workers:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+
+
+def pooled_map(func, items, max_workers):
+    """Return [func(item) for item in items], spreading the calls over up to max_workers threads"""
+    items = list(items)
+    if not max_workers or max_workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return list(pool.map(func, items))
+
+
+def diff_passwords(old, new):
+    """Compute the added/removed/changed delta between two SSID to password mappings"""
+    return {
+        "added": {ssid: password for ssid, password in new.items() if ssid not in old},
+        "removed": [ssid for ssid in old if ssid not in new],
+        "changed": {ssid: password for ssid, password in new.items()
+                    if ssid in old and old[ssid] != password},
+    }
+
+
+class WiFiPasswordRetriever:
+    def __init__(self, runner=None, max_workers=DEFAULT_MAX_WORKERS, windows_engine="show",
+                 store=None, trace=None, scan_engine="thread", profile_timeout=None,
+                 scan_timeout=None):
+        self.passwords = {}
+        # Wireless interfaces found by the last listing, and the ones holding each profile
+        self.wifi_interfaces = []
+        self.interfaces = {}
+        # (authentication, cipher) of each profile from its last lookup, where the backend tells
+        self.security = {}
+        # Sorted table rows, stored column-wise; row numbers are rendered on demand
+        self.records = RecordSet()
+        self.os_type = platform.system()
+        self.retrieving = False
+        # Held while scanning or computing a delta (GUI scan thread, profile watch, server),
+        # so they never run at once; self.passwords is replaced, not changed, outside a scan
+        self.scan_lock = threading.Lock()
+        self.scan_count = 0
+        # Command runner is injectable so backends can be driven by fakes
+        self.runner = runner or run_command
+        self.max_workers = max_workers
+        if windows_engine not in WINDOWS_ENGINES:
+            raise ValueError(f"Unknown Windows engine: {windows_engine}")
+        self.windows_engine = windows_engine
+        self.nm_dir = NM_CONNECTIONS_DIR
+        # Files whose stat tells when a saved key changed (None: the standard locations)
+        self.wlan_profiles_dir = None
+        self.keychain_path = None
+        # Key marker and time of the last lookup of every profile, which rescans compare against
+        self.lookup_marker = None
+        self.full_lookup_at = None
+        self.full_rescan_interval = DEFAULT_FULL_RESCAN_INTERVAL
+        # wpa_supplicant configurations and iwd profiles (None: the standard locations)
+        self.wpa_supplicant_paths = None
+        self.iwd_dir = None
+        self.iwd_cache = None
+        self.use_nmcli = True
+        # Last result of each Linux source, reused when only some of them change
+        self.linux_results = {}
+        self.keyfile_cache = KeyfileCache()
+        # Optional ScanStore used for instant startup and fingerprint-validated rescans
+        self.store = store
+        # Virtualized view over self.records; only one page is handed to the table widget
+        self.view = TableView()
+        # Optional ScanTrace; the default NULL_TRACE makes every hook a no-op
+        self.trace = trace or NULL_TRACE
+        if scan_engine not in SCAN_ENGINES:
+            raise ValueError(f"Unknown scan engine: {scan_engine}")
+        self.scan_engine = scan_engine
+        # Deadlines of the async engine; None keeps its defaults
+        self.profile_timeout = profile_timeout
+        self.scan_timeout = scan_timeout
+        # AsyncScanEngine of the running GUI scan, used to cancel it
+        self.engine = None
+    
+    def _run(self, cmd):
+        """Run a platform command through the runner, counting it for the trace"""
+        self.trace.count("subprocess")
+        return self.runner(cmd)
+        
+    def get_wifi_passwords(self):
+        """Retrieve Wi-Fi passwords based on the operating system"""
+        marker = self.key_marker()
+        with self.trace.stage("scan", backend=self.backend_name()):
+            passwords = self._get_backend_passwords()
+        if "Error" not in passwords:
+            self._note_full_lookup(marker)
+        return passwords
+    
+    def _note_full_lookup(self, marker):
+        """Record that every profile was looked up with the keys as of marker"""
+        self.lookup_marker = marker
+        self.full_lookup_at = time.time()
+    
+    def _get_backend_passwords(self):
+        """Dispatch to the backend of the current operating system"""
+        if self.os_type == "Windows":
+            if self.windows_engine == "export":
+                return self._get_windows_wifi_passwords_export()
+            return self._get_windows_wifi_passwords()
+        elif self.os_type == "Darwin":  # macOS
+            return self._get_macos_wifi_passwords()
+        elif self.os_type == "Linux":
+            return self._get_linux_wifi_passwords()
+        else:
+            return {"Error": f"Unsupported OS: {self.os_type}"}
+    
+    def iter_wifi_passwords(self, on_total=None):
+        """Yield (ssid, password) records as soon as each lookup finishes
+        
+        on_total, if given, is called with the number of expected records once known.
+        """
+        marker = self.key_marker()
+        failed = False
+        for ssid, password in self._iter_backend_passwords(on_total):
+            failed = failed or ssid == "Error"
+            yield ssid, password
+        if not failed:
+            self._note_full_lookup(marker)
+    
+    def _iter_backend_passwords(self, on_total=None):
+        """Yield the (ssid, password) records of the current backend"""
+        if self.os_type == "Windows":
+            if self.windows_engine == "export":
+                yield from self._iter_windows_export(on_total)
+                return
+            try:
+                ssids = self._list_windows_profiles()
+            except (subprocess.SubprocessError, OSError):
+                yield "Error", "Unable to retrieve Wi-Fi profiles"
+                return
+            if on_total is not None:
+                on_total(len(ssids))
+            yield from iter_pooled(self._get_windows_profile_password, ssids, self.max_workers)
+        elif self.os_type == "Linux" and self.linux_sources() == (["networkmanager"], []):
+            try:
+                yield from self.keyfile_cache.iter_scan(self.nm_dir, on_total, self.store)
+            except OSError as e:
+                yield "Error", f"Linux password retrieval error: {str(e)}"
+        else:
+            passwords = self._get_backend_passwords()
+            if on_total is not None:
+                on_total(len(passwords))
+            yield from passwords.items()
+    
+    def _get_windows_wifi_passwords(self):
+        """Retrieve Wi-Fi passwords on Windows"""
+        # Get all Wi-Fi profiles
+        try:
+            ssids = self._list_windows_profiles()
+        except (subprocess.SubprocessError, OSError):
+            return {"Error": "Unable to retrieve Wi-Fi profiles"}
+        
+        # Get password for each SSID, spreading lookups over a thread pool
+        results = pooled_map(self._get_windows_profile_password, ssids, self.max_workers)
+        
+        # Results come back in profile order regardless of completion order
+        return dict(zip(ssids, results))
+    
+    def _list_windows_profiles(self):
+        """Return the names of all saved Windows Wi-Fi profiles, over every interface"""
+        from wifipass_netsh import parse_show_profiles_by_interface
+        with self.trace.stage("list_profiles"):
+            output = self._run(['netsh', 'wlan', 'show', 'profiles'])
+        return self._note_interfaces(parse_show_profiles_by_interface(output))
+    
+    def _note_interfaces(self, listings):
+        """Record which interfaces list each profile; returns the unique profile names
+        
+        listings holds (interface, profile names) pairs, the interface None
+        when unknown. A profile saved on several interfaces is named once, so
+        it is looked up once, and tagged with all of them.
+        """
+        listings = list(listings)
+        tags = {}
+        for interface, names in listings:
+            for name in names:
+                found = tags.setdefault(name, [])
+                if interface is not None and interface not in found:
+                    found.append(interface)
+        self.wifi_interfaces = list(dict.fromkeys(
+            interface for interface, _ in listings if interface is not None))
+        self.interfaces = {name: tuple(found) for name, found in tags.items() if found}
+        return list(tags)
+    
+    def _windows_profile_cmd(self, ssid, quote=False):
+        """Return the netsh command showing one profile with its key
+        
+        With several adapters the profile is asked of the first interface
+        holding it, so a name saved on two of them gets one unambiguous answer.
+        """
+        cmd = ['netsh', 'wlan', 'show', 'profile', f'name="{ssid}"' if quote else f'name={ssid}',
+               'key=clear']
+        interfaces = self.interfaces.get(ssid)
+        if interfaces and len(self.wifi_interfaces) > 1:
+            cmd.append(f'interface={interfaces[0]}')
+        return cmd
+    
+    def _get_windows_wifi_passwords_export(self):
+        """Retrieve Wi-Fi passwords on Windows with a single bulk profile export"""
+        return dict(self._iter_windows_export())
+    
+    def _iter_windows_export(self, on_total=None):
+        """Export all Windows profiles at once and yield their passwords"""
+        import tempfile
+        with tempfile.TemporaryDirectory(prefix="wifipass-") as folder:
+            if not run_steps(self._windows_export_steps(folder), self._run):
+                # Fall back to per-profile lookups
+                passwords = self._get_windows_wifi_passwords()
+                if on_total is not None:
+                    on_total(len(passwords))
+                yield from passwords.items()
+                return
+            yield from self._iter_windows_export_folder(folder, on_total)
+    
+    def _windows_export_steps(self, folder):
+        """Export every profile into folder; returns whether the export succeeded"""
+        try:
+            with self.trace.stage("export"):
+                yield ['netsh', 'wlan', 'export', 'profile', 'key=clear', f'folder={folder}']
+        except (subprocess.SubprocessError, OSError):
+            self.trace.failure("export", "bulk export failed, using per-profile lookups")
+            return False
+        return True
+    
+    def _parse_windows_export(self, folder):
+        """Build the SSID to password mapping from a folder of exported profiles"""
+        return dict(self._iter_windows_export_folder(folder))
+    
+    def _iter_windows_export_folder(self, folder, on_total=None):
+        """Yield (ssid, password) for every exported profile in a folder
+        
+        netsh writes one "<interface>-<profile>.xml" file per interface and
+        profile. All files are parsed before the first record is yielded, so
+        a profile saved on several interfaces comes out once with every tag.
+        """
+        import xml.etree.ElementTree as ET
+        passwords = {}
+        listings = {}
+        for file in sorted(os.listdir(folder)):
+            if not file.lower().endswith('.xml'):
+                continue
+            stem = file[:-4]
+            try:
+                with self.trace.stage("parse", profile=stem):
+                    profile = parse_wlan_profile(os.path.join(folder, file))
+            except (ET.ParseError, OSError) as e:
+                self.trace.failure(stem, str(e))
+                passwords.setdefault(stem, 'Error Retrieving Password')
+                continue
+            if not profile["ssid"]:
+                continue
+            if profile["ssid"] not in passwords:
+                passwords[profile["ssid"]] = wlan_profile_password(profile)
+                self._note_security(profile["ssid"], profile["authentication"], profile["cipher"])
+            suffix = f"-{profile['name']}"
+            if profile["name"] and stem.endswith(suffix) and len(stem) > len(suffix):
+                listings.setdefault(stem[:-len(suffix)], []).append(profile["ssid"])
+            else:
+                listings.setdefault(None, []).append(profile["ssid"])
+        # File order puts "Wi-Fi 2-..." before "Wi-Fi-..."; list the interfaces by name
+        self._note_interfaces(sorted(listings.items(), key=lambda item: item[0] or ""))
+        if on_total is not None:
+            on_total(len(passwords))
+        yield from passwords.items()
+    
+    def _get_windows_profile_password(self, ssid):
+        """Look up the password of a single Windows Wi-Fi profile"""
+        with self.trace.stage("profile", profile=ssid):
+            return run_steps(self._windows_profile_steps(ssid), self._run)
+    
+    def _windows_profile_steps(self, ssid):
+        """Lookup steps of one Windows profile, for run_steps"""
+        from wifipass_netsh import (parse_show_profile, netsh_profile_password,
+                                    netsh_profile_security)
+        try:
+            # Try with and without quotes for SSIDs with special characters
+            try:
+                output = yield self._windows_profile_cmd(ssid)
+            except subprocess.SubprocessError:
+                self.trace.count("retry")
+                output = yield self._windows_profile_cmd(ssid, quote=True)
+        except (subprocess.SubprocessError, OSError) as e:
+            self.trace.failure(ssid, str(e))
+            return 'Error Retrieving Password'
+        profile = parse_show_profile(output)
+        self._note_security(ssid, *netsh_profile_security(profile))
+        return netsh_profile_password(profile)
+    
+    def _note_security(self, ssid, auth, cipher):
+        """Record the authentication and cipher a lookup reported for a profile"""
+        self.security[ssid] = (auth or None, cipher or None)
+    
+    def _get_macos_wifi_passwords(self):
+        """Retrieve Wi-Fi passwords on macOS from one System keychain dump"""
+        from wifipass_keychain import airport_password
+        try:
+            ssids = self._list_macos_profiles()
+        except (subprocess.SubprocessError, OSError) as e:
+            return {"Error": f"MacOS password retrieval error: {str(e)}"}
+        
+        dumped = run_steps(self._airport_dump_steps(), self._run)
+        if dumped is not None:
+            return {ssid: airport_password(dumped, ssid) for ssid in ssids}
+        
+        # Dump unavailable; fall back to one lookup per network
+        results = pooled_map(self._get_macos_profile_password, ssids, self.max_workers)
+        return dict(zip(ssids, results))
+    
+    def _list_macos_profiles(self):
+        """Return the names of the saved (preferred) macOS Wi-Fi networks of every Wi-Fi device"""
+        with self.trace.stage("list_profiles"):
+            devices = self._macos_wifi_devices()
+            # The per-device listings run concurrently
+            outputs = pooled_map(self._list_macos_device, devices, self.max_workers)
+        return self._note_macos_listings(devices, outputs)
+    
+    def _macos_wifi_devices(self):
+        """Return the Wi-Fi devices, or just DEFAULT_MACOS_DEVICE if they cannot be enumerated"""
+        try:
+            devices = parse_wifi_devices(self._run(["networksetup", "-listallhardwareports"]))
+        except (subprocess.SubprocessError, OSError) as e:
+            self.trace.failure("hardware_ports", str(e))
+            devices = []
+        return devices or [DEFAULT_MACOS_DEVICE]
+    
+    def _list_macos_device(self, device):
+        """Return the preferred networks listing of one device, or the exception it failed with"""
+        try:
+            return self._run(["networksetup", "-listpreferredwirelessnetworks", device])
+        except (subprocess.SubprocessError, OSError) as e:
+            return e
+    
+    def _note_macos_listings(self, devices, outputs):
+        """Record the networks listed per device and return their unique names
+        
+        outputs holds each device's listing or the exception it failed with;
+        the first exception is raised only if every device failed.
+        """
+        listings = []
+        for device, output in zip(devices, outputs):
+            if isinstance(output, Exception):
+                self.trace.failure(device, str(output))
+            else:
+                listings.append((device, parse_preferred_networks(output)))
+        if not listings:
+            raise outputs[0]
+        return self._note_interfaces(listings)
+    
+    def _airport_dump_steps(self):
+        """Steps returning SSID to password of every Wi-Fi keychain item, None if the dump failed"""
+        from wifipass_keychain import parse_keychain_dump, airport_passwords, SYSTEM_KEYCHAIN
+        try:
+            with self.trace.stage("keychain_dump"):
+                output = yield ["security", "dump-keychain", "-d", SYSTEM_KEYCHAIN]
+        except (subprocess.SubprocessError, OSError) as e:
+            self.trace.failure("keychain_dump", str(e))
+            return None
+        with self.trace.stage("parse"):
+            return airport_passwords(parse_keychain_dump(output))
+    
+    def _get_macos_profile_password(self, ssid):
+        """Look up the password of a single macOS Wi-Fi network"""
+        with self.trace.stage("profile", profile=ssid):
+            return run_steps(self._macos_profile_steps(ssid), self._run)
+    
+    def _macos_profile_steps(self, ssid):
+        """Lookup steps of one macOS network, for run_steps"""
+        from wifipass_keychain import SYSTEM_KEYCHAIN, AIRPORT_SERVICE, ITEM_NOT_FOUND
+        try:
+            # -w prints only the password, on stdout
+            output = yield ["security", "find-generic-password", "-s", AIRPORT_SERVICE,
+                            "-a", ssid, "-w", SYSTEM_KEYCHAIN]
+        except subprocess.CalledProcessError as e:
+            if e.returncode == ITEM_NOT_FOUND:
+                return 'No Password or Not Available'
+            self.trace.failure(ssid, str(e))
+            return "Not Available (Admin privileges required)"
+        except (subprocess.SubprocessError, OSError) as e:
+            self.trace.failure(ssid, str(e))
+            return "Not Available (Admin privileges required)"
+        return output.rstrip('\n') or "Password access requires admin privileges"
+    
+    def _get_linux_wifi_passwords(self):
+        """Retrieve Wi-Fi passwords on Linux systems from every saved-network source"""
+        sources, unreadable = self.linux_sources()
+        if not sources and unreadable:
+            return {"Error": f"Saved networks in {', '.join(unreadable)} are not readable. "
+                             "Try running with sudo."}
+        
+        if not sources:
+            try:
+                # No saved networks on disk; list visible ones with wireless-tools (iwlist)
+                self.trace.count("subprocess")
+                output = subprocess.check_output(["iwlist", "scanning"], 
+                                              universal_newlines=True,
+                                              stderr=subprocess.DEVNULL)
+                return {ssid: "Password stored in system keyring"
+                        for ssid in parse_iwlist_ssids(output)}
+            except (subprocess.SubprocessError, OSError):
+                return {"Error": "Network information unavailable. Try running with sudo."}
+        
+        # Sources are independent, so they are read in parallel
+        results = pooled_map(self._try_linux_source, sources, len(sources))
+        return self._merge_linux_results(sources, unreadable, results)
+    
+    def linux_sources(self):
+        """Return (readable, unreadable) saved-network sources of this machine"""
+        from wifipass_linux import detect_linux_sources
+        return detect_linux_sources(self.nm_dir, self._wpa_supplicant_paths(), self._iwd_dir(),
+                                    self.use_nmcli)
+    
+    def _wpa_supplicant_paths(self):
+        """Configured wpa_supplicant files, or the existing ones at the standard locations"""
+        if self.wpa_supplicant_paths is None:
+            from wifipass_linux import wpa_supplicant_paths
+            return wpa_supplicant_paths()
+        return [path for path in self.wpa_supplicant_paths if os.path.exists(path)]
+    
+    def _iwd_dir(self):
+        """Configured iwd profile directory, or the standard one"""
+        if self.iwd_dir is None:
+            from wifipass_linux import IWD_DIR
+            return IWD_DIR
+        return self.iwd_dir
+    
+    def _try_linux_source(self, name):
+        """Read one Linux source; returns its (ssid, password) pairs or the exception"""
+        from wifipass_linux import (nmcli_steps, read_wpa_supplicant, read_iwd, parse_iwd_profile,
+                                    iwd_ssid, IWD_SUFFIXES)
+        try:
+            with self.trace.stage(name):
+                if name == "networkmanager":
+                    # Only keyfiles that changed since the last scan are re-read
+                    return self.keyfile_cache.scan(self.nm_dir, self.store)
+                if name == "nmcli":
+                    return run_steps(nmcli_steps(), self._run)
+                if name == "iwd":
+                    # The first scan reads every profile anyway; the stat cache pays off on rescans
+                    if self.iwd_cache is None:
+                        self.iwd_cache = KeyfileCache(parse_iwd_profile, iwd_ssid, IWD_SUFFIXES,
+                                                      name="iwd")
+                        return read_iwd(self._iwd_dir())
+                    return self.iwd_cache.scan(self._iwd_dir(), self.store)
+                return read_wpa_supplicant(self._wpa_supplicant_paths())
+        except (subprocess.SubprocessError, OSError) as e:
+            return e
+    
+    def _merge_linux_results(self, sources, unreadable, results):
+        """Merge per-source results in priority order into one mapping"""
+        from wifipass_linux import merge_sources
+        self.linux_results = dict(zip(sources, results))
+        pairs = []
+        errors = []
+        for name in unreadable:
+            self.trace.failure(name, "not readable")
+        for name, result in zip(sources, results):
+            if isinstance(result, Exception):
+                self.trace.failure(name, str(result))
+                errors.append(f"{name}: {result}")
+            else:
+                pairs.append(result)
+        if not pairs:
+            return {"Error": f"Linux password retrieval error: {'; '.join(errors)}"}
+        return merge_sources(pairs)
+    
+    def watch_paths(self):
+        """Directories holding the saved-network files of the readable Linux sources"""
+        sources, _ = self.linux_sources()
+        folders = []
+        if "networkmanager" in sources:
+            folders.append(self.nm_dir)
+        if "iwd" in sources:
+            folders.append(self._iwd_dir())
+        return list(dict.fromkeys(os.path.normpath(folder) for folder in folders))
+    
+    def watch_files(self):
+        """Saved-network files polled by the watch rather than watched through their directory
+        
+        wpa_supplicant.conf may sit right in /etc, far too busy a directory to watch.
+        """
+        sources, _ = self.linux_sources()
+        if "wpa_supplicant" not in sources:
+            return []
+        return [os.path.normpath(path) for path in self._wpa_supplicant_paths()]
+    
+    def watch_delta(self, paths):
+        """Re-read only the Linux sources owning the touched paths; returns the delta or None"""
+        old = dict(self.passwords)
+        if not old or "Error" in old:
+            return None
+        sources, unreadable = self.linux_sources()
+        if not sources or "nmcli" in sources:
+            return diff_passwords(old, self.get_wifi_passwords())
+        
+        folders = {"networkmanager": os.path.normpath(self.nm_dir),
+                   "iwd": os.path.normpath(self._iwd_dir())}
+        wpa_paths = {os.path.normpath(path) for path in self._wpa_supplicant_paths()}
+        touched = set()
+        for path in map(os.path.normpath, paths):
+            for name, folder in folders.items():
+                if path == folder or os.path.dirname(path) == folder:
+                    touched.add(name)
+            if path in wpa_paths or any(path == os.path.dirname(p) for p in wpa_paths):
+                touched.add("wpa_supplicant")
+        
+        # Sources that appeared since the last scan are read as well
+        stale = [name for name in sources if name in touched or name not in self.linux_results]
+        if not stale:
+            return None
+        results = [self._try_linux_source(name) if name in stale else self.linux_results[name]
+                   for name in sources]
+        new = self._merge_linux_results(sources, unreadable, results)
+        if "Error" in new:
+            return None
+        return diff_passwords(old, new)
+    
+    def key_marker(self):
+        """Return {path: (size, mtime_ns)} of the files holding the saved keys, or None
+        
+        The profile listings don't change when a key is rotated, but these
+        files do: the per-interface profile XML files on Windows and the
+        System keychain on macOS. None if they cannot be read.
+        """
+        try:
+            if self.os_type == "Windows":
+                stats = {}
+                with os.scandir(self.wlan_profiles_dir or WLAN_PROFILES_DIR) as folders:
+                    for folder in folders:
+                        if not folder.is_dir():
+                            continue
+                        with os.scandir(folder.path) as it:
+                            for entry in it:
+                                if entry.name.lower().endswith('.xml'):
+                                    st = entry.stat()
+                                    stats[entry.path] = (st.st_size, st.st_mtime_ns)
+                return stats
+            if self.os_type == "Darwin":
+                from wifipass_keychain import SYSTEM_KEYCHAIN
+                path = self.keychain_path or SYSTEM_KEYCHAIN
+                st = os.stat(path)
+                return {path: (st.st_size, st.st_mtime_ns)}
+        except OSError:
+            return None
+        return None
+    
+    def _profile_fingerprint(self, names, marker):
+        """Fingerprint of a profile listing, the interfaces of each profile and the key marker"""
+        import hashlib
+        digest = hashlib.sha1()
+        for name in names:
+            digest.update(f"{name}\0{','.join(self.interfaces.get(name, ()))}\n".encode())
+        for path, (size, mtime) in sorted(marker.items()):
+            digest.update(f"{path}\0{size}\0{mtime}\n".encode())
+        return f"{self.os_type}:{self.windows_engine}:{digest.hexdigest()}"
+    
+    def backend_fingerprint(self):
+        """Return a cheap fingerprint of the saved profiles and keys, or None if unavailable
+        
+        Without a key marker a rotated key would leave the fingerprint
+        unchanged, so stored results are never treated as fresh then.
+        """
+        import hashlib
+        digest = hashlib.sha1()
+        try:
+            if self.os_type in ("Windows", "Darwin"):
+                # Taken before the listing, so a key saved meanwhile changes the next one
+                marker = self.key_marker()
+                if marker is None:
+                    return None
+                # The listing also keeps the interface tags current when stored results are reused
+                if self.os_type == "Windows":
+                    names = self._list_windows_profiles()
+                else:
+                    names = self._list_macos_profiles()
+                return self._profile_fingerprint(names, marker)
+            elif self.os_type == "Linux":
+                sources, _ = self.linux_sources()
+                # nmcli has no cheap change marker
+                if not sources or "nmcli" in sources:
+                    return None
+                files = []
+                folders = {"networkmanager": self.nm_dir, "iwd": self._iwd_dir()}
+                for name in sources:
+                    if name in folders:
+                        with os.scandir(folders[name]) as it:
+                            files.extend(entry.path for entry in it)
+                if "wpa_supplicant" in sources:
+                    files.extend(self._wpa_supplicant_paths())
+                for path in sorted(files):
+                    st = os.stat(path)
+                    digest.update(f"{path}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+            else:
+                return None
+        except (subprocess.SubprocessError, OSError):
+            return None
+        return f"{self.os_type}:{self.windows_engine}:{digest.hexdigest()}"
+    
+    def scan(self, refresh=False):
+        """Retrieve passwords, reusing stored results while the fingerprint is unchanged
+        
+        refresh=True looks every profile up even if the stored results are fresh.
+        """
+        if self.store is None:
+            return self.get_wifi_passwords()
+        
+        if refresh:
+            fingerprint = self.backend_fingerprint()
+        else:
+            passwords, fingerprint = self._load_fresh()
+            if passwords is not None:
+                return passwords
+        
+        passwords = self.get_wifi_passwords()
+        self._store_result(fingerprint, passwords)
+        return passwords
+    
+    def _load_fresh(self):
+        """Return (stored passwords if still fresh, else None; current fingerprint)"""
+        if self.store is None:
+            return None, None
+        marker = self.key_marker()
+        fingerprint = self.backend_fingerprint()
+        passwords = self.store.load_fresh(self.os_type, fingerprint)
+        if passwords is not None:
+            # The stored keys are as current as the marker taken before the fingerprint
+            self.lookup_marker = marker
+        return passwords, fingerprint
+    
+    def _store_result(self, fingerprint, passwords):
+        """Save a complete inventory to the store, if any"""
+        if self.store is not None and "Error" not in passwords:
+            self.store.save(self.os_type, fingerprint, passwords)
+    
+    def load_cached(self):
+        """Load the last stored inventory into the table rows; returns when it was stored"""
+        if self.store is None:
+            return None
+        passwords, stored_at = self.store.load(self.os_type)
+        if not passwords:
+            return None
+        self.set_passwords(passwords)
+        return stored_at
+    
+    def backend_name(self):
+        """Name of the backend that produces records, stored as each record's source"""
+        if self.os_type == "Windows":
+            return "netsh-export" if self.windows_engine == "export" else "netsh"
+        if self.os_type == "Darwin":
+            return "keychain"
+        if self.os_type == "Linux":
+            return "+".join(self.linux_sources()[0]) or "iwlist"
+        return self.os_type.lower()
+    
+    def set_passwords(self, passwords):
+        """Replace the results with passwords, sorted, and build the table records"""
+        with self.trace.stage("sort", records=len(passwords)):
+            self.passwords = OrderedDict(sorted(passwords.items()))
+            self.records = RecordSet.from_mapping(self.passwords, source=self.backend_name(),
+                                                  interfaces=self.interfaces,
+                                                  security=self.security)
+    
+    def _rescan_plan(self, full=None):
+        """Decide what a rescan looks up; returns (key marker, stale profiles, refresh)
+        
+        Stale profiles are the known ones to look up again besides the new
+        ones, or None for all of them; refresh tells whether stored results
+        must be bypassed too. full=True always looks up everything. With
+        full=None so does a rescan once full_rescan_interval has passed since
+        the last full lookup, or when the key marker can't tell which keys
+        changed; full=False then looks up only new profiles.
+        """
+        marker = self.key_marker()
+        if full or (full is None and self.full_lookup_at is not None
+                    and time.time() - self.full_lookup_at >= self.full_rescan_interval):
+            return marker, None, True
+        return marker, self._stale_profiles(marker, full is None), False
+    
+    def _stale_profiles(self, marker, strict=True):
+        """Return the known profiles whose key files changed since the last lookup
+        
+        None means every profile, as when the marker can't be compared or,
+        on macOS, the keychain changed. Unless strict, an unusable marker
+        gives an empty set instead.
+        """
+        previous = self.lookup_marker
+        if marker is None or previous is None:
+            return None if strict else set()
+        if marker == previous:
+            return set()
+        if self.os_type != "Windows":
+            # One keychain file holds every key
+            return None
+        import xml.etree.ElementTree as ET
+        stale = set()
+        for path, stat in marker.items():
+            if previous.get(path) == stat:
+                continue
+            try:
+                profile = parse_wlan_profile(path)
+            except (ET.ParseError, OSError):
+                return None if strict else set()
+            stale.add(profile["name"] or profile["ssid"])
+        return stale
+    
+    def rescan(self, full=None):
+        """Rescan new profiles and those whose keys changed and return the delta
+        
+        full=True looks up every profile; see _rescan_plan for the default.
+        The result is saved to the store like a full scan's.
+        """
+        old = dict(self.passwords)
+        if not old or "Error" in old:
+            return diff_passwords(old, self.scan(refresh=bool(full)))
+        
+        marker, stale, refresh = self._rescan_plan(full)
+        if stale is None:
+            return diff_passwords(old, self.scan(refresh=refresh))
+        
+        try:
+            if self.os_type == "Windows":
+                listing = self._list_windows_profiles()
+                lookup = self._get_windows_profile_password
+            elif self.os_type == "Darwin":
+                listing = self._list_macos_profiles()
+                lookup = self._get_macos_profile_password
+            else:
+                # The keyfile cache only re-reads keyfiles whose stat changed
+                return diff_passwords(old, self.scan(refresh=refresh))
+        except (subprocess.SubprocessError, OSError):
+            return diff_passwords(old, self.scan(refresh=refresh))
+        
+        wanted = [ssid for ssid in listing if ssid not in old or ssid in stale]
+        looked_up = dict(zip(wanted, pooled_map(lookup, wanted, self.max_workers)))
+        
+        new = {ssid: looked_up[ssid] if ssid in looked_up else old[ssid] for ssid in listing}
+        self._note_rescan(marker, listing, new)
+        return diff_passwords(old, new)
+    
+    def _note_rescan(self, marker, listing, passwords):
+        """Record the keys an incremental rescan saw and save its inventory to the store"""
+        fingerprint = None
+        if marker is not None:
+            self.lookup_marker = marker
+            fingerprint = self._profile_fingerprint(listing, marker)
+        self._store_result(fingerprint, passwords)
+    
+    def apply_delta(self, delta):
+        """Apply a rescan delta to the sorted table records in place"""
+        keys = self.records.ssids
+        source = self.backend_name()
+        
+        for ssid in delta["removed"]:
+            i = bisect.bisect_left(keys, ssid)
+            if i < len(keys) and keys[i] == ssid:
+                del self.records[i]
+        
+        for ssid, password in delta["changed"].items():
+            i = bisect.bisect_left(keys, ssid)
+            if i < len(keys) and keys[i] == ssid:
+                self.records.set_secret(i, password)
+                self.records.set_security(i, *self.security.get(ssid, (None, None)))
+        
+        for ssid, password in delta["added"].items():
+            i = bisect.bisect_left(keys, ssid)
+            auth, cipher = self.security.get(ssid, (None, None))
+            # Deltas computed against the same inventory may overlap
+            if i < len(keys) and keys[i] == ssid:
+                self.records.set_secret(i, password)
+                self.records.set_security(i, auth, cipher)
+                continue
+            self.records.insert(i, NetworkRecord(ssid, password, auth, cipher, source=source,
+                                                 interfaces=self.interfaces.get(ssid)))
+        
+        # The listing behind the delta may also have moved profiles between interfaces
+        self.records.interfaces = [self.interfaces.get(ssid) for ssid in keys]
+        self.passwords = OrderedDict(self.records.iter_pairs())
+    
+    def _insert_batch(self, batch):
+        """Bisect-insert streamed (ssid, password) records into the sorted table rows
+        
+        Returns the positions of the new rows, ascending. Records for SSIDs
+        already in the table replace their secrets instead.
+        """
+        keys = self.records.ssids
+        source = self.backend_name()
+        positions = []
+        for ssid, password in sorted(batch):
+            self.passwords[ssid] = password
+            i = bisect.bisect_left(keys, ssid)
+            auth, cipher = self.security.get(ssid, (None, None))
+            if i < len(keys) and keys[i] == ssid:
+                self.records.set_secret(i, password)
+                self.records.set_security(i, auth, cipher)
+                continue
+            # Later SSIDs sort after this one, so earlier positions never shift
+            self.records.insert(i, NetworkRecord(ssid, password, auth, cipher, source=source,
+                                                 interfaces=self.interfaces.get(ssid)))
+            positions.append(i)
+        return positions
+    
+    def start_retrieval(self, window, full=None):
+        """Start password retrieval in a separate thread
+        
+        The thread never touches widgets; it posts SCAN_BATCH_EVENT and
+        SCAN_DONE_EVENT through window.write_event_value, and the event loop
+        hands them to handle_scan_event. full=True looks up every profile
+        again instead of trusting unchanged keys and stored results.
+        """
+        if self.retrieving:
+            return
+            
+        self.retrieving = True
+        self.trace.reset()
+        incremental = bool(self.passwords) and "Error" not in self.passwords
+        if not incremental:
+            self.set_passwords({})
+            self.refresh_table(window)
+        window["progress_bar"].update(current_count=0, visible=True)
+        window["status"].update("Scanning Wi-Fi networks...")
+        
+        engine = None
+        if self.scan_engine == "async":
+            # Imported here because wifipass_async imports this module
+            from wifipass_async import AsyncScanEngine
+            engine = AsyncScanEngine(self, profile_timeout=self.profile_timeout,
+                                     scan_timeout=self.scan_timeout)
+        self.engine = engine
+        window["cancel_btn"].update(disabled=engine is None)
+        
+        def retrieve_thread():
+            with self.scan_lock:
+                retrieve()
+        
+        def retrieve():
+            try:
+                # Rescan incrementally once an inventory is loaded
+                if incremental:
+                    with self.trace.stage("rescan"):
+                        if engine is None:
+                            delta = self.rescan(full)
+                        else:
+                            delta = engine.rescan(dict(self.passwords), full)
+                    window.write_event_value(SCAN_DONE_EVENT, {
+                        "delta": delta, "status": engine.status if engine else None})
+                    return
+                
+                if full:
+                    passwords = None
+                    fingerprint = self.backend_fingerprint() if self.store is not None else None
+                else:
+                    passwords, fingerprint = self._load_fresh()
+                if passwords is not None:
+                    window.write_event_value(SCAN_DONE_EVENT, {"passwords": passwords})
+                    return
+                
+                # Stream results to the GUI in batches
+                passwords = {}
+                total = None
+                batch = []
+                flushed = time.monotonic()
+                
+                def on_total(count):
+                    nonlocal total
+                    total = count
+                
+                def on_record(ssid, password):
+                    nonlocal batch, flushed
+                    passwords[ssid] = password
+                    batch.append((ssid, password))
+                    if len(batch) >= SCAN_BATCH_SIZE or time.monotonic() - flushed >= SCAN_BATCH_INTERVAL:
+                        window.write_event_value(SCAN_BATCH_EVENT, (batch, len(passwords), total))
+                        batch = []
+                        flushed = time.monotonic()
+                
+                with self.trace.stage("scan", backend=self.backend_name()):
+                    if engine is None:
+                        for ssid, password in self.iter_wifi_passwords(on_total):
+                            on_record(ssid, password)
+                    else:
+                        engine.scan(on_record, on_total)
+                
+                # Partial results of an interrupted scan are shown but never stored
+                if engine is None or engine.status == "complete":
+                    self._store_result(fingerprint, passwords)
+                window.write_event_value(SCAN_DONE_EVENT, {
+                    "passwords": passwords, "status": engine.status if engine else None})
+            except Exception as e:
+                window.write_event_value(SCAN_DONE_EVENT, {"error": str(e)})
+        
+        # Start thread
+        threading.Thread(target=retrieve_thread, daemon=True).start()
+    
+    def cancel_retrieval(self):
+        """Cancel a running async scan; it finishes with the results collected so far"""
+        if self.engine is None:
+            return False
+        self.engine.cancel()
+        return True
+    
+    def refresh_table(self, window):
+        """Point the view at the current rows and render its visible page"""
+        self.view.set_records(self.records)
+        self.render_table(window)
+    
+    def render_table(self, window):
+        """Render the visible page of the view into the table widget"""
+        with self.trace.stage("render"):
+            window["table"].update(values=self.view.page())
+        window["page_info"].update(self.view.describe())
+    
+    def handle_scan_event(self, window, event, value):
+        """Apply a scan event posted by the retrieval thread; runs on the GUI thread"""
+        if event == SCAN_BATCH_EVENT:
+            records, completed, total = value
+            positions = self._insert_batch(records)
+            if self.view.records is self.records:
+                # The filter is updated from the new rows, not rebuilt
+                self.view.insert_rows(positions)
+            else:
+                self.view.set_records(self.records)
+            self.render_table(window)
+            if total:
+                window["progress_bar"].update(current_count=completed, max=total)
+            window["status"].update(f"Scanning Wi-Fi networks... {completed}"
+                                    + (f"/{total}" if total else ""))
+            return
+        
+        if "error" in value:
+            status = f"Scan failed: {value['error']}"
+        elif "delta" in value:
+            delta = value["delta"]
+            self.apply_delta(delta)
+            status = (f"Found {len(self.records)} Wi-Fi networks "
+                      f"(+{len(delta['added'])} -{len(delta['removed'])} "
+                      f"~{len(delta['changed'])})")
+        else:
+            self.set_passwords(value["passwords"])
+            status = f"Found {len(self.records)} Wi-Fi networks"
+            if len(self.wifi_interfaces) > 1:
+                status += f" on {len(self.wifi_interfaces)} interfaces"
+        if value.get("status") == "cancelled":
+            status = f"Scan cancelled. {status} so far"
+        elif value.get("status") == "timeout":
+            status = f"Scan timed out. {status} so far"
+        
+        # Update table
+        self.refresh_table(window)
+        if self.trace.enabled:
+            status += f" [{self.trace.summary()}]"
+        window["status"].update(status)
+        window["progress_bar"].update(visible=False)
+        window["refresh"].update(disabled=False)
+        window["full_rescan"].update(disabled=False)
+        window["export_btn"].update(disabled=False)
+        window["export_txt_btn"].update(disabled=False)
+        window["copy_btn"].update(disabled=False)
+        window["cancel_btn"].update(disabled=True)
+        self.engine = None
+        self.retrieving = False
+    
+    def handle_watch_event(self, window, delta):
+        """Show a delta or error posted by the profile watch; runs on the GUI thread
+        
+        The watch applied the delta to the records before posting it.
+        """
+        if "error" in delta:
+            window["status"].update(f"Watching saved networks failed: {delta['error']}")
+            return
+        # A scan started since then streams its own rows
+        if self.retrieving:
+            return
+        self.refresh_table(window)
+        window["status"].update(f"Saved networks changed: {len(self.records)} Wi-Fi networks "
+                                f"(+{len(delta['added'])} -{len(delta['removed'])} "
+                                f"~{len(delta['changed'])})")
+    
+    def iter_records(self):
+        """Yield (ssid, password) records in table order"""
+        return self.records.iter_pairs()
+    
+    def export_to_csv(self, filepath):
+        """Export passwords to CSV file"""
+        return self.export_to_file(filepath, "csv")
+    
+    def export_to_txt(self, filepath):
+        """Export passwords to text file"""
+        return self.export_to_file(filepath, "txt")
+    
+    def export_to_file(self, filepath, fmt=None):
+        """Export passwords in the given format, or the one matching the file extension"""
+        try:
+            from wifipass_export import export_records
+            export_records(self.iter_records(), filepath, fmt)
+            return True
+        except Exception as e:
+            return str(e)
+    
+    def copy_to_clipboard(self, window, selected_rows):
+        """Copy selected password entries to clipboard"""
+        if not selected_rows:
+            window["status"].update("No rows selected for copying")
+            return
+            
+        try:
+            import pyperclip
+            
+            # Prepare text
+            text = ""
+            for row in selected_rows:
+                record = self.records[row]
+                text += f"SSID: {record.ssid}, Password: {record.secret}\n"
+                
+            # Copy to clipboard
+            pyperclip.copy(text)
+            window["status"].update(f"Copied {len(selected_rows)} entries to clipboard")
+            
+        except ImportError:
+            window["status"].update("Error: pyperclip module not installed")
+        except Exception as e:
+            window["status"].update(f"Error copying to clipboard: {str(e)}")
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming exporters for Wi-Fi password records
+
+Every writer consumes any iterable of (ssid, password) records and writes it
+incrementally, so exporting never needs the whole inventory in memory.
+Formats: CSV, TXT report, gzip-compressed NDJSON, and a columnar binary
+format that is memory-mapped and decoded lazily when read back.
+"""
+
+import csv
+import gzip
+import json
+import mmap
+import os
+import platform
+import shutil
+import struct
+import tempfile
+from datetime import datetime
+
+# Columnar file layout:
+#   magic | ssid heap | password heap | ssid offsets | password offsets | footer
+# Offsets are count + 1 little-endian uint64 values per column, relative to
+# the start of that column's heap. The footer holds the count and the start
+# of each section, followed by the magic again.
+COLUMNAR_MAGIC = b"WPCOL1\0\0"
+COLUMNAR_FOOTER = struct.Struct("<5Q8s")
+OFFSET = struct.Struct("<Q")
+
+# Buffered offsets are spilled to disk in blocks of this many entries
+OFFSET_BLOCK = 4096
+
+# Extension to writer name, longest match first
+EXPORT_FORMATS = (
+    (".ndjson.gz", "ndjson_gz"),
+    (".wpcol", "columnar"),
+    (".csv", "csv"),
+    (".txt", "txt"),
+)
+
+
+def write_csv(records, filepath):
+    """Write records as CSV with a row number column; returns the row count"""
+    count = 0
+    with open(filepath, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['S.No.', 'SSID', 'Password'])
+        for count, (ssid, password) in enumerate(records, 1):
+            writer.writerow([str(count), ssid, password])
+    return count
+
+
+def write_txt(records, filepath):
+    """Write records as a plain text report; returns the row count"""
+    count = 0
+    with open(filepath, 'w', encoding='utf-8') as file:
+        file.write("Wi-Fi Password Report\n")
+        file.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        file.write(f"System: {platform.system()} {platform.release()}\n\n")
+        file.write("=" * 60 + "\n")
+        for count, (ssid, password) in enumerate(records, 1):
+            file.write(f"{count}. {ssid}: {password}\n")
+    return count
+
+
+def write_ndjson_gz(records, filepath, compresslevel=6):
+    """Write records as gzip-compressed NDJSON; returns the row count"""
+    count = 0
+    with gzip.open(filepath, 'wt', encoding='utf-8', compresslevel=compresslevel) as file:
+        for count, (ssid, password) in enumerate(records, 1):
+            file.write(json.dumps({"ssid": ssid, "password": password}, ensure_ascii=False) + "\n")
+    return count
+
+
+def read_ndjson_gz(filepath):
+    """Lazily yield (ssid, password) records from a gzip-compressed NDJSON file"""
+    with gzip.open(filepath, 'rt', encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                yield record["ssid"], record["password"]
+
+
+class _OffsetSpill:
+    """Append-only uint64 column spilled to a temporary file in blocks"""
+
+    def __init__(self):
+        self.file = tempfile.TemporaryFile()
+        self.block = []
+        self.position = 0
+        self.append(0)
+
+    def append(self, length):
+        self.position += length
+        self.block.append(self.position)
+        if len(self.block) >= OFFSET_BLOCK:
+            self.flush()
+
+    def flush(self):
+        if self.block:
+            self.file.write(struct.pack(f"<{len(self.block)}Q", *self.block))
+            self.block = []
+
+    def copy_to(self, out):
+        self.flush()
+        self.file.seek(0)
+        shutil.copyfileobj(self.file, out)
+        self.file.close()
+
+
+def write_columnar(records, filepath):
+    """Write records in the memory-mappable columnar format; returns the row count"""
+    count = 0
+    ssid_offsets = _OffsetSpill()
+    password_offsets = _OffsetSpill()
+    with open(filepath, 'wb') as out, tempfile.TemporaryFile() as passwords:
+        out.write(COLUMNAR_MAGIC)
+        for ssid, password in records:
+            ssid = ssid.encode('utf-8')
+            password = password.encode('utf-8')
+            out.write(ssid)
+            passwords.write(password)
+            ssid_offsets.append(len(ssid))
+            password_offsets.append(len(password))
+            count += 1
+
+        password_start = out.tell()
+        passwords.seek(0)
+        shutil.copyfileobj(passwords, out)
+        ssid_offsets_start = out.tell()
+        ssid_offsets.copy_to(out)
+        password_offsets_start = out.tell()
+        password_offsets.copy_to(out)
+        out.write(COLUMNAR_FOOTER.pack(count, len(COLUMNAR_MAGIC), password_start,
+                                       ssid_offsets_start, password_offsets_start, COLUMNAR_MAGIC))
+    return count
+
+
+class ColumnarReader:
+    """Memory-mapped reader for the columnar format; rows are decoded on access"""
+
+    def __init__(self, filepath):
+        self.file = open(filepath, 'rb')
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            self.file.close()
+            raise ValueError(f"Not a columnar export: {filepath}")
+        if len(self.map) < len(COLUMNAR_MAGIC) + COLUMNAR_FOOTER.size \
+                or self.map[:len(COLUMNAR_MAGIC)] != COLUMNAR_MAGIC:
+            self.close()
+            raise ValueError(f"Not a columnar export: {filepath}")
+        (self.count, self._ssid_start, self._password_start, self._ssid_offsets,
+         self._password_offsets, magic) = COLUMNAR_FOOTER.unpack_from(
+            self.map, len(self.map) - COLUMNAR_FOOTER.size)
+        if magic != COLUMNAR_MAGIC:
+            self.close()
+            raise ValueError(f"Truncated columnar export: {filepath}")
+
+    def __len__(self):
+        return self.count
+
+    def _value(self, heap, offsets, i):
+        start, end = struct.unpack_from("<2Q", self.map, offsets + i * OFFSET.size)
+        return self.map[heap + start:heap + end].decode('utf-8')
+
+    def ssid(self, i):
+        """Return the SSID of row i"""
+        return self._value(self._ssid_start, self._ssid_offsets, i)
+
+    def password(self, i):
+        """Return the password of row i"""
+        return self._value(self._password_start, self._password_offsets, i)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        return self.ssid(i), self.password(i)
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self.ssid(i), self.password(i)
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+WRITERS = {
+    "csv": write_csv,
+    "txt": write_txt,
+    "ndjson_gz": write_ndjson_gz,
+    "columnar": write_columnar,
+}
+
+
+def export_format(filepath):
+    """Pick the export format from a file name, defaulting to CSV"""
+    name = os.path.basename(filepath).lower()
+    for extension, fmt in EXPORT_FORMATS:
+        if name.endswith(extension):
+            return fmt
+    return "csv"
+
+
+def export_records(records, filepath, fmt=None):
+    """Stream records to filepath in the given (or extension-derived) format"""
+    return WRITERS[fmt or export_format(filepath)](records, filepath)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Append-only scan history with per-SSID deltas
+
+Scans of a machine are recorded in time order, and each appends only what
+changed since the previous one: added, removed and re-keyed networks. Every
+checkpoint_interval scans a full zlib-compressed checkpoint is written as
+well, so the inventory as of any time is rebuilt from the nearest earlier
+checkpoint and at most checkpoint_interval deltas, found through an index on
+(machine, taken_at). compact() folds history older than a horizon into one
+checkpoint.
+"""
+
+import json
+import os
+import platform
+import sqlite3
+import time
+import zlib
+from contextlib import closing
+
+# Default location of the history database
+DEFAULT_HISTORY_PATH = os.path.join(os.path.expanduser("~"), ".wifipass", "history.db")
+
+# A full checkpoint is written after this many delta scans
+DEFAULT_CHECKPOINT_INTERVAL = 32
+
+OP_ADDED = "added"
+OP_REMOVED = "removed"
+OP_CHANGED = "changed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id       INTEGER PRIMARY KEY,
+    machine  TEXT NOT NULL,
+    taken_at REAL NOT NULL,
+    networks INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scans_machine_taken_at ON scans (machine, taken_at);
+CREATE TABLE IF NOT EXISTS changes (
+    scan_id  INTEGER NOT NULL REFERENCES scans (id),
+    ssid     TEXT NOT NULL,
+    op       TEXT NOT NULL,
+    password TEXT
+);
+CREATE INDEX IF NOT EXISTS changes_scan_id ON changes (scan_id);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    scan_id  INTEGER PRIMARY KEY REFERENCES scans (id),
+    machine  TEXT NOT NULL,
+    taken_at REAL NOT NULL,
+    data     BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS checkpoints_machine_taken_at ON checkpoints (machine, taken_at);
+"""
+
+
+def pack_checkpoint(passwords):
+    """Serialize a full inventory for the checkpoints table"""
+    return zlib.compress(json.dumps(passwords, ensure_ascii=False, sort_keys=True).encode('utf-8'))
+
+
+def unpack_checkpoint(data):
+    return json.loads(zlib.decompress(data).decode('utf-8'))
+
+
+def inventory_changes(old, new):
+    """Return the (ssid, op, password) rows turning old into new"""
+    rows = [(ssid, OP_REMOVED, None) for ssid in old if ssid not in new]
+    for ssid, password in new.items():
+        if ssid not in old:
+            rows.append((ssid, OP_ADDED, password))
+        elif old[ssid] != password:
+            rows.append((ssid, OP_CHANGED, password))
+    return rows
+
+
+def apply_changes(passwords, rows):
+    """Apply (ssid, op, password) rows to an inventory in place"""
+    for ssid, op, password in rows:
+        if op == OP_REMOVED:
+            passwords.pop(ssid, None)
+        else:
+            passwords[ssid] = password
+    return passwords
+
+
+class ScanHistory:
+    """SQLite-backed history of inventories per machine"""
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH, checkpoint_interval=DEFAULT_CHECKPOINT_INTERVAL):
+        self.path = path
+        self.checkpoint_interval = checkpoint_interval
+
+        folder = os.path.dirname(path)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder, mode=0o700, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+        # The history holds plain-text passwords, keep it private to the user
+        try:
+            os.chmod(path, 0o600)
+        except OSError:
+            pass
+
+    def _connect(self):
+        """Open a connection; one per call so the history can be used from any thread"""
+        return sqlite3.connect(self.path, timeout=10)
+
+    def _state(self, conn, machine, until=None, until_id=None):
+        """Rebuild an inventory from the nearest checkpoint; returns (passwords, scans replayed)
+
+        until bounds the scans by time, until_id by scan id; both inclusive.
+        """
+        bound = "taken_at <= ?" if until is not None else "scan_id <= ?"
+        limit = until if until is not None else (until_id if until_id is not None else float("inf"))
+        checkpoint = conn.execute(
+            f"SELECT scan_id, data FROM checkpoints WHERE machine = ? AND {bound} "
+            "ORDER BY scan_id DESC LIMIT 1", (machine, limit)).fetchone()
+        base_id = -1
+        passwords = {}
+        if checkpoint is not None:
+            base_id = checkpoint[0]
+            passwords = unpack_checkpoint(checkpoint[1])
+
+        scan_bound = "s.taken_at <= ?" if until is not None else "s.id <= ?"
+        rows = conn.execute(
+            "SELECT c.scan_id, c.ssid, c.op, c.password FROM scans s "
+            "JOIN changes c ON c.scan_id = s.id "
+            f"WHERE s.machine = ? AND s.id > ? AND {scan_bound} ORDER BY s.id",
+            (machine, base_id, limit)).fetchall()
+        apply_changes(passwords, ((ssid, op, password) for _, ssid, op, password in rows))
+        return passwords, len({row[0] for row in rows})
+
+    def record(self, passwords, machine=None, taken_at=None):
+        """Append a scan of machine; returns its change rows, or None if nothing changed"""
+        machine = machine or platform.node()
+        taken_at = time.time() if taken_at is None else taken_at
+        with closing(self._connect()) as conn, conn:
+            current, replayed = self._state(conn, machine)
+            rows = inventory_changes(current, passwords)
+            has_scans = conn.execute("SELECT 1 FROM scans WHERE machine = ? LIMIT 1",
+                                     (machine,)).fetchone()
+            if not rows and has_scans:
+                return None
+            scan_id = conn.execute("INSERT INTO scans (machine, taken_at, networks) VALUES (?, ?, ?)",
+                                   (machine, taken_at, len(passwords))).lastrowid
+            conn.executemany("INSERT INTO changes VALUES (?, ?, ?, ?)",
+                             ((scan_id, ssid, op, password) for ssid, op, password in rows))
+            if replayed + 1 >= self.checkpoint_interval:
+                conn.execute("INSERT INTO checkpoints VALUES (?, ?, ?, ?)",
+                             (scan_id, machine, taken_at, pack_checkpoint(passwords)))
+        return rows
+
+    def as_of(self, when=None, machine=None):
+        """Return the inventory of machine as of a timestamp (default: now)"""
+        machine = machine or platform.node()
+        with closing(self._connect()) as conn:
+            passwords, _ = self._state(conn, machine, until=time.time() if when is None else when)
+        return passwords
+
+    def changes(self, machine=None, since=None, until=None):
+        """Yield (taken_at, ssid, op, password) for the recorded changes of machine in time order"""
+        machine = machine or platform.node()
+        with closing(self._connect()) as conn:
+            yield from conn.execute(
+                "SELECT s.taken_at, c.ssid, c.op, c.password FROM scans s "
+                "JOIN changes c ON c.scan_id = s.id "
+                "WHERE s.machine = ? AND s.taken_at >= ? AND s.taken_at <= ? "
+                "ORDER BY s.id",
+                (machine, float("-inf") if since is None else since,
+                 float("inf") if until is None else until))
+
+    def compact(self, before, machine=None):
+        """Fold the history of machine older than before into one checkpoint
+
+        as_of() keeps its answers for any time from before on; earlier times
+        return the folded state. Returns the number of scans removed.
+        """
+        machine = machine or platform.node()
+        with closing(self._connect()) as conn, conn:
+            last = conn.execute(
+                "SELECT id, taken_at FROM scans WHERE machine = ? AND taken_at < ? "
+                "ORDER BY id DESC LIMIT 1", (machine, before)).fetchone()
+            if last is None:
+                return 0
+            folded, _ = self._state(conn, machine, until_id=last[0])
+            old = [row[0] for row in conn.execute(
+                "SELECT id FROM scans WHERE machine = ? AND taken_at < ? AND id != ?",
+                (machine, before, last[0]))]
+            conn.executemany("DELETE FROM changes WHERE scan_id = ?", ((i,) for i in old))
+            conn.executemany("DELETE FROM checkpoints WHERE scan_id = ?", ((i,) for i in old))
+            conn.executemany("DELETE FROM scans WHERE id = ?", ((i,) for i in old))
+            # The surviving scan becomes the base of everything after it
+            conn.execute("DELETE FROM changes WHERE scan_id = ?", (last[0],))
+            conn.execute("INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?)",
+                         (last[0], machine, last[1], pack_checkpoint(folded)))
+        return len(old)
+
+    def vacuum(self):
+        """Return the space freed by compaction to the file system"""
+        with closing(self._connect()) as conn:
+            conn.execute("VACUUM")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bulk parser for `security dump-keychain -d` output
+
+One dump of the System keychain holds every saved Wi-Fi password as a
+generic-password item of the "AirPort" service, with the SSID as account.
+Parsing the whole dump in one pass replaces a `security` call per network.
+"""
+
+import re
+
+# Keychain holding the Wi-Fi passwords shared by all users
+SYSTEM_KEYCHAIN = "/Library/Keychains/System.keychain"
+
+# Service of the keychain items that store Wi-Fi passwords
+AIRPORT_SERVICE = "AirPort"
+
+# Exit status of `security find-generic-password` when no item matches
+ITEM_NOT_FOUND = 44
+
+# `    "acct"<blob>="HomeNet"` or `    0x00000007 <blob>=<NULL>`
+ATTRIBUTE_RE = re.compile(r'^[ \t]+(?:"(.{4})"|(0x[0-9A-Fa-f]{8}) ?)<\w+>=(.*)$')
+
+# Hex form used for values that are not printable: `0x486F6D65  "Home"`
+HEX_VALUE_RE = re.compile(r'^0x([0-9A-Fa-f]*)(?:[ \t]+".*")?$')
+
+ESCAPE_RE = re.compile(rb'\\([0-7]{3}|.)')
+
+
+def _unescape(match):
+    """Undo one backslash escape of a quoted keychain value"""
+    escaped = match.group(1)
+    return bytes([int(escaped, 8)]) if len(escaped) == 3 else escaped
+
+
+def parse_value(text):
+    """Decode a keychain attribute or data value; <NULL> and garbage become None"""
+    text = text.strip()
+    if text.startswith('"') and text.endswith('"') and len(text) >= 2:
+        raw = ESCAPE_RE.sub(_unescape, text[1:-1].encode('latin-1', 'backslashreplace'))
+        return raw.decode('utf-8', 'replace')
+    match = HEX_VALUE_RE.match(text)
+    if match:
+        return bytes.fromhex(match.group(1)).decode('utf-8', 'replace')
+    return None
+
+
+def parse_keychain_dump(output):
+    """Parse `security dump-keychain [-d]` output into a list of item dicts
+
+    Each item has "class", "attributes" (four-letter names such as acct,
+    svce and labl) and "data" (None unless dumped with -d and allowed).
+    """
+    items = []
+    item = None
+    in_data = False
+    for line in output.splitlines():
+        if line.startswith("keychain:"):
+            item = {"class": None, "attributes": {}, "data": None}
+            items.append(item)
+            in_data = False
+        elif item is None:
+            continue
+        elif in_data:
+            if line.strip():
+                item["data"] = parse_value(line)
+            in_data = False
+        elif line.startswith("class:"):
+            item["class"] = line[6:].strip().strip('"')
+        elif line.startswith("data:"):
+            in_data = True
+        else:
+            match = ATTRIBUTE_RE.match(line)
+            if match and match.group(1):
+                item["attributes"][match.group(1)] = parse_value(match.group(3))
+    return items
+
+
+def airport_passwords(items):
+    """Map SSID to password for the Wi-Fi items of a parsed dump
+
+    Items whose data was not dumped map to None.
+    """
+    passwords = {}
+    for item in items:
+        attributes = item["attributes"]
+        if item["class"] != "genp" or attributes.get("svce") != AIRPORT_SERVICE:
+            continue
+        ssid = attributes.get("acct") or attributes.get("labl")
+        if ssid and passwords.get(ssid) is None:
+            passwords[ssid] = item["data"]
+    return passwords
+
+
+def airport_password(passwords, ssid):
+    """Map a saved network to the value shown for its password"""
+    if ssid not in passwords:
+        return 'No Password or Not Available'
+    if passwords[ssid] is None:
+        return "Password access requires admin privileges"
+    return passwords[ssid]
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Offline Linux credential sources
+
+Saved Wi-Fi credentials are read straight from the files of each network
+stack: wpa_supplicant.conf network blocks and iwd's /var/lib/iwd profiles.
+When NetworkManager's keyfiles are not readable, nmcli is asked for every
+Wi-Fi connection's secrets in one bulk call. No source triggers a radio scan.
+"""
+
+import glob
+import os
+import re
+import shutil
+
+from wifipass_records import classify_secret, STATUS_OK
+
+# wpa_supplicant configurations, including per-interface ones
+WPA_SUPPLICANT_PATTERNS = ("/etc/wpa_supplicant/wpa_supplicant.conf",
+                           "/etc/wpa_supplicant/wpa_supplicant-*.conf",
+                           "/etc/wpa_supplicant.conf")
+
+# iwd profile directory; one <ssid>.psk, .open or .8021x file per network
+IWD_DIR = "/var/lib/iwd"
+IWD_SUFFIXES = (".psk", ".open", ".8021x")
+
+NMCLI_LIST_CMD = ["nmcli", "-t", "-f", "UUID,TYPE", "connection", "show"]
+NMCLI_FIELDS = "802-11-wireless.ssid,802-11-wireless-security.key-mgmt,802-11-wireless-security.psk"
+
+# Connections per `nmcli connection show` call, keeping the command line short
+NMCLI_BATCH_SIZE = 500
+
+NETWORK_BLOCK_RE = re.compile(r'^[ \t]*network[ \t]*=[ \t]*\{(.*?)^[ \t]*\}', re.M | re.S)
+SETTING_RE = re.compile(r'^[ \t]*(\w+)=(.*?)[ \t]*$', re.M)
+HEX_RE = re.compile(r'^[0-9A-Fa-f]*$')
+NMCLI_ESCAPE_RE = re.compile(r'\\(.)')
+
+
+def _readable_dir(path):
+    return os.path.isdir(path) and os.access(path, os.R_OK | os.X_OK)
+
+
+def _readable_keyfiles(folder):
+    """Whether every file in a readable folder can be read; stops at the first that can't"""
+    if os.geteuid() == 0:
+        return True
+    try:
+        with os.scandir(folder) as it:
+            return all(os.access(entry.path, os.R_OK) for entry in it if entry.is_file())
+    except OSError:
+        return False
+
+
+def wpa_supplicant_paths(patterns=WPA_SUPPLICANT_PATTERNS):
+    """Return the existing wpa_supplicant configuration files"""
+    paths = []
+    for pattern in patterns:
+        paths.extend(path for path in sorted(glob.glob(pattern)) if path not in paths)
+    return paths
+
+
+def detect_linux_sources(nm_dir, wpa_paths, iwd_dir, use_nmcli=True):
+    """Return (readable sources, sources present but unreadable)
+
+    Sources are listed in merge priority order: networkmanager or nmcli, iwd,
+    wpa_supplicant.
+    """
+    sources = []
+    unreadable = []
+    nmcli = use_nmcli and shutil.which("nmcli") is not None
+    listable = _readable_dir(nm_dir)
+    # The folder is usually listable by anyone while the keyfiles are root-only
+    if listable and (not nmcli or _readable_keyfiles(nm_dir)):
+        sources.append("networkmanager")
+    elif nmcli:
+        # Keyfiles unreadable or kept by another settings plugin; nmcli knows them all
+        sources.append("nmcli")
+    elif os.path.isdir(nm_dir):
+        unreadable.append("networkmanager")
+    if os.path.isdir(iwd_dir):
+        (sources if _readable_dir(iwd_dir) else unreadable).append("iwd")
+    if wpa_paths:
+        if any(os.access(path, os.R_OK) for path in wpa_paths):
+            sources.append("wpa_supplicant")
+        else:
+            unreadable.append("wpa_supplicant")
+    return sources, unreadable
+
+
+def _unquote(value):
+    """Decode a wpa_supplicant string: "text", P"text" or hex bytes"""
+    if value.startswith('P"') and value.endswith('"'):
+        value = value[1:]
+    if len(value) >= 2 and value.startswith('"') and value.endswith('"'):
+        return value[1:-1]
+    if value and len(value) % 2 == 0 and HEX_RE.match(value):
+        return bytes.fromhex(value).decode('utf-8', 'replace')
+    return value
+
+
+def parse_wpa_supplicant(content):
+    """Yield (ssid, password) for every network block of a wpa_supplicant.conf"""
+    for block in NETWORK_BLOCK_RE.findall(content):
+        settings = {}
+        for key, value in SETTING_RE.findall(block):
+            if not value.startswith('#'):
+                settings.setdefault(key, value)
+        if "ssid" not in settings:
+            continue
+        ssid = _unquote(settings["ssid"])
+        key_mgmt = settings.get("key_mgmt", "WPA-PSK").upper()
+        wep_key = settings.get(f"wep_key{settings.get('wep_tx_keyidx', '0')}")
+        if "EAP" in key_mgmt or "IEEE8021X" in key_mgmt:
+            yield ssid, 'Enterprise Authentication - Not Available'
+        elif "psk" in settings:
+            # A quoted passphrase, or the 64 hex digit raw PSK as written
+            psk = settings["psk"]
+            yield ssid, psk[1:-1] if psk.startswith('"') and psk.endswith('"') else psk
+        elif "sae_password" in settings:
+            yield ssid, _unquote(settings["sae_password"])
+        elif wep_key:
+            yield ssid, wep_key[1:-1] if wep_key.startswith('"') else wep_key
+        else:
+            yield ssid, 'No Password or Not Available'
+
+
+def read_wpa_supplicant(paths):
+    """Return (ssid, password) pairs of every readable wpa_supplicant configuration"""
+    pairs = []
+    for path in paths:
+        try:
+            with open(path, encoding='utf-8', errors='replace') as f:
+                pairs.extend(parse_wpa_supplicant(f.read()))
+        except PermissionError:
+            continue
+    return pairs
+
+
+def iwd_ssid(filename):
+    """Decode the SSID from an iwd profile file name"""
+    name = os.path.splitext(filename)[0]
+    if name.startswith("=") and HEX_RE.match(name[1:]):
+        # SSIDs with characters outside [A-Za-z0-9 _-] are hex encoded
+        return bytes.fromhex(name[1:]).decode('utf-8', 'replace')
+    return name
+
+
+def parse_iwd_profile(content, filename):
+    """Extract the SSID and password from one iwd profile"""
+    ssid = iwd_ssid(filename)
+    if filename.endswith(".8021x"):
+        return ssid, 'Enterprise Authentication - Not Available'
+    settings = dict(SETTING_RE.findall(content)) if filename.endswith(".psk") else {}
+    if settings.get("Passphrase"):
+        return ssid, settings["Passphrase"]
+    if settings.get("PreSharedKey"):
+        return ssid, settings["PreSharedKey"]
+    return ssid, 'No Password or Not Available'
+
+
+def read_iwd(folder):
+    """Return (ssid, password) pairs of every iwd profile in a folder"""
+    pairs = []
+    with os.scandir(folder) as it:
+        entries = sorted((entry for entry in it if entry.name.endswith(IWD_SUFFIXES)),
+                         key=lambda entry: entry.name)
+    for entry in entries:
+        try:
+            with open(entry.path, encoding='utf-8', errors='replace') as f:
+                pairs.append(parse_iwd_profile(f.read(), entry.name))
+        except PermissionError:
+            pairs.append((iwd_ssid(entry.name), "Permission Denied (Run as root)"))
+    return pairs
+
+
+def parse_nmcli_list(output):
+    """Return the UUIDs of the Wi-Fi connections in `nmcli -t -f UUID,TYPE` output"""
+    uuids = []
+    for line in output.splitlines():
+        uuid, _, kind = line.partition(":")
+        if kind == "802-11-wireless":
+            uuids.append(uuid)
+    return uuids
+
+
+def nmcli_show_cmd(uuids):
+    """Command printing the SSID and secrets of many connections in one call"""
+    return ["nmcli", "-t", "-s", "-f", NMCLI_FIELDS, "connection", "show"] + list(uuids)
+
+
+def parse_nmcli_show(output):
+    """Yield (ssid, password) from terse `nmcli -s connection show UUID...` output"""
+    fields = {}
+    for line in output.splitlines() + [""]:
+        name, _, value = line.partition(":")
+        # Connections are separated by a blank line or start over at a repeated field
+        if line and name not in fields:
+            fields[name] = NMCLI_ESCAPE_RE.sub(r'\1', value)
+            continue
+        ssid = fields.get("802-11-wireless.ssid")
+        if ssid:
+            key_mgmt = fields.get("802-11-wireless-security.key-mgmt", "")
+            if key_mgmt.startswith("wpa-eap") or key_mgmt == "ieee8021x":
+                yield ssid, 'Enterprise Authentication - Not Available'
+            else:
+                yield ssid, fields.get("802-11-wireless-security.psk") or "No Password or Enterprise Auth"
+        fields = {name: NMCLI_ESCAPE_RE.sub(r'\1', value)} if line else {}
+
+
+def nmcli_batches(uuids):
+    """Split connection UUIDs into batches for nmcli_show_cmd"""
+    return [uuids[i:i + NMCLI_BATCH_SIZE] for i in range(0, len(uuids), NMCLI_BATCH_SIZE)]
+
+
+def nmcli_steps():
+    """Yield the nmcli commands reading every Wi-Fi connection and return their pairs
+
+    Each command's output is sent back in; run it with wifipass_core.run_steps
+    or the async engine.
+    """
+    pairs = []
+    for batch in nmcli_batches(parse_nmcli_list((yield NMCLI_LIST_CMD))):
+        pairs.extend(parse_nmcli_show((yield nmcli_show_cmd(batch))))
+    return pairs
+
+
+def merge_sources(results):
+    """Merge per-source pairs in priority order, preferring real passwords over messages"""
+    merged = {}
+    for pairs in results:
+        for ssid, password in pairs:
+            current = merged.get(ssid)
+            if current is None or (classify_secret(current) != STATUS_OK
+                                   and classify_secret(password) == STATUS_OK):
+                merged[ssid] = password
+    return merged
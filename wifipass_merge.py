@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fleet inventory merge: combine exported reports from many machines
+
+Ingests a directory of CSV and TXT exports (as written by export_to_csv and
+export_to_txt) and netsh profile XML dumps, parsing files in parallel across
+cores, and deduplicates networks by SSID and credential while tracking which
+hosts saw each one. Files in a subdirectory belong to the host named by that
+subdirectory; files directly in the root belong to the host named by the file.
+
+TXT reports are lossy: "N. SSID: password" is split at the first ": ", so
+an SSID containing ": " is read wrong. Prefer CSV exports where it matters.
+
+Usage: python wifipass_merge.py <folder> [-o output] [-f csv|ndjson] [-j workers]
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import xml.etree.ElementTree as ET
+from multiprocessing import Pool
+
+from wifipass_core import parse_wlan_profile, wlan_profile_password
+
+# Extensions the merge understands
+EXPORT_EXTENSIONS = ('.csv', '.txt', '.xml')
+
+# Files handed to a worker at a time
+MERGE_CHUNKSIZE = 16
+
+# "N. SSID: password" rows; a password may contain ": " too, so either split can be wrong
+# and the first one is taken
+TXT_ROW_RE = re.compile(r'^\d+\. (.*?): (.*)$')
+
+
+def iter_export_files(root):
+    """Yield (host, path) for every export file below root"""
+    for folder, _, files in os.walk(root):
+        rel = os.path.relpath(folder, root)
+        for file in sorted(files):
+            if not file.lower().endswith(EXPORT_EXTENSIONS):
+                continue
+            host = rel.split(os.sep)[0] if rel != os.curdir else os.path.splitext(file)[0]
+            yield host, os.path.join(folder, file)
+
+
+def parse_export_file(item):
+    """Parse one export file into (host, [(ssid, password), ...], error)"""
+    host, path = item
+    records = []
+    try:
+        ext = os.path.splitext(path)[1].lower()
+        if ext == '.csv':
+            with open(path, newline='', encoding='utf-8') as f:
+                reader = csv.reader(f)
+                header = next(reader, None) or []
+                # Exports carry a row number column before SSID and Password
+                ssid_col = header.index('SSID') if 'SSID' in header else 1
+                for row in reader:
+                    if len(row) > ssid_col + 1:
+                        records.append((row[ssid_col], row[ssid_col + 1]))
+        elif ext == '.txt':
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    match = TXT_ROW_RE.match(line.rstrip('\n'))
+                    if match:
+                        records.append(match.groups())
+        else:
+            profile = parse_wlan_profile(path)
+            if profile["ssid"]:
+                records.append((profile["ssid"], wlan_profile_password(profile)))
+    except (OSError, UnicodeDecodeError, csv.Error, ET.ParseError) as e:
+        return host, records, f"{path}: {e}"
+    return host, records, None
+
+
+def merge_exports(root, workers=None, errors=None):
+    """Merge every export below root into {(ssid, password): set of hosts}"""
+    merged = {}
+    items = iter_export_files(root)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        results = map(parse_export_file, items)
+        pool = None
+    else:
+        pool = Pool(workers)
+        results = pool.imap_unordered(parse_export_file, items, chunksize=MERGE_CHUNKSIZE)
+
+    try:
+        for host, records, error in results:
+            if error is not None and errors is not None:
+                errors.append(error)
+            host = sys.intern(host)
+            for key in records:
+                hosts = merged.get(key)
+                if hosts is None:
+                    merged[key] = {host}
+                else:
+                    hosts.add(host)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return merged
+
+
+def iter_merged(merged):
+    """Yield merged inventory records sorted by SSID"""
+    for (ssid, password) in sorted(merged):
+        hosts = sorted(merged[(ssid, password)])
+        yield {"ssid": ssid, "password": password, "host_count": len(hosts), "hosts": hosts}
+
+
+def write_merged(records, out, fmt="csv"):
+    """Stream merged records to a file object"""
+    if fmt == "csv":
+        writer = csv.writer(out)
+        writer.writerow(['SSID', 'Password', 'Host Count', 'Hosts'])
+        for record in records:
+            writer.writerow([record["ssid"], record["password"], record["host_count"],
+                             ';'.join(record["hosts"])])
+    else:
+        for record in records:
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def main(argv=None):
+    """Merge a folder of exports and write the combined inventory"""
+    parser = argparse.ArgumentParser(description="Merge Wi-Fi password exports from many machines")
+    parser.add_argument("folder", help="folder of CSV/TXT exports and netsh profile XML dumps")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    parser.add_argument("-f", "--format", choices=("csv", "ndjson"), default="csv")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes (default: one per core)")
+    args = parser.parse_args(argv)
+
+    errors = []
+    merged = merge_exports(args.folder, args.workers, errors)
+    for error in errors:
+        print(f"Error: {error}", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w', newline='', encoding='utf-8') as out:
+            write_merged(iter_merged(merged), out, args.format)
+    else:
+        write_merged(iter_merged(merged), sys.stdout, args.format)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
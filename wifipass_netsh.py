@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Single-pass parser for `netsh wlan show profile(s)` output
+
+Every "label : value" line is split at its first colon in a single pass and
+mapped to a field through a label table. Label tables are keyed by locale and
+merged, so localized netsh output is parsed without knowing the display
+language up front; more languages can be added with register_labels.
+"""
+
+# Fields that may repeat (one entry per supported auth/cipher pair)
+LIST_FIELDS = ("authentication", "cipher")
+
+# Cost settings are collected into their own mapping
+COST_FIELDS = ("cost", "congested", "approaching_data_limit", "over_data_limit", "roaming",
+               "cost_source")
+
+LABELS = {
+    "en": {
+        "All User Profile": "all_user_profile",
+        "Name": "name",
+        "SSID name": "ssid",
+        "Connection mode": "connection_mode",
+        "Authentication": "authentication",
+        "Cipher": "cipher",
+        "Security key": "security_key",
+        "Key Content": "key_content",
+        "Cost": "cost",
+        "Congested": "congested",
+        "Approaching Data Limit": "approaching_data_limit",
+        "Over Data Limit": "over_data_limit",
+        "Roaming": "roaming",
+        "Cost Source": "cost_source",
+    },
+    "de": {
+        "Profil für alle Benutzer": "all_user_profile",
+        "Name": "name",
+        "SSID-Name": "ssid",
+        "Verbindungsmodus": "connection_mode",
+        "Authentifizierung": "authentication",
+        "Verschlüsselung": "cipher",
+        "Sicherheitsschlüssel": "security_key",
+        "Schlüsselinhalt": "key_content",
+        "Kosten": "cost",
+        "Überlastet": "congested",
+        "Datenlimit bald erreicht": "approaching_data_limit",
+        "Über Datenlimit": "over_data_limit",
+        "Roaming": "roaming",
+        "Kostenquelle": "cost_source",
+    },
+    "fr": {
+        "Profil Tous les utilisateurs": "all_user_profile",
+        "Nom": "name",
+        "Nom du SSID": "ssid",
+        "Mode de connexion": "connection_mode",
+        "Authentification": "authentication",
+        "Chiffrement": "cipher",
+        "Clé de sécurité": "security_key",
+        "Contenu de la clé": "key_content",
+        "Coût": "cost",
+        "Encombré": "congested",
+        "Limite de données bientôt atteinte": "approaching_data_limit",
+        "Limite de données dépassée": "over_data_limit",
+        "Itinérance": "roaming",
+        "Source du coût": "cost_source",
+    },
+}
+
+# Values of the security key field meaning a key is stored
+KEY_PRESENT_VALUES = {"Present", "Vorhanden", "Présent"}
+
+# `netsh wlan show profiles` lists the profiles of each wireless interface
+# under a header line starting with one of these
+INTERFACE_HEADERS = ["Profiles on interface", "Profile auf Schnittstelle",
+                     "Profils sur l'interface"]
+
+_label_map = {}
+_folded_labels = {}
+
+
+def register_labels(locale, labels, present_values=(), interface_headers=()):
+    """Add or extend the label table of a locale"""
+    LABELS.setdefault(locale, {}).update(labels)
+    KEY_PRESENT_VALUES.update(present_values)
+    INTERFACE_HEADERS.extend(interface_headers)
+    _label_map.clear()
+    _folded_labels.clear()
+
+
+def _labels():
+    """Merged label to field tables over every registered locale: (as written, casefolded)"""
+    if not _label_map:
+        for labels in LABELS.values():
+            _label_map.update(labels)
+            _folded_labels.update((label.casefold(), field) for label, field in labels.items())
+    return _label_map, _folded_labels
+
+
+def _fields(output):
+    """Yield (field, value) for every "label : value" line with a known label
+
+    Labels are looked up as written first, so only lines netsh didn't write
+    with a registered label are casefolded.
+    """
+    labels, folded = _labels()
+    for line in output.split('\n'):
+        label, colon, value = line.partition(':')
+        if not colon or label[-1:] not in (' ', '\t'):
+            continue
+        label = label.strip()
+        field = labels.get(label) or folded.get(label.casefold())
+        if field is not None:
+            yield field, value[1:] if value[:1] in (' ', '\t') else value
+
+
+def parse_show_profile(output):
+    """Parse `netsh wlan show profile name=... key=clear` output into a dict"""
+    profile = {"name": None, "ssid": None, "connection_mode": None, "authentication": [],
+               "cipher": [], "security_key": None, "key_content": None, "cost": {}}
+    for field, value in _fields(output):
+        value = value.rstrip()
+        if field in LIST_FIELDS:
+            profile[field].append(value)
+        elif field in COST_FIELDS:
+            profile["cost"][field] = value
+        elif field == "security_key":
+            profile["security_key"] = value in KEY_PRESENT_VALUES
+        elif field == "ssid":
+            profile["ssid"] = value.strip('"')
+        elif field in profile and profile[field] is None:
+            profile[field] = value
+    return profile
+
+
+def _interface_name(header):
+    """Return the interface named by a listing header, or None if it is not one"""
+    for prefix in INTERFACE_HEADERS:
+        if header.casefold().startswith(prefix.casefold()):
+            return header[len(prefix):].strip() or None
+    return None
+
+
+def parse_show_profiles_by_interface(output):
+    """Return [(interface, profile names)] listed by `netsh wlan show profiles`
+
+    Profiles appearing before any recognized interface header are listed
+    under None.
+    """
+    listings = []
+    names = None
+    for line in output.split('\n'):
+        found = next(_fields(line), None)
+        if found is not None and found[0] == "all_user_profile":
+            if not found[1].strip():
+                continue
+            if names is None:
+                names = []
+                listings.append((None, names))
+            names.append(found[1].rstrip())
+        elif line[:1].strip() and line.rstrip().endswith(':'):
+            # An unindented header line, e.g. "Profiles on interface Wi-Fi 2:"
+            interface = _interface_name(line.rstrip()[:-1])
+            if interface is not None:
+                names = []
+                listings.append((interface, names))
+    return listings
+
+
+def netsh_profile_security(profile):
+    """Return the (authentication, cipher) of a parsed profile; repeated pairs are joined"""
+    return tuple(", ".join(dict.fromkeys(profile[field])) or None for field in LIST_FIELDS)
+
+
+def netsh_profile_password(profile):
+    """Map a parsed profile to the value shown for its password"""
+    if any("enterprise" in auth.casefold() or auth.upper().startswith("WPA3-ENT")
+           for auth in profile["authentication"]):
+        return 'Enterprise Authentication - Not Available'
+    if profile["key_content"]:
+        return profile["key_content"]
+    return 'No Password or Not Available'
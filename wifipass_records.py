@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compact network record types
+
+NetworkRecord is a slotted record for single rows; RecordSet stores an
+inventory column by column, sorted by SSID, for the table, the exporters and
+the inventory service. Row numbers are never stored, they are computed when
+a row is rendered.
+"""
+
+from array import array
+
+# Record status codes, stored as one byte per row in RecordSet
+STATUS_OK = 0
+STATUS_ENTERPRISE = 1
+STATUS_NO_PASSWORD = 2
+STATUS_DENIED = 3
+STATUS_ERROR = 4
+STATUS_NAMES = ("ok", "enterprise", "no-password", "denied", "error")
+
+# Backend messages that stand in for a password
+STATUS_BY_MESSAGE = {
+    'Enterprise Authentication - Not Available': STATUS_ENTERPRISE,
+    'No Password or Not Available': STATUS_NO_PASSWORD,
+    'No Password or Enterprise Auth': STATUS_NO_PASSWORD,
+    'Password stored in system keyring': STATUS_NO_PASSWORD,
+    'Permission Denied (Run as root)': STATUS_DENIED,
+    'Password access requires admin privileges': STATUS_DENIED,
+    'Not Available (Admin privileges required)': STATUS_DENIED,
+    'Error Retrieving Password': STATUS_ERROR,
+    'Lookup Timed Out': STATUS_ERROR,
+}
+
+
+def classify_secret(secret):
+    """Return the status code for a backend password value"""
+    return STATUS_BY_MESSAGE.get(secret, STATUS_OK)
+
+
+class NetworkRecord:
+    """A single saved network"""
+
+    __slots__ = ("ssid", "secret", "auth", "cipher", "source", "status", "interfaces")
+
+    def __init__(self, ssid, secret, auth=None, cipher=None, source=None, status=None,
+                 interfaces=None):
+        self.ssid = ssid
+        self.secret = secret
+        self.auth = auth
+        self.cipher = cipher
+        self.source = source
+        self.status = classify_secret(secret) if status is None else status
+        # Names of the wireless interfaces holding the profile, or None if unknown
+        self.interfaces = interfaces
+
+    def __repr__(self):
+        return f"NetworkRecord({self.ssid!r}, status={STATUS_NAMES[self.status]!r})"
+
+    def __eq__(self, other):
+        if not isinstance(other, NetworkRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+
+class RecordSet:
+    """Column-oriented container of network records"""
+
+    __slots__ = ("ssids", "secrets", "auths", "ciphers", "sources", "statuses", "interfaces")
+
+    def __init__(self):
+        self.ssids = []
+        self.secrets = []
+        self.auths = []
+        self.ciphers = []
+        self.sources = []
+        self.statuses = array('b')
+        self.interfaces = []
+
+    @classmethod
+    def from_mapping(cls, passwords, source=None, interfaces=None, security=None):
+        """Build a record set sorted by SSID from an SSID to password mapping
+
+        interfaces optionally maps SSIDs to the interface names tagging them,
+        and security to their (authentication, cipher) pairs.
+        """
+        records = cls()
+        records.ssids = sorted(passwords)
+        records.secrets = [passwords[ssid] for ssid in records.ssids]
+        security = security or {}
+        pairs = [security.get(ssid, (None, None)) for ssid in records.ssids]
+        records.auths = [auth for auth, _ in pairs]
+        records.ciphers = [cipher for _, cipher in pairs]
+        records.sources = [source] * len(records.ssids)
+        records.statuses = array('b', map(classify_secret, records.secrets))
+        interfaces = interfaces or {}
+        records.interfaces = [interfaces.get(ssid) for ssid in records.ssids]
+        return records
+
+    def __len__(self):
+        return len(self.ssids)
+
+    def __getitem__(self, i):
+        return NetworkRecord(self.ssids[i], self.secrets[i], self.auths[i], self.ciphers[i],
+                             self.sources[i], self.statuses[i], self.interfaces[i])
+
+    def __iter__(self):
+        for i in range(len(self.ssids)):
+            yield self[i]
+
+    def insert(self, i, record):
+        """Insert a record before position i"""
+        self.ssids.insert(i, record.ssid)
+        self.secrets.insert(i, record.secret)
+        self.auths.insert(i, record.auth)
+        self.ciphers.insert(i, record.cipher)
+        self.sources.insert(i, record.source)
+        self.statuses.insert(i, record.status)
+        self.interfaces.insert(i, record.interfaces)
+
+    def set_security(self, i, auth, cipher):
+        """Replace the authentication and cipher of row i"""
+        self.auths[i] = auth
+        self.ciphers[i] = cipher
+
+    def __delitem__(self, i):
+        for column in (self.ssids, self.secrets, self.auths, self.ciphers, self.sources,
+                       self.statuses, self.interfaces):
+            del column[i]
+
+    def set_secret(self, i, secret):
+        """Replace the secret of row i and reclassify its status"""
+        self.secrets[i] = secret
+        self.statuses[i] = classify_secret(secret)
+
+    def row(self, i):
+        """Render row i for a table, numbering it at render time"""
+        return [str(i + 1), self.ssids[i], self.secrets[i]]
+
+    def iter_pairs(self):
+        """Yield (ssid, secret) pairs for exporters"""
+        return zip(self.ssids, self.secrets)
+
+    def to_dict(self):
+        """Return the SSID to password mapping"""
+        return dict(zip(self.ssids, self.secrets))
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Read-only HTTP/JSON inventory service for fleet collectors
+
+Serves the retriever's inventory on localhost from an immutable snapshot;
+any other address requires a bearer token, as the passwords are in plain text.
+Each snapshot carries an ETag, so a poll with a matching If-None-Match costs
+a 304 and never a scan. Scans run in the background, on a timer or when a
+client asks for one, and at most one runs at a time.
+
+    GET  /inventory?offset=0&limit=100   one page of records
+    GET  /status                         scan state and snapshot summary
+    POST /rescan                         start a rescan (202, or 429 if too soon)
+"""
+
+import hashlib
+import hmac
+import ipaddress
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from wifipass_records import STATUS_NAMES
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Records per page when the client gives no limit, and the most it may ask for
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Seconds between background refreshes, and the least time between rescans
+# clients can trigger
+DEFAULT_REFRESH_INTERVAL = 300.0
+DEFAULT_RESCAN_INTERVAL = 30.0
+
+# Every Nth background refresh looks up every profile instead of only new and changed ones
+DEFAULT_FULL_REFRESH_EVERY = 12
+
+# Seconds stop() waits for a running scan to finish
+DEFAULT_STOP_TIMEOUT = 30.0
+
+
+def is_loopback(host):
+    """Whether host names a loopback address; "" (every interface) and other names don't"""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class Snapshot:
+    """An immutable inventory as served, with its ETag"""
+
+    __slots__ = ("records", "generated_at", "etag", "backend")
+
+    def __init__(self, record_set, generated_at, backend):
+        self.records = [{"ssid": ssid, "password": secret, "status": STATUS_NAMES[status],
+                         "auth": auth, "cipher": cipher,
+                         "interfaces": list(interfaces) if interfaces else None}
+                        for ssid, secret, status, auth, cipher, interfaces in zip(
+                            record_set.ssids, record_set.secrets, record_set.statuses,
+                            record_set.auths, record_set.ciphers, record_set.interfaces)]
+        self.generated_at = generated_at
+        self.backend = backend
+        # A weak tag of the content, so a rescan that finds no change keeps
+        # clients' caches valid although generated_at moves on
+        digest = hashlib.sha1()
+        for record in self.records:
+            fields = (record["ssid"], record["password"], record["auth"], record["cipher"],
+                      ",".join(record["interfaces"] or ()))
+            digest.update(("\0".join(map(str, fields)) + "\0").encode('utf-8', 'surrogatepass'))
+        self.etag = f'W/"{digest.hexdigest()[:20]}"'
+
+    def page(self, offset, limit):
+        """Return the response body for one page of records"""
+        records = self.records[offset:offset + limit]
+        next_offset = offset + limit if offset + limit < len(self.records) else None
+        return {"generated_at": _iso(self.generated_at), "backend": self.backend,
+                "total": len(self.records), "offset": offset, "limit": limit,
+                "next_offset": next_offset, "records": records}
+
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec="seconds")
+
+
+def etag_matches(header, etag):
+    """Whether an If-None-Match header matches etag (weak comparison)"""
+    if header is None:
+        return False
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or any((tag[2:] if tag.startswith("W/") else tag) == opaque for tag in tags)
+
+
+class InventoryService:
+    """Owns the retriever, the served snapshot and the scans that refresh it"""
+
+    def __init__(self, retriever, refresh_interval=DEFAULT_REFRESH_INTERVAL,
+                 rescan_interval=DEFAULT_RESCAN_INTERVAL,
+                 full_refresh_every=DEFAULT_FULL_REFRESH_EVERY):
+        self.retriever = retriever
+        self.refresh_interval = refresh_interval
+        self.rescan_interval = rescan_interval
+        self.full_refresh_every = max(1, full_refresh_every)
+        self.snapshot = None
+        self.last_error = None
+        self.scan_count = 0
+        # Held for the whole of a scan; the retriever is not safe to share
+        self._scan_lock = retriever.scan_lock
+        self._rate_lock = threading.Lock()
+        self._last_rescan = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def scanning(self):
+        return self._scan_lock.locked()
+
+    def _publish(self):
+        self.snapshot = Snapshot(self.retriever.records, time.time(),
+                                 self.retriever.backend_name())
+
+    def start(self):
+        """Publish the stored inventory, if any, then refresh in a background thread"""
+        stored_at = self.retriever.load_cached()
+        if stored_at is not None:
+            self.snapshot = Snapshot(self.retriever.records, stored_at,
+                                     self.retriever.backend_name())
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=DEFAULT_STOP_TIMEOUT):
+        """Stop refreshing and wait up to timeout seconds for a running scan to finish"""
+        self._stop.set()
+        deadline = time.monotonic() + timeout
+        if self._thread is not None:
+            self._thread.join(timeout)
+        # Rescans requested by clients run in threads of their own
+        if self._scan_lock.acquire(timeout=max(deadline - time.monotonic(), 0)):
+            self._scan_lock.release()
+
+    def _run(self):
+        self.refresh()
+        refreshes = 0
+        while not self._stop.wait(self.refresh_interval):
+            refreshes += 1
+            self.refresh(full=refreshes % self.full_refresh_every == 0 or None)
+
+    def refresh(self, full=None):
+        """Scan and publish a new snapshot; returns False if a scan was already running
+
+        full is passed to the retriever's rescan.
+        """
+        if not self._scan_lock.acquire(blocking=False):
+            return False
+        try:
+            retriever = self.retriever
+            if retriever.passwords and "Error" not in retriever.passwords:
+                retriever.apply_delta(retriever.rescan(full))
+            else:
+                passwords = retriever.scan(refresh=bool(full))
+                if "Error" in passwords:
+                    # Keep serving the last good snapshot
+                    self.last_error = passwords["Error"]
+                    return True
+                retriever.set_passwords(passwords)
+            self.last_error = None
+            self.scan_count += 1
+            self._publish()
+        except Exception as e:
+            self.last_error = str(e)
+        finally:
+            self._scan_lock.release()
+        return True
+
+    def request_rescan(self):
+        """Start a rescan for a client; returns ("started" | "running" | "limited", retry_after)"""
+        with self._rate_lock:
+            if self.scanning:
+                return "running", 0
+            now = time.monotonic()
+            if self._last_rescan is not None:
+                wait = self._last_rescan + self.rescan_interval - now
+                if wait > 0:
+                    return "limited", wait
+            self._last_rescan = now
+        threading.Thread(target=self.refresh, daemon=True).start()
+        return "started", 0
+
+    def status(self):
+        snapshot = self.snapshot
+        return {"scanning": self.scanning, "scan_count": self.scan_count,
+                "last_error": self.last_error,
+                "generated_at": _iso(snapshot.generated_at) if snapshot else None,
+                "total": len(snapshot.records) if snapshot else None,
+                "etag": snapshot.etag if snapshot else None}
+
+
+class InventoryHandler(BaseHTTPRequestHandler):
+    """Routes requests to the server's InventoryService"""
+
+    server_version = "wifipass"
+
+    def log_message(self, format, *args):
+        # Collectors poll often; stay quiet unless asked
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, code, body, headers=None):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorized(self):
+        token = self.server.token
+        if token is None:
+            return True
+        header = self.headers.get("Authorization", "")
+        if hmac.compare_digest(header.encode(), f"Bearer {token}".encode()):
+            return True
+        self._send_json(401, {"error": "missing or wrong bearer token"},
+                        {"WWW-Authenticate": "Bearer"})
+        return False
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        url = urlsplit(self.path)
+        service = self.server.service
+        if url.path == "/status":
+            self._send_json(200, service.status(), {"Cache-Control": "no-store"})
+        elif url.path == "/inventory":
+            self._get_inventory(service, parse_qs(url.query))
+        else:
+            self._send_json(404, {"error": f"no such resource: {url.path}"})
+
+    def _get_inventory(self, service, query):
+        try:
+            offset = int(query.get("offset", ["0"])[0])
+            limit = int(query.get("limit", [str(DEFAULT_PAGE_SIZE)])[0])
+        except ValueError:
+            self._send_json(400, {"error": "offset and limit must be integers"})
+            return
+        if offset < 0 or not 1 <= limit <= MAX_PAGE_SIZE:
+            self._send_json(400, {"error": f"offset must be >= 0 and limit 1-{MAX_PAGE_SIZE}"})
+            return
+
+        snapshot = service.snapshot
+        if snapshot is None:
+            self._send_json(503, {"error": service.last_error or "first scan in progress"},
+                            {"Retry-After": "5"})
+            return
+        # Every page of a snapshot shares its ETag; caches key it by URL
+        headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+        if etag_matches(self.headers.get("If-None-Match"), snapshot.etag):
+            self.send_response(304)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+        self._send_json(200, snapshot.page(offset, limit), headers)
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        if urlsplit(self.path).path != "/rescan":
+            self._send_json(404, {"error": f"no such resource: {self.path}"})
+            return
+        state, retry_after = self.server.service.request_rescan()
+        if state == "limited":
+            self._send_json(429, {"error": "rescan requested too recently"},
+                            {"Retry-After": str(int(retry_after) + 1)})
+        else:
+            self._send_json(202, {"rescan": state})
+
+
+class InventoryServer(ThreadingHTTPServer):
+    """HTTP server bound to an InventoryService
+
+    Raises ValueError for a non-loopback host without a token.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, service, host=DEFAULT_HOST, port=DEFAULT_PORT, token=None,
+                 verbose=False):
+        if token is None and not is_loopback(host):
+            raise ValueError(f"serving on {host or 'every interface'} requires a token")
+        self.service = service
+        self.token = token
+        self.verbose = verbose
+        super().__init__((host, port), InventoryHandler)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Persistent on-disk store for Wi-Fi scan results and parsed profile files
+"""
+
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+# Default location of the scan store
+DEFAULT_STORE_PATH = os.path.join(os.path.expanduser("~"), ".wifipass", "scans.db")
+
+# Cached entries expire after a week
+DEFAULT_TTL = 7 * 24 * 60 * 60
+
+# Oldest entries are evicted past this many rows
+DEFAULT_MAX_ENTRIES = 50000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    backend    TEXT NOT NULL,
+    ssid       TEXT NOT NULL,
+    password   TEXT NOT NULL,
+    stored_at  REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (backend, ssid)
+);
+CREATE INDEX IF NOT EXISTS entries_stored_at ON entries (stored_at);
+CREATE TABLE IF NOT EXISTS fingerprints (
+    backend     TEXT PRIMARY KEY,
+    fingerprint TEXT,
+    stored_at   REAL NOT NULL,
+    entries     INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS keyfiles (
+    cache    TEXT NOT NULL,
+    path     TEXT NOT NULL,
+    inode    INTEGER NOT NULL,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    ssid     TEXT NOT NULL,
+    password TEXT NOT NULL,
+    PRIMARY KEY (cache, path)
+);
+"""
+
+
+class ScanStore:
+    """SQLite-backed scan result store with per-entry TTL and size-based eviction"""
+
+    def __init__(self, path=DEFAULT_STORE_PATH, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        folder = os.path.dirname(path)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder, mode=0o700, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+        # The store holds plain-text passwords, keep it private to the user
+        try:
+            os.chmod(path, 0o600)
+        except OSError:
+            pass
+
+    def _connect(self):
+        """Open a connection; one per call so the store can be used from any thread"""
+        return sqlite3.connect(self.path, timeout=10)
+
+    def save(self, backend, fingerprint, passwords):
+        """Replace the stored inventory of a backend"""
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM entries WHERE backend = ?", (backend,))
+            conn.executemany(
+                "INSERT INTO entries VALUES (?, ?, ?, ?, ?)",
+                ((backend, ssid, password, now, now + self.ttl)
+                 for ssid, password in passwords.items()))
+            conn.execute("INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?)",
+                         (backend, fingerprint, now, len(passwords)))
+            self._evict(conn, now)
+
+    def _evict(self, conn, now):
+        """Drop expired entries, then the oldest ones past the size limit"""
+        conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+        (count,) = conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+        if count > self.max_entries:
+            conn.execute(
+                "DELETE FROM entries WHERE rowid IN "
+                "(SELECT rowid FROM entries ORDER BY stored_at LIMIT ?)",
+                (count - self.max_entries,))
+
+    def load(self, backend):
+        """Return the unexpired stored inventory of a backend and when it was stored"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT ssid, password FROM entries WHERE backend = ? AND expires_at > ?",
+                (backend, time.time())).fetchall()
+            stamp = conn.execute("SELECT stored_at FROM fingerprints WHERE backend = ?",
+                                 (backend,)).fetchone()
+        return dict(rows), (stamp[0] if stamp else None)
+
+    def load_fresh(self, backend, fingerprint):
+        """Return the stored inventory only if it matches the current fingerprint"""
+        if fingerprint is None:
+            return None
+        with closing(self._connect()) as conn:
+            stored = conn.execute("SELECT fingerprint, entries FROM fingerprints WHERE backend = ?",
+                                  (backend,)).fetchone()
+        if stored is None or stored[0] != fingerprint:
+            return None
+        passwords, _ = self.load(backend)
+        # Expired or evicted entries make the stored inventory incomplete
+        if not passwords or len(passwords) != stored[1]:
+            return None
+        return passwords
+
+    def save_keyfiles(self, cache, entries):
+        """Replace the parsed profile files of a KeyfileCache"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM keyfiles WHERE cache = ?", (cache,))
+            conn.executemany(
+                "INSERT INTO keyfiles VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((cache, path) + key + parsed for path, (key, parsed) in entries.items()))
+
+    def load_keyfiles(self, cache):
+        """Return {path: ((inode, size, mtime_ns), (ssid, password))} of a KeyfileCache"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT path, inode, size, mtime_ns, ssid, password FROM keyfiles WHERE cache = ?",
+                (cache,)).fetchall()
+        return {path: ((inode, size, mtime_ns), (ssid, password))
+                for path, inode, size, mtime_ns, ssid, password in rows}
+
+    def clear(self):
+        """Remove every stored entry"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM entries")
+            conn.execute("DELETE FROM fingerprints")
+            conn.execute("DELETE FROM keyfiles")
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Optional scan instrumentation
+
+ScanTrace records per-stage and per-profile timings, subprocess and retry
+counts and failures, and exports them as JSON or in the Chrome trace-event
+format (load the file in chrome://tracing or Perfetto). NULL_TRACE is the
+disabled default: every hook is a no-op, so untraced scans pay almost nothing.
+StartupProfile records the milestones of an application start.
+"""
+
+import os
+import threading
+import time
+
+
+class _NullStage:
+    """Shared do-nothing context manager returned while tracing is disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class NullTrace:
+    """Disabled trace; all hooks are no-ops"""
+
+    enabled = False
+
+    def stage(self, name, **args):
+        return _NULL_STAGE
+
+    def count(self, name, amount=1):
+        pass
+
+    def failure(self, name, message):
+        pass
+
+    def reset(self):
+        pass
+
+    def summary(self):
+        return ""
+
+
+NULL_TRACE = NullTrace()
+
+
+class _Stage:
+    """Times one stage and records it on exit"""
+
+    __slots__ = ("trace", "name", "args", "start")
+
+    def __init__(self, trace, name, args):
+        self.trace = trace
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.trace.events.append((self.name, threading.get_ident(), self.start, end - self.start,
+                                  self.args))
+        return False
+
+
+class ScanTrace:
+    """Enabled trace collecting timings, counters and failures of a scan"""
+
+    enabled = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        self.origin = time.perf_counter()
+        self.events = []
+        self.counters = {}
+        self.failures = []
+
+    def stage(self, name, **args):
+        """Context manager timing a stage; keyword args are attached to the event"""
+        return _Stage(self, name, args)
+
+    def count(self, name, amount=1):
+        """Increment a counter such as subprocess or retry"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def failure(self, name, message):
+        """Record a failed profile or stage"""
+        self.failures.append({"name": name, "message": message})
+
+    def stage_totals(self):
+        """Return {stage: (calls, total seconds)} in first-seen order"""
+        totals = {}
+        for name, _, _, duration, _ in self.events:
+            calls, total = totals.get(name, (0, 0.0))
+            totals[name] = (calls + 1, total + duration)
+        return totals
+
+    def to_json(self):
+        """Structured trace as a JSON-serializable dict"""
+        return {
+            "stages": {name: {"calls": calls, "seconds": round(total, 6)}
+                       for name, (calls, total) in self.stage_totals().items()},
+            "profiles": [{"profile": args.get("profile"), "seconds": round(duration, 6),
+                          "start": round(start - self.origin, 6)}
+                         for name, _, start, duration, args in self.events if "profile" in args],
+            "counters": dict(self.counters),
+            "failures": list(self.failures),
+        }
+
+    def to_chrome_trace(self):
+        """Trace in the Chrome trace-event format"""
+        threads = {}
+        pid = os.getpid()
+        events = []
+        for name, ident, start, duration, args in self.events:
+            tid = threads.setdefault(ident, len(threads) + 1)
+            events.append({"name": name, "cat": "scan", "ph": "X", "pid": pid, "tid": tid,
+                           "ts": round((start - self.origin) * 1e6, 1),
+                           "dur": round(duration * 1e6, 1), "args": args})
+        for name, value in self.counters.items():
+            events.append({"name": name, "ph": "C", "pid": pid, "tid": 0,
+                           "ts": round((time.perf_counter() - self.origin) * 1e6, 1),
+                           "args": {name: value}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, filepath, fmt="chrome"):
+        """Write the trace as Chrome trace events ("chrome") or the structured dict ("json")"""
+        import json
+        data = self.to_chrome_trace() if fmt == "chrome" else self.to_json()
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1)
+
+    def summary(self):
+        """One-line summary for a status bar"""
+        parts = []
+        for name, (calls, total) in self.stage_totals().items():
+            if name == "profile":
+                parts.append(f"{calls} lookups {total:.2f}s")
+            else:
+                parts.append(f"{name} {total * 1000:.0f}ms")
+        for name, value in sorted(self.counters.items()):
+            parts.append(f"{name}: {value}")
+        if self.failures:
+            parts.append(f"{len(self.failures)} failed")
+        return " | ".join(parts)
+
+
+class StartupProfile:
+    """Milestones of an application start, in seconds since the entry script began"""
+
+    def __init__(self, started):
+        self.started = started
+        self.marks = []
+
+    def mark(self, name):
+        """Record that a milestone was reached now; later marks of a name are ignored"""
+        if all(existing != name for existing, _ in self.marks):
+            self.marks.append((name, time.perf_counter() - self.started))
+
+    def summary(self):
+        """Milestones with their time since start and since the previous one"""
+        lines = []
+        previous = 0.0
+        for name, seconds in self.marks:
+            lines.append(f"{name:<20}{seconds * 1000:8.1f}ms"
+                         f"  (+{(seconds - previous) * 1000:.1f}ms)")
+            previous = seconds
+        return "\n".join(lines)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Virtualized table view and SSID search index, independent of any GUI toolkit
+"""
+
+from wifipass_records import RecordSet
+
+# Rows handed to the table widget at a time
+DEFAULT_PAGE_SIZE = 100
+
+# SSIDs are indexed by every substring up to this length
+MAX_GRAM = 3
+
+
+class InventoryIndex:
+    """N-gram index over SSIDs for fast case-insensitive substring search"""
+
+    def __init__(self, keys):
+        self.keys = [key.lower() for key in keys]
+        grams = {}
+        for i, key in enumerate(self.keys):
+            size = len(key)
+            for gram in {key[start:start + n] for n in range(1, MAX_GRAM + 1)
+                         for start in range(size - n + 1)}:
+                posting = grams.get(gram)
+                if posting is None:
+                    grams[gram] = [i]
+                else:
+                    posting.append(i)
+        self.grams = grams
+        self._last = None
+
+    def search(self, query):
+        """Return ascending row ids whose SSID contains query, or None for no filter"""
+        query = query.lower()
+        if not query:
+            return None
+
+        # Start from the shortest posting list among the query's n-grams
+        candidates = None
+        for start in range(max(len(query) - MAX_GRAM + 1, 1)):
+            posting = self.grams.get(query[start:start + MAX_GRAM], [])
+            if candidates is None or len(posting) < len(candidates):
+                candidates = posting
+            if not candidates:
+                break
+        if len(query) <= MAX_GRAM:
+            # Queries no longer than an n-gram match their posting list exactly
+            result = candidates
+        else:
+            # Typing usually extends the previous query, so its result may be smaller
+            if self._last is not None and query.startswith(self._last[0]) \
+                    and len(self._last[1]) < len(candidates):
+                candidates = self._last[1]
+            keys = self.keys
+            result = [i for i in candidates if query in keys[i]]
+        self._last = (query, result)
+        return result
+
+
+class TableView:
+    """Window of rows over a possibly filtered RecordSet, rendered one page at a time"""
+
+    def __init__(self, records=None, page_size=DEFAULT_PAGE_SIZE):
+        self.page_size = page_size
+        self.query = ""
+        self.offset = 0
+        self.set_records(RecordSet() if records is None else records)
+
+    def set_records(self, records):
+        """Replace the underlying records; the search index is rebuilt on the next search"""
+        self.records = records
+        self._index = None
+        self.matches = None
+        offset = self.offset
+        if self.query:
+            self.filter(self.query)
+        self.offset = min(offset, self._last_page_offset())
+
+    def insert_rows(self, positions):
+        """Note rows inserted into the same records at the given ascending positions
+
+        The search index is dropped until the next search, and an active
+        filter is updated by testing only the new rows.
+        """
+        self._index = None
+        if self.matches is not None:
+            # An old row moves down by the number of new rows landing before it
+            shifted = []
+            k = 0
+            for i in self.matches:
+                while k < len(positions) and positions[k] <= i + k:
+                    k += 1
+                shifted.append(i + k)
+            query = self.query.lower()
+            ssids = self.records.ssids
+            self.matches = sorted(shifted + [i for i in positions if query in ssids[i].lower()])
+        self.offset = min(self.offset, self._last_page_offset())
+
+    @property
+    def index(self):
+        """Search index, built lazily so streaming updates don't pay for it"""
+        if self._index is None:
+            self._index = InventoryIndex(self.records.ssids)
+        return self._index
+
+    def filter(self, query):
+        """Restrict the view to rows whose SSID contains query"""
+        self.query = query
+        self.matches = self.index.search(query) if query else None
+        self.offset = 0
+
+    def __len__(self):
+        return len(self.records) if self.matches is None else len(self.matches)
+
+    def _last_page_offset(self):
+        return max((len(self) - 1) // self.page_size * self.page_size, 0)
+
+    def scroll(self, pages):
+        """Move the window by a number of pages"""
+        self.offset = min(max(self.offset + pages * self.page_size, 0), self._last_page_offset())
+
+    def page(self):
+        """Return the rendered rows in the current window"""
+        end = min(self.offset + self.page_size, len(self))
+        if self.matches is None:
+            return [self.records.row(i) for i in range(self.offset, end)]
+        return [self.records.row(i) for i in self.matches[self.offset:end]]
+
+    def absolute(self, position):
+        """Map a position within the current page to an index into the records"""
+        position += self.offset
+        return position if self.matches is None else self.matches[position]
+
+    def describe(self):
+        """Human readable summary of the visible window"""
+        if not len(self):
+            return "No rows"
+        end = min(self.offset + self.page_size, len(self))
+        text = f"Rows {self.offset + 1}-{end} of {len(self)}"
+        if self.matches is not None:
+            text += f" (filtered from {len(self.records)})"
+        return text
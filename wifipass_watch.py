@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Watch mode keeping an open inventory current
+
+On Linux, ProfileWatch watches the NetworkManager and iwd profile
+directories with inotify and polls the wpa_supplicant configurations,
+debounces bursts of events and re-reads only the sources whose files were
+touched. Elsewhere, or without inotify, it polls the backend fingerprint (the
+profile listing) and rescans when it changes. Each delta is computed and
+applied to the retriever under its scan lock, never while a scan is running,
+then handed to a callback such as window.write_event_value.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import threading
+import time
+
+# Quiet period closing a burst of events, and the longest a burst is held back
+DEFAULT_DEBOUNCE = 0.5
+DEFAULT_MAX_DELAY = 5.0
+
+# Seconds between listing comparisons of the polling fallback
+DEFAULT_POLL_INTERVAL = 10.0
+
+# inotify event bits (linux/inotify.h)
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+
+WATCH_MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF)
+
+# struct inotify_event header: wd, mask, cookie, len
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def _libc():
+    """The C library if it provides inotify, else None"""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+    except OSError:
+        return None
+    return libc if hasattr(libc, "inotify_init1") else None
+
+
+def _file_stats(paths):
+    """{path: (inode, size, mtime_ns), or None if missing} of polled files"""
+    stats = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+            stats[path] = (st.st_ino, st.st_size, st.st_mtime_ns)
+        except OSError:
+            stats[path] = None
+    return stats
+
+
+class InotifyWatcher:
+    """Watch directories with inotify and report touched paths in debounced batches"""
+
+    def __init__(self, folders):
+        libc = _libc()
+        if libc is None:
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.folders = {}
+        for folder in folders:
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(folder), WATCH_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                self.close()
+                raise OSError(error, f"Cannot watch {folder}: {os.strerror(error)}")
+            self.folders[wd] = folder
+
+    def _read(self, paths):
+        """Add the paths of all queued events to paths"""
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped; every watched folder may have changed
+                paths.update(self.folders.values())
+            elif wd in self.folders:
+                folder = self.folders[wd]
+                paths.add(os.path.join(folder, os.fsdecode(name)) if name else folder)
+
+    def wait(self, timeout=None, debounce=DEFAULT_DEBOUNCE, max_delay=DEFAULT_MAX_DELAY):
+        """Return the paths touched in the next burst of events; empty after timeout seconds
+
+        A burst ends once no event arrived for debounce seconds, or max_delay
+        seconds after it started.
+        """
+        paths = set()
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return paths
+        deadline = time.monotonic() + max_delay
+        while True:
+            self._read(paths)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([self.fd], [], [], min(debounce, remaining))[0]:
+                return paths
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class ProfileWatch:
+    """Background watch handing inventory deltas to on_delta"""
+
+    def __init__(self, retriever, on_delta, debounce=DEFAULT_DEBOUNCE,
+                 interval=DEFAULT_POLL_INTERVAL, on_error=None):
+        self.retriever = retriever
+        self.on_delta = on_delta
+        # Called with the message of a failed update; it is also recorded in the trace
+        self.on_error = on_error
+        self.last_error = None
+        self.debounce = debounce
+        self.interval = interval
+        # "inotify" or "poll" once started
+        self.mode = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start watching in a daemon thread; returns the mode in use"""
+        watcher = None
+        if self.retriever.os_type == "Linux":
+            folders = self.retriever.watch_paths()
+            files = self.retriever.watch_files()
+            if folders or files:
+                try:
+                    watcher = InotifyWatcher(folders)
+                except OSError:
+                    watcher = None
+        if watcher is not None:
+            self.mode = "inotify"
+            target, args = self._run_inotify, (watcher, files)
+        else:
+            self.mode = "poll"
+            target, args = self._run_poll, ()
+        self._thread = threading.Thread(target=target, args=args, daemon=True)
+        self._thread.start()
+        return self.mode
+
+    def stop(self):
+        """Stop watching and wait briefly for the thread to exit"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+
+    def _report(self, error):
+        """Record a failed update and pass it on; the watch keeps running"""
+        self.last_error = f"{type(error).__name__}: {error}"
+        self.retriever.trace.failure("watch", self.last_error)
+        if self.on_error is not None:
+            self.on_error(self.last_error)
+
+    def _update(self, compute):
+        """Apply and emit the delta returned by compute, run under the scan lock
+
+        The next delta is thus computed against the inventory this one left.
+        Returns False without running it while a scan holds the lock or is
+        waiting to be applied, or before the first scan.
+        """
+        retriever = self.retriever
+        if not retriever.scan_lock.acquire(blocking=False):
+            return False
+        try:
+            if retriever.retrieving or not retriever.passwords:
+                return False
+            try:
+                delta = compute()
+                if delta and any(delta.values()):
+                    retriever.apply_delta(delta)
+                    self.on_delta(delta)
+            except Exception as e:
+                self._report(e)
+            return True
+        finally:
+            retriever.scan_lock.release()
+
+    def _run_inotify(self, watcher, files):
+        """Re-read touched sources after each burst of events or change of a polled file"""
+        pending = set()
+        stats = _file_stats(files)
+        try:
+            while not self._stop.is_set():
+                pending |= watcher.wait(timeout=0.5, debounce=self.debounce)
+                current = _file_stats(files)
+                pending.update(path for path in files if current[path] != stats[path])
+                stats = current
+                # A running scan replaces the inventory; keep the paths until it is done
+                if pending and self._update(lambda: self.retriever.watch_delta(pending)):
+                    pending = set()
+        finally:
+            watcher.close()
+
+    def _run_poll(self):
+        """Rescan whenever the profile listing fingerprint changes"""
+        # Unknown until the first poll, which rescans; a change made while the
+        # first scan ran is not missed
+        fingerprint = None
+
+        def poll():
+            nonlocal fingerprint
+            current = self.retriever.backend_fingerprint()
+            # Backends without a fingerprint are rescanned every interval
+            if current is not None and current == fingerprint:
+                return None
+            # Only the changed keys are looked up; a full lookup stays an explicit action
+            delta = self.retriever.rescan(full=False)
+            fingerprint = current
+            return delta
+
+        while not self._stop.wait(self.interval):
+            self._update(poll)